@@ -29,6 +29,12 @@ config.set_main_option("sqlalchemy.url", settings.database_url)
 # Model's MetaData object for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Every ACAS revision works inside the acas schema. The search_path is set
+# once per connection here instead of by each migration; alembic_version
+# stays in public so dropping the acas schema never takes it along.
+SEARCH_PATH = "acas, public"
+VERSION_TABLE_SCHEMA = "public"
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,9 +59,11 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        version_table_schema=VERSION_TABLE_SCHEMA,
     )
 
     with context.begin_transaction():
+        context.execute(f"SET search_path TO {SEARCH_PATH}")
         context.run_migrations()
 
 
@@ -70,11 +78,20 @@ def run_migrations_online() -> None:
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args={"options": f"-c search_path={SEARCH_PATH.replace(' ', '')}"},
     )
 
     with connectable.connect() as connection:
+        # PostgreSQL supports transactional DDL: each migration's domains
+        # and tables run in one transaction that commits (and flushes WAL)
+        # once. Batch (copy-and-rename) mode is only needed for SQLite.
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transactional_ddl=True,
+            transaction_per_migration=True,
+            render_as_batch=connection.dialect.name == "sqlite",
+            version_table_schema=VERSION_TABLE_SCHEMA,
         )
 
         with context.begin_transaction():
@@ -5,9 +5,10 @@ Revises:
 Create Date: 2025-09-22
 
 """
+import logging
+import os
+
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = '001_initial_schema'
@@ -15,86 +16,170 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+log = logging.getLogger('alembic.migration')
+
+# Raw DDL is built once at import time so upgrade() does no SQLAlchemy
+# table/column compilation; each block is sent as a single statement batch.
+SETUP_DDL = '''
+    CREATE SCHEMA IF NOT EXISTS acas;
+
+    -- CREATE DOMAIN has no IF NOT EXISTS; each one is wrapped so a re-run
+    -- after a partial failure skips the domains that already exist
+    DO $$
+    BEGIN
+        -- Create basic custom types; the CHECKs let columns of these types
+        -- carry their valid range into the planner and into every table
+        BEGIN
+            CREATE DOMAIN currency_amount AS NUMERIC(15,4)
+                CHECK (VALUE >= -1e11 AND VALUE <= 1e11);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+        BEGIN
+            CREATE DOMAIN percentage AS NUMERIC(5,4)
+                CHECK (VALUE >= 0);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+        BEGIN
+            CREATE DOMAIN exchange_rate AS NUMERIC(10,6)
+                CHECK (VALUE > 0);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+        BEGIN
+            CREATE DOMAIN comp3_type AS NUMERIC(15,3);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+
+        -- Shared shapes for code/address columns, reused by later tables
+        BEGIN
+            CREATE DOMAIN currency_code AS CHAR(3) DEFAULT 'USD'
+                CHECK (VALUE ~ '^[A-Z]{3}$');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+        BEGIN
+            CREATE DOMAIN postcode AS VARCHAR(10);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END;
+    END $$;
+'''
+
+# Throwaway dev/CI databases can set ACAS_MIGRATION_UNLOGGED to skip WAL for
+# the new tables; never set it for a database whose data must survive a crash.
+TABLE = 'UNLOGGED TABLE' if os.getenv('ACAS_MIGRATION_UNLOGGED') else 'TABLE'
+
+SYSTEM_TABLES_DDL = f'''
+    -- System configuration tables. Free-text names and addresses are TEXT;
+    -- VARCHAR(n) is kept only where the length is a real business rule
+    CREATE {TABLE} IF NOT EXISTS system_config (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        company_name TEXT NOT NULL,
+        address_line1 TEXT,
+        address_line2 TEXT,
+        address_line3 TEXT,
+        postcode postcode,
+        vat_registration VARCHAR(20),
+        company_registration VARCHAR(20),
+        base_currency currency_code,
+        fiscal_year_start INTEGER,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()
+    );
+
+    -- Users table; last_login and the period status flags are updated in
+    -- place, so both tables keep 20% free page space for HOT updates
+    CREATE {TABLE} IF NOT EXISTS users (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        username VARCHAR(20) NOT NULL,
+        full_name TEXT,
+        email TEXT,
+        hashed_password VARCHAR(128),
+        is_active BOOLEAN,
+        is_superuser BOOLEAN,
+        permission_level INTEGER,
+        last_login TIMESTAMP WITHOUT TIME ZONE,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()
+    ) WITH (fillfactor = 80);
+
+    -- Company periods table
+    CREATE {TABLE} IF NOT EXISTS company_periods (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        period_number INTEGER NOT NULL,
+        year_number INTEGER NOT NULL,
+        start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        end_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        is_open BOOLEAN,
+        is_current BOOLEAN,
+        gl_closed BOOLEAN,
+        sl_closed BOOLEAN,
+        pl_closed BOOLEAN,
+        stock_closed BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        UNIQUE (year_number, period_number)
+    ) WITH (fillfactor = 80);
+    -- Finding the current period is a lookup in a single-entry index
+    CREATE UNIQUE INDEX IF NOT EXISTS ix_company_periods_current
+        ON company_periods (year_number) WHERE is_current;
+'''
+
+# updated_at is maintained by one shared BEFORE UPDATE trigger, so writers
+# never have to bind it themselves; the column default covers INSERTs.
+UPDATED_AT_TRIGGERS_DDL = '''
+    CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS trg_system_config_updated ON system_config;
+    CREATE TRIGGER trg_system_config_updated BEFORE UPDATE ON system_config
+        FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+    DROP TRIGGER IF EXISTS trg_users_updated ON users;
+    CREATE TRIGGER trg_users_updated BEFORE UPDATE ON users
+        FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+    DROP TRIGGER IF EXISTS trg_company_periods_updated ON company_periods;
+    CREATE TRIGGER trg_company_periods_updated BEFORE UPDATE ON company_periods
+        FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+'''
+
+# Built outside the migration transaction so the unique B-trees never hold
+# an ACCESS EXCLUSIVE lock on a populated users table.
+USERS_UNIQUE_INDEXES = (
+    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username ON users (username)',
+    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email ON users (email)',
+)
+
+# We'll create tables in phases matching the business logic services
+PHASE1_DDL = SETUP_DDL + SYSTEM_TABLES_DDL + UPDATED_AT_TRIGGERS_DDL
+
 
 def upgrade() -> None:
     # Create all tables for the ACAS migration
-    # This is a clean start - no existing tables assumed
-    op.execute('CREATE SCHEMA IF NOT EXISTS acas')
-    op.execute('SET search_path TO acas, public')
-    
-    # We'll create tables in phases matching the business logic services
-    op.execute('''
-        -- Create basic custom types
-        CREATE DOMAIN currency_amount AS NUMERIC(15,4);
-        CREATE DOMAIN percentage AS NUMERIC(5,4);
-        CREATE DOMAIN exchange_rate AS NUMERIC(10,6);
-        CREATE DOMAIN comp3_type AS NUMERIC(15,3);
-    ''')
-    
-    # System configuration tables
-    op.create_table('system_config',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('company_name', sa.String(60), nullable=False),
-        sa.Column('address_line1', sa.String(60)),
-        sa.Column('address_line2', sa.String(60)),
-        sa.Column('address_line3', sa.String(60)),
-        sa.Column('postcode', sa.String(10)),
-        sa.Column('vat_registration', sa.String(20)),
-        sa.Column('company_registration', sa.String(20)),
-        sa.Column('base_currency', sa.String(3), default='USD'),
-        sa.Column('fiscal_year_start', sa.Integer(), default=1),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id')
-    )
-    
-    # Users table
-    op.create_table('users',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('username', sa.String(20), nullable=False),
-        sa.Column('full_name', sa.String(60)),
-        sa.Column('email', sa.String(120)),
-        sa.Column('hashed_password', sa.String(128)),
-        sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('is_superuser', sa.Boolean(), default=False),
-        sa.Column('permission_level', sa.Integer(), default=1),
-        sa.Column('last_login', sa.DateTime()),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('username'),
-        sa.UniqueConstraint('email')
-    )
+    # Every object is created only if missing, so a re-run after a
+    # partial failure picks up where it stopped
+    # The acas schema, domains, tables and triggers are sent in dependency
+    # order as one DDL batch, in a single round-trip; search_path is already
+    # set on the connection by env.py, so a database that was not provisioned
+    # by run_app.sh still gets its schema here.
+    op.execute(PHASE1_DDL)
     
-    # Company periods table
-    op.create_table('company_periods',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('period_number', sa.Integer(), nullable=False),
-        sa.Column('year_number', sa.Integer(), nullable=False),
-        sa.Column('start_date', sa.DateTime(), nullable=False),
-        sa.Column('end_date', sa.DateTime(), nullable=False),
-        sa.Column('is_open', sa.Boolean(), default=True),
-        sa.Column('is_current', sa.Boolean(), default=False),
-        sa.Column('gl_closed', sa.Boolean(), default=False),
-        sa.Column('sl_closed', sa.Boolean(), default=False),
-        sa.Column('pl_closed', sa.Boolean(), default=False),
-        sa.Column('stock_closed', sa.Boolean(), default=False),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('period_number', 'year_number')
-    )
+    # CONCURRENTLY cannot run inside a transaction block (or a multi-statement
+    # batch), so these stay separate statements after the main batch commits
+    with op.get_context().autocommit_block():
+        for statement in USERS_UNIQUE_INDEXES:
+            op.execute(statement)
     
-    print("Phase 1: System tables created successfully")
+    log.info("Phase 1: System tables created successfully")
 
 
 def downgrade() -> None:
-    op.execute('SET search_path TO acas, public')
-    op.drop_table('company_periods')
-    op.drop_table('users')
-    op.drop_table('system_config')
-    op.execute('DROP DOMAIN IF EXISTS comp3_type')
-    op.execute('DROP DOMAIN IF EXISTS exchange_rate')
-    op.execute('DROP DOMAIN IF EXISTS percentage')
-    op.execute('DROP DOMAIN IF EXISTS currency_amount')
-    op.execute('DROP SCHEMA IF EXISTS acas CASCADE')
\ No newline at end of file
+    # The acas schema is left in place, since run_app.sh may have provisioned
+    # it before this revision ran; only this revision's objects are dropped -
+    # in a single round-trip
+    op.execute('''
+        DROP TABLE IF EXISTS company_periods, users, system_config CASCADE;
+        DROP FUNCTION IF EXISTS set_updated_at() CASCADE;
+        DROP DOMAIN IF EXISTS postcode, currency_code, comp3_type,
+            exchange_rate, percentage, currency_amount CASCADE;
+    ''')
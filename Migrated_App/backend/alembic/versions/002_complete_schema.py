@@ -5,9 +5,12 @@ Revises: 001_initial_schema
 Create Date: 2025-09-24
 
 """
+import logging
+
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
 
 # revision identifiers, used by Alembic.
 revision = '002_complete_schema'
@@ -15,536 +18,606 @@ down_revision = '001_initial_schema'
 branch_labels = None
 depends_on = None
 
+log = logging.getLogger('alembic.migration')
+
+
+class Domain(sa.types.UserDefinedType):
+    """Column type naming a domain created by 001_initial_schema"""
+    cache_ok = True
+
+    def __init__(self, name):
+        self.name = name
+
+    def get_col_spec(self, **kw):
+        return self.name
+
+
+ENUM_TYPES = {
+    'account_type_enum': ('ASSET', 'LIABILITY', 'CAPITAL', 'INCOME', 'EXPENSE', 'CONTROL', 'MEMO'),
+    'journal_type_enum': ('MANUAL', 'SALES', 'PURCHASE', 'CASH_RECEIPT', 'CASH_PAYMENT', 'STOCK', 'PAYROLL', 'OPENING', 'CLOSING', 'ADJUSTMENT', 'REVERSAL'),
+    'posting_status_enum': ('DRAFT', 'POSTED', 'REVERSED'),
+    'transaction_status_enum': ('DRAFT', 'CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'INVOICED'),
+    'invoice_type_enum': ('STANDARD', 'CREDIT_NOTE', 'DEBIT_NOTE', 'PRO_FORMA'),
+    'purchase_order_status_enum': ('DRAFT', 'APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'INVOICED', 'CLOSED', 'CANCELLED'),
+    'goods_receipt_status_enum': ('PENDING', 'PARTIAL', 'RECEIVED', 'CANCELLED'),
+    'irs_transaction_type_enum': ('INCOME', 'EXPENSE', 'ASSET', 'LIABILITY', 'ADJUSTMENT'),
+    'irs_posting_status_enum': ('DRAFT', 'POSTED', 'ADJUSTED'),
+}
+
+# One anti-join against pg_type finds every enum that is still missing, and
+# only those are created
+ENUM_TYPES_DDL = """
+    DO $$
+    DECLARE
+        missing RECORD;
+    BEGIN
+        FOR missing IN
+            SELECT wanted.name, wanted.labels
+            FROM (VALUES
+                %s
+            ) AS wanted(name, labels)
+            WHERE NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = wanted.name)
+        LOOP
+            EXECUTE format(
+                'CREATE TYPE %%I AS ENUM (%%s)',
+                missing.name,
+                (SELECT string_agg(quote_literal(label), ', ') FROM unnest(missing.labels) AS label)
+            );
+        END LOOP;
+    END $$;
+""" % ',\n                '.join(
+    "('%s', ARRAY[%s])" % (name, ', '.join("'%s'" % label for label in labels))
+    for name, labels in ENUM_TYPES.items()
+)
+
+# Tables are declared on a private MetaData and compiled to PostgreSQL DDL
+# once at import time; upgrade() then sends every CREATE TABLE in a single
+# multi-statement batch instead of one round-trip per object.
+#
+# Bounded counters (levels, period/year numbers, line numbers, day/term
+# counts) are SMALLINT to keep the line tables narrow; batch control counts
+# stay INTEGER since an imported batch can exceed 32767 entries. Currency
+# codes use the fixed-width currency_code domain (CHAR(3), default 'USD') and
+# VAT codes are CHAR(1). Customer/supplier balances and order/receipt
+# totals are whole-cent NUMERIC(13,2) and order/receipt line totals
+# NUMERIC(14,2); prices, rates and GL amounts keep their extra precision.
+# Free-text notes/reasons are TEXT with a CHECK that keeps the legacy
+# length limit.
+metadata = sa.MetaData()
+
+# Master tables whose running balances and quantities are rewritten by every
+# posting keep 20% free page space, so those updates stay HOT and leave the
+# indexes alone; the append-only line tables keep the default of 100.
+# SQLAlchemy 1.4 has no storage-parameter table option, so the WITH clause
+# is appended to their compiled CREATE TABLE
+HOT_UPDATE_TABLES = ('chart_of_accounts', 'customers', 'suppliers', 'stock_items', 'gl_batches')
+
+# The 30/60/90/120-day aged balances of a customer or supplier are always read
+# together, so they are kept as one four-element array: aged[1] is the 30-day
+# bucket through aged[4] for 120 days
+def _aged_balances():
+    return sa.Column(
+        'aged', postgresql.ARRAY(postgresql.NUMERIC(13, 2), dimensions=1),
+        sa.CheckConstraint('cardinality(aged) = 4'),
+        server_default=sa.text("'{0,0,0,0}'"),
+    )
+
+# Shared default for the created/updated/opened timestamps; like now() it is
+# fixed at transaction start, so every row of one bulk load gets the same value
+CURRENT_TIMESTAMP = sa.text('CURRENT_TIMESTAMP')
+
+# The line tables are the high-volume ones: their ids are BIGINT identities
+# that hand out values 1000 at a time, so a bulk load rarely touches the
+# sequence and the key never overflows
+LINE_ID = sa.Identity(always=False, cache=1000)
+
+# They are also created UNLOGGED so the COBOL data load writes no WAL for
+# them; 003_post_load switches them to logged once the load is done
+LINE_TABLE_PREFIXES = ['UNLOGGED']
+
+# Created by 001_initial_schema; declared here only so foreign keys resolve
+EXISTING_TABLES = ('company_periods',)
+sa.Table('company_periods', metadata, sa.Column('id', sa.Integer(), primary_key=True))
+
+# Phase 1: General Ledger tables
+# Chart of Accounts
+sa.Table('chart_of_accounts', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_code', sa.String(8), nullable=False),
+    sa.Column('account_name', sa.String(60), nullable=False),
+    sa.Column('account_type', sa.Enum('ASSET', 'LIABILITY', 'CAPITAL', 'INCOME', 'EXPENSE', 'CONTROL', 'MEMO', name='account_type_enum'), nullable=False),
+    sa.Column('parent_account', sa.String(8)),
+    sa.Column('is_header', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('level', sa.SmallInteger(), server_default=sa.text('0')),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_control', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('control_type', sa.String(20)),
+    sa.Column('allow_posting', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('budget_enabled', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('analysis_code1_required', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('analysis_code2_required', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('analysis_code3_required', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('multi_currency', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('default_vat_code', sa.CHAR(1)),
+    sa.Column('opening_balance', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('current_balance', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('ytd_movement', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_code')
+)
+
+# GL Batches
+sa.Table('gl_batches', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('batch_number', sa.String(20), nullable=False),
+    sa.Column('batch_date', sa.DateTime(), nullable=False),
+    sa.Column('batch_type', sa.String(20), nullable=False),
+    sa.Column('description', sa.String(200)),
+    sa.Column('source_module', sa.String(10)),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('control_count', sa.Integer(), server_default=sa.text('0')),
+    sa.Column('control_debits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('control_credits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('actual_count', sa.Integer(), server_default=sa.text('0')),
+    sa.Column('actual_debits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('actual_credits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('is_balanced', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('is_posted', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('posted_date', sa.DateTime()),
+    sa.Column('posted_by', sa.String(20)),
+    sa.Column('validation_errors', sa.Text(), sa.CheckConstraint('length(validation_errors) <= 1000')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('batch_number'),
+    sa.ForeignKeyConstraint(['period_id'], ['company_periods.id'])
+)
+
+# Journal Headers
+sa.Table('journal_headers', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('journal_number', sa.String(20), nullable=False),
+    sa.Column('journal_date', sa.DateTime(), nullable=False),
+    sa.Column('journal_type', sa.Enum('MANUAL', 'SALES', 'PURCHASE', 'CASH_RECEIPT', 'CASH_PAYMENT', 'STOCK', 'PAYROLL', 'OPENING', 'CLOSING', 'ADJUSTMENT', 'REVERSAL', name='journal_type_enum'), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('period_number', sa.SmallInteger(), nullable=False),
+    sa.Column('year_number', sa.SmallInteger(), nullable=False),
+    sa.Column('description', sa.String(200), nullable=False),
+    sa.Column('reference', sa.String(30)),
+    sa.Column('source_module', sa.String(10)),
+    sa.Column('source_reference', sa.String(30)),
+    sa.Column('posting_status', sa.Enum('DRAFT', 'POSTED', 'REVERSED', name='posting_status_enum'), server_default=sa.text("'DRAFT'")),
+    sa.Column('posted_date', sa.DateTime()),
+    sa.Column('posted_by', sa.String(20)),
+    sa.Column('is_reversal', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('reversal_of_id', sa.Integer()),
+    sa.Column('auto_reverse', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('reverse_date', sa.DateTime()),
+    sa.Column('total_debits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('total_credits', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('line_count', sa.SmallInteger(), server_default=sa.text('0')),
+    sa.Column('batch_id', sa.Integer()),
+    sa.Column('approval_required', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('approved_by', sa.String(20)),
+    sa.Column('approved_date', sa.DateTime()),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('journal_number'),
+    sa.ForeignKeyConstraint(['period_id'], ['company_periods.id']),
+    sa.ForeignKeyConstraint(['batch_id'], ['gl_batches.id']),
+    sa.ForeignKeyConstraint(['reversal_of_id'], ['journal_headers.id'])
+)
+
+# Journal Lines
+sa.Table('journal_lines', metadata,
+    sa.Column('id', sa.BigInteger(), LINE_ID, nullable=False),
+    sa.Column('journal_id', sa.Integer(), nullable=False),
+    sa.Column('line_number', sa.SmallInteger(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('account_code', sa.String(8), nullable=False),
+    sa.Column('debit_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('credit_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), server_default=sa.text('1')),
+    sa.Column('foreign_debit', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('foreign_credit', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('description', sa.String(200)),
+    sa.Column('reference', sa.String(30)),
+    sa.Column('analysis_code1', sa.String(10)),
+    sa.Column('analysis_code2', sa.String(10)),
+    sa.Column('analysis_code3', sa.String(10)),
+    sa.Column('quantity', postgresql.NUMERIC(15, 3)),
+    sa.Column('unit_description', sa.String(20)),
+    sa.Column('vat_code', sa.CHAR(1)),
+    sa.Column('vat_amount', postgresql.NUMERIC(15, 4)),
+    sa.Column('reconciled', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('reconciliation_date', sa.DateTime()),
+    sa.Column('reconciliation_ref', sa.String(20)),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.PrimaryKeyConstraint('id'),
+    sa.ForeignKeyConstraint(['journal_id'], ['journal_headers.id']),
+    sa.ForeignKeyConstraint(['account_id'], ['chart_of_accounts.id']),
+    sa.UniqueConstraint('journal_id', 'line_number', name='uq_journal_line'),
+    prefixes=LINE_TABLE_PREFIXES
+)
+
+# Phase 2: Customer and Supplier tables
+# Customers
+sa.Table('customers', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_code', sa.String(8), nullable=False),
+    sa.Column('customer_name', sa.String(60), nullable=False),
+    sa.Column('abbreviated_name', sa.String(20)),
+    sa.Column('address_line1', sa.String(60)),
+    sa.Column('address_line2', sa.String(60)),
+    sa.Column('address_line3', sa.String(60)),
+    sa.Column('postcode', sa.String(10)),
+    sa.Column('country', sa.String(30), server_default=sa.text("'USA'")),
+    sa.Column('phone_number', sa.String(20)),
+    sa.Column('fax_number', sa.String(20)),
+    sa.Column('email_address', sa.String(120)),
+    sa.Column('website', sa.String(120)),
+    sa.Column('vat_registration', sa.String(20)),
+    sa.Column('tax_reference', sa.String(20)),
+    sa.Column('credit_limit', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('credit_rating', sa.String(2)),
+    sa.Column('payment_terms', sa.SmallInteger(), server_default=sa.text('30')),
+    sa.Column('discount_percentage', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('price_list_code', sa.String(2), server_default=sa.text("'1'")),
+    sa.Column('sales_rep_code', sa.String(4)),
+    sa.Column('analysis_code1', sa.String(10)),
+    sa.Column('analysis_code2', sa.String(10)),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_on_hold', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('hold_reason', sa.Text(), sa.CheckConstraint('length(hold_reason) <= 100')),
+    sa.Column('date_opened', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('last_sale_date', sa.DateTime()),
+    sa.Column('last_payment_date', sa.DateTime()),
+    sa.Column('current_balance', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    _aged_balances(),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_code')
+)
+
+# Suppliers
+sa.Table('suppliers', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('supplier_code', sa.String(8), nullable=False),
+    sa.Column('supplier_name', sa.String(60), nullable=False),
+    sa.Column('abbreviated_name', sa.String(20)),
+    sa.Column('address_line1', sa.String(60)),
+    sa.Column('address_line2', sa.String(60)),
+    sa.Column('address_line3', sa.String(60)),
+    sa.Column('postcode', sa.String(10)),
+    sa.Column('country', sa.String(30), server_default=sa.text("'USA'")),
+    sa.Column('phone_number', sa.String(20)),
+    sa.Column('fax_number', sa.String(20)),
+    sa.Column('email_address', sa.String(120)),
+    sa.Column('website', sa.String(120)),
+    sa.Column('vat_registration', sa.String(20)),
+    sa.Column('tax_reference', sa.String(20)),
+    sa.Column('payment_terms', sa.SmallInteger(), server_default=sa.text('30')),
+    sa.Column('discount_percentage', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('buyer_code', sa.String(4)),
+    sa.Column('analysis_code1', sa.String(10)),
+    sa.Column('analysis_code2', sa.String(10)),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_on_hold', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('hold_reason', sa.Text(), sa.CheckConstraint('length(hold_reason) <= 100')),
+    sa.Column('date_opened', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('last_purchase_date', sa.DateTime()),
+    sa.Column('last_payment_date', sa.DateTime()),
+    sa.Column('current_balance', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    _aged_balances(),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('supplier_code')
+)
+
+# Phase 3: Stock tables
+# Stock Items
+sa.Table('stock_items', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stock_code', sa.String(15), nullable=False),
+    sa.Column('abbreviated_code', sa.String(8)),
+    sa.Column('description', sa.String(60), nullable=False),
+    sa.Column('extended_description', sa.String(200)),
+    sa.Column('unit_of_measure', sa.String(6), server_default=sa.text("'EACH'")),
+    sa.Column('alternative_uom', sa.String(6)),
+    sa.Column('uom_conversion_factor', postgresql.NUMERIC(10, 6), server_default=sa.text('1')),
+    sa.Column('category_code', sa.String(10)),
+    sa.Column('location_code', sa.String(10)),
+    sa.Column('bin_location', sa.String(10)),
+    sa.Column('is_stocked', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_purchased', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_sold', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('is_manufactured', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('is_serialized', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('quantity_on_hand', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_allocated', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_on_order', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_reserved', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('reorder_level', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('reorder_quantity', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('maximum_level', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('lead_time_days', sa.SmallInteger(), server_default=sa.text('7')),
+    sa.Column('cost_method', sa.String(8), server_default=sa.text("'AVERAGE'")),
+    sa.Column('standard_cost', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('average_cost', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('last_cost', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('selling_price1', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('selling_price2', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('selling_price3', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('vat_code', sa.CHAR(1), server_default=sa.text("'S'")),
+    sa.Column('weight', postgresql.NUMERIC(10, 3)),
+    sa.Column('volume', postgresql.NUMERIC(10, 3)),
+    sa.Column('preferred_supplier', sa.String(8)),
+    sa.Column('supplier_part_number', sa.String(30)),
+    sa.Column('barcode', sa.String(30)),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true')),
+    sa.Column('obsolete_date', sa.DateTime()),
+    sa.Column('replacement_item', sa.String(15)),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stock_code')
+)
+
+# Phase 4: Sales Transaction tables
+# Sales Orders
+sa.Table('sales_orders', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(12), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('order_date', sa.DateTime(), nullable=False),
+    sa.Column('delivery_date', sa.DateTime()),
+    sa.Column('reference', sa.String(30)),
+    sa.Column('customer_order_no', sa.String(30)),
+    sa.Column('sales_rep', sa.String(20)),
+    sa.Column('delivery_address', sa.String(300)),
+    sa.Column('payment_terms', sa.String(20)),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), server_default=sa.text('1')),
+    sa.Column('status', sa.Enum('DRAFT', 'CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'INVOICED', name='transaction_status_enum'), server_default=sa.text("'DRAFT'")),
+    sa.Column('sub_total', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('discount_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('vat_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('total_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('deposit_required', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('deposit_received', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('confirmed_date', sa.DateTime()),
+    sa.Column('shipped_date', sa.DateTime()),
+    sa.Column('delivered_date', sa.DateTime()),
+    sa.Column('tracking_number', sa.String(50)),
+    sa.Column('carrier', sa.String(30)),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_number'),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'])
+)
+
+# Sales Order Lines
+sa.Table('sales_order_lines', metadata,
+    sa.Column('id', sa.BigInteger(), LINE_ID, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('line_number', sa.SmallInteger(), nullable=False),
+    sa.Column('stock_code', sa.String(15), nullable=False),
+    sa.Column('description', sa.String(60), nullable=False),
+    sa.Column('quantity', postgresql.NUMERIC(15, 3), nullable=False),
+    sa.Column('unit_price', postgresql.NUMERIC(15, 4), nullable=False),
+    sa.Column('discount_percent', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('discount_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('line_total', postgresql.NUMERIC(14, 2), server_default=sa.text('0')),
+    sa.Column('vat_code', sa.CHAR(1), server_default=sa.text("'S'")),
+    sa.Column('vat_rate', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('vat_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('quantity_shipped', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_invoiced', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('delivery_date', sa.DateTime()),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 200')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.PrimaryKeyConstraint('id'),
+    sa.ForeignKeyConstraint(['order_id'], ['sales_orders.id']),
+    sa.UniqueConstraint('order_id', 'line_number', name='uq_sales_order_line'),
+    prefixes=LINE_TABLE_PREFIXES
+)
+
+# Phase 5: Purchase Transaction tables
+# Purchase Orders
+sa.Table('purchase_orders', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(12), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('order_date', sa.DateTime(), nullable=False),
+    sa.Column('delivery_date', sa.DateTime()),
+    sa.Column('reference', sa.String(30)),
+    sa.Column('supplier_reference', sa.String(30)),
+    sa.Column('buyer_code', sa.String(20)),
+    sa.Column('delivery_address', sa.String(300)),
+    sa.Column('payment_terms', sa.String(20)),
+    sa.Column('currency_code', Domain('currency_code')),
+    sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), server_default=sa.text('1')),
+    sa.Column('status', sa.Enum('DRAFT', 'APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'INVOICED', 'CLOSED', 'CANCELLED', name='purchase_order_status_enum'), server_default=sa.text("'DRAFT'")),
+    sa.Column('sub_total', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('discount_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('vat_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('total_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('approved_date', sa.DateTime()),
+    sa.Column('sent_date', sa.DateTime()),
+    sa.Column('acknowledged_date', sa.DateTime()),
+    sa.Column('completed_date', sa.DateTime()),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_number'),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'])
+)
+
+# Purchase Order Lines
+sa.Table('purchase_order_lines', metadata,
+    sa.Column('id', sa.BigInteger(), LINE_ID, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('line_number', sa.SmallInteger(), nullable=False),
+    sa.Column('stock_code', sa.String(15), nullable=False),
+    sa.Column('description', sa.String(60), nullable=False),
+    sa.Column('quantity', postgresql.NUMERIC(15, 3), nullable=False),
+    sa.Column('unit_cost', postgresql.NUMERIC(15, 4), nullable=False),
+    sa.Column('discount_percent', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('discount_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('line_total', postgresql.NUMERIC(14, 2), server_default=sa.text('0')),
+    sa.Column('vat_code', sa.CHAR(1), server_default=sa.text("'S'")),
+    sa.Column('vat_rate', postgresql.NUMERIC(5, 4), server_default=sa.text('0')),
+    sa.Column('vat_amount', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('quantity_received', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_invoiced', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('delivery_date', sa.DateTime()),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 200')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.PrimaryKeyConstraint('id'),
+    sa.ForeignKeyConstraint(['order_id'], ['purchase_orders.id']),
+    sa.UniqueConstraint('order_id', 'line_number', name='uq_purchase_order_line'),
+    prefixes=LINE_TABLE_PREFIXES
+)
+
+# Goods Receipts
+sa.Table('goods_receipts', metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('receipt_number', sa.String(12), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer()),
+    sa.Column('order_number', sa.String(12)),
+    sa.Column('receipt_date', sa.DateTime(), nullable=False),
+    sa.Column('delivery_note', sa.String(30)),
+    sa.Column('carrier', sa.String(30)),
+    sa.Column('status', sa.Enum('PENDING', 'PARTIAL', 'RECEIVED', 'CANCELLED', name='goods_receipt_status_enum'), server_default=sa.text("'PENDING'")),
+    sa.Column('total_quantity', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('goods_received', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('outstanding_quantity', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('total_value', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('total_amount', postgresql.NUMERIC(13, 2), server_default=sa.text('0')),
+    sa.Column('is_complete', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('gl_posted', sa.Boolean(), server_default=sa.text('false')),
+    sa.Column('posted_date', sa.DateTime()),
+    sa.Column('received_by', sa.String(20)),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 500')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('updated_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.Column('created_by', sa.String(20)),
+    sa.Column('updated_by', sa.String(20)),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('receipt_number'),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id']),
+    sa.ForeignKeyConstraint(['order_id'], ['purchase_orders.id'])
+)
+
+# Goods Receipt Lines
+sa.Table('goods_receipt_lines', metadata,
+    sa.Column('id', sa.BigInteger(), LINE_ID, nullable=False),
+    sa.Column('receipt_id', sa.Integer(), nullable=False),
+    sa.Column('line_number', sa.SmallInteger(), nullable=False),
+    sa.Column('order_line_id', sa.BigInteger()),
+    sa.Column('stock_code', sa.String(15), nullable=False),
+    sa.Column('description', sa.String(60), nullable=False),
+    sa.Column('quantity_ordered', postgresql.NUMERIC(15, 3), server_default=sa.text('0')),
+    sa.Column('quantity_received', postgresql.NUMERIC(15, 3), nullable=False),
+    sa.Column('unit_cost', postgresql.NUMERIC(15, 4), server_default=sa.text('0')),
+    sa.Column('line_total', postgresql.NUMERIC(14, 2), server_default=sa.text('0')),
+    sa.Column('location_code', sa.String(10)),
+    sa.Column('lot_number', sa.String(20)),
+    sa.Column('expiry_date', sa.DateTime()),
+    sa.Column('notes', sa.Text(), sa.CheckConstraint('length(notes) <= 200')),
+    sa.Column('created_at', sa.DateTime(), server_default=CURRENT_TIMESTAMP),
+    sa.PrimaryKeyConstraint('id'),
+    sa.ForeignKeyConstraint(['receipt_id'], ['goods_receipts.id']),
+    sa.ForeignKeyConstraint(['order_line_id'], ['purchase_order_lines.id']),
+    sa.UniqueConstraint('receipt_id', 'line_number', name='uq_goods_receipt_line'),
+    prefixes=LINE_TABLE_PREFIXES
+)
+
+# Topological order puts every referenced table first. The foreign keys stay
+# declared here for that ordering but are not emitted: 003_post_load adds and
+# validates them once the data is loaded, so the load does no per-row lookups.
+NEW_TABLES = [t for t in metadata.sorted_tables if t.name not in EXISTING_TABLES]
+
+
+def _compile(element) -> str:
+    return str(element.compile(dialect=postgresql.dialect())).strip()
+
+
+# Secondary indexes are built by 003_post_load, after any bulk data load
+def _create_table(table) -> str:
+    ddl = _compile(CreateTable(table, include_foreign_key_constraints=[]))
+    if table.name in HOT_UPDATE_TABLES:
+        ddl += ' WITH (fillfactor = 80)'
+    return ddl
+
+
+SCHEMA_DDL = ';\n'.join(_create_table(table) for table in NEW_TABLES) + ';'
+
+# Order and receipt headers carry only the customer/supplier FK; the code and
+# name live once on the master row and are joined back in by these views
+CODE_VIEWS = ('sales_orders_v', 'purchase_orders_v', 'goods_receipts_v')
+CODE_VIEWS_DDL = """
+    CREATE OR REPLACE VIEW sales_orders_v AS
+        SELECT so.*, c.customer_code
+        FROM sales_orders so JOIN customers c ON c.id = so.customer_id;
+    CREATE OR REPLACE VIEW purchase_orders_v AS
+        SELECT po.*, s.supplier_code
+        FROM purchase_orders po JOIN suppliers s ON s.id = po.supplier_id;
+    CREATE OR REPLACE VIEW goods_receipts_v AS
+        SELECT gr.*, s.supplier_code, s.supplier_name
+        FROM goods_receipts gr JOIN suppliers s ON s.id = gr.supplier_id;
+"""
+
 
 def upgrade() -> None:
     """Create all remaining ACAS tables"""
     
-    # Set search path
-    op.execute('SET search_path TO acas, public')
-    
-    # Create ENUM types (if they don't exist)
-    op.execute("""
-        DO $$ 
-        BEGIN
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'account_type_enum') THEN
-                CREATE TYPE account_type_enum AS ENUM ('ASSET', 'LIABILITY', 'CAPITAL', 'INCOME', 'EXPENSE', 'CONTROL', 'MEMO');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'journal_type_enum') THEN
-                CREATE TYPE journal_type_enum AS ENUM ('MANUAL', 'SALES', 'PURCHASE', 'CASH_RECEIPT', 'CASH_PAYMENT', 'STOCK', 'PAYROLL', 'OPENING', 'CLOSING', 'ADJUSTMENT', 'REVERSAL');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'posting_status_enum') THEN
-                CREATE TYPE posting_status_enum AS ENUM ('DRAFT', 'POSTED', 'REVERSED');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'transaction_status_enum') THEN
-                CREATE TYPE transaction_status_enum AS ENUM ('DRAFT', 'CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'INVOICED');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'invoice_type_enum') THEN
-                CREATE TYPE invoice_type_enum AS ENUM ('STANDARD', 'CREDIT_NOTE', 'DEBIT_NOTE', 'PRO_FORMA');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'purchase_order_status_enum') THEN
-                CREATE TYPE purchase_order_status_enum AS ENUM ('DRAFT', 'APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'INVOICED', 'CLOSED', 'CANCELLED');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'goods_receipt_status_enum') THEN
-                CREATE TYPE goods_receipt_status_enum AS ENUM ('PENDING', 'PARTIAL', 'RECEIVED', 'CANCELLED');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'irs_transaction_type_enum') THEN
-                CREATE TYPE irs_transaction_type_enum AS ENUM ('INCOME', 'EXPENSE', 'ASSET', 'LIABILITY', 'ADJUSTMENT');
-            END IF;
-            
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'irs_posting_status_enum') THEN
-                CREATE TYPE irs_posting_status_enum AS ENUM ('DRAFT', 'POSTED', 'ADJUSTED');
-            END IF;
-        END $$;
-    """)
-    
-    print("Phase 1: Creating General Ledger tables...")
-    
-    # Chart of Accounts
-    op.create_table('chart_of_accounts',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('account_code', sa.String(8), nullable=False),
-        sa.Column('account_name', sa.String(60), nullable=False),
-        sa.Column('account_type', sa.Enum('ASSET', 'LIABILITY', 'CAPITAL', 'INCOME', 'EXPENSE', 'CONTROL', 'MEMO', name='account_type_enum'), nullable=False),
-        sa.Column('parent_account', sa.String(8)),
-        sa.Column('is_header', sa.Boolean(), default=False),
-        sa.Column('level', sa.Integer(), default=0),
-        sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('is_control', sa.Boolean(), default=False),
-        sa.Column('control_type', sa.String(20)),
-        sa.Column('allow_posting', sa.Boolean(), default=True),
-        sa.Column('budget_enabled', sa.Boolean(), default=False),
-        sa.Column('analysis_code1_required', sa.Boolean(), default=False),
-        sa.Column('analysis_code2_required', sa.Boolean(), default=False),
-        sa.Column('analysis_code3_required', sa.Boolean(), default=False),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('multi_currency', sa.Boolean(), default=False),
-        sa.Column('default_vat_code', sa.String(1)),
-        sa.Column('opening_balance', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('current_balance', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('ytd_movement', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('account_code')
-    )
-    op.create_index('idx_gl_account_type', 'chart_of_accounts', ['account_type'])
-    op.create_index('idx_gl_parent', 'chart_of_accounts', ['parent_account'])
-    
-    # GL Batches
-    op.create_table('gl_batches',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('batch_number', sa.String(20), nullable=False),
-        sa.Column('batch_date', sa.DateTime(), nullable=False),
-        sa.Column('batch_type', sa.String(20), nullable=False),
-        sa.Column('description', sa.String(200)),
-        sa.Column('source_module', sa.String(10)),
-        sa.Column('period_id', sa.Integer(), nullable=False),
-        sa.Column('control_count', sa.Integer(), default=0),
-        sa.Column('control_debits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('control_credits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('actual_count', sa.Integer(), default=0),
-        sa.Column('actual_debits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('actual_credits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('is_balanced', sa.Boolean(), default=False),
-        sa.Column('is_posted', sa.Boolean(), default=False),
-        sa.Column('posted_date', sa.DateTime()),
-        sa.Column('posted_by', sa.String(20)),
-        sa.Column('validation_errors', sa.String(1000)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('batch_number'),
-        sa.ForeignKeyConstraint(['period_id'], ['company_periods.id'])
-    )
-    
-    # Journal Headers
-    op.create_table('journal_headers',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('journal_number', sa.String(20), nullable=False),
-        sa.Column('journal_date', sa.DateTime(), nullable=False),
-        sa.Column('journal_type', sa.Enum('MANUAL', 'SALES', 'PURCHASE', 'CASH_RECEIPT', 'CASH_PAYMENT', 'STOCK', 'PAYROLL', 'OPENING', 'CLOSING', 'ADJUSTMENT', 'REVERSAL', name='journal_type_enum'), nullable=False),
-        sa.Column('period_id', sa.Integer(), nullable=False),
-        sa.Column('period_number', sa.Integer(), nullable=False),
-        sa.Column('year_number', sa.Integer(), nullable=False),
-        sa.Column('description', sa.String(200), nullable=False),
-        sa.Column('reference', sa.String(30)),
-        sa.Column('source_module', sa.String(10)),
-        sa.Column('source_reference', sa.String(30)),
-        sa.Column('posting_status', sa.Enum('DRAFT', 'POSTED', 'REVERSED', name='posting_status_enum'), default='DRAFT'),
-        sa.Column('posted_date', sa.DateTime()),
-        sa.Column('posted_by', sa.String(20)),
-        sa.Column('is_reversal', sa.Boolean(), default=False),
-        sa.Column('reversal_of_id', sa.Integer()),
-        sa.Column('auto_reverse', sa.Boolean(), default=False),
-        sa.Column('reverse_date', sa.DateTime()),
-        sa.Column('total_debits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('total_credits', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('line_count', sa.Integer(), default=0),
-        sa.Column('batch_id', sa.Integer()),
-        sa.Column('approval_required', sa.Boolean(), default=False),
-        sa.Column('approved_by', sa.String(20)),
-        sa.Column('approved_date', sa.DateTime()),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('journal_number'),
-        sa.ForeignKeyConstraint(['period_id'], ['company_periods.id']),
-        sa.ForeignKeyConstraint(['batch_id'], ['gl_batches.id']),
-        sa.ForeignKeyConstraint(['reversal_of_id'], ['journal_headers.id'])
-    )
-    
-    # Journal Lines
-    op.create_table('journal_lines',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('journal_id', sa.Integer(), nullable=False),
-        sa.Column('line_number', sa.Integer(), nullable=False),
-        sa.Column('account_id', sa.Integer(), nullable=False),
-        sa.Column('account_code', sa.String(8), nullable=False),
-        sa.Column('debit_amount', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('credit_amount', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), default=1.0000),
-        sa.Column('foreign_debit', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('foreign_credit', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('description', sa.String(200)),
-        sa.Column('reference', sa.String(30)),
-        sa.Column('analysis_code1', sa.String(10)),
-        sa.Column('analysis_code2', sa.String(10)),
-        sa.Column('analysis_code3', sa.String(10)),
-        sa.Column('quantity', postgresql.NUMERIC(15, 3)),
-        sa.Column('unit_description', sa.String(20)),
-        sa.Column('vat_code', sa.String(1)),
-        sa.Column('vat_amount', postgresql.NUMERIC(15, 4)),
-        sa.Column('reconciled', sa.Boolean(), default=False),
-        sa.Column('reconciliation_date', sa.DateTime()),
-        sa.Column('reconciliation_ref', sa.String(20)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.ForeignKeyConstraint(['journal_id'], ['journal_headers.id']),
-        sa.ForeignKeyConstraint(['account_id'], ['chart_of_accounts.id']),
-        sa.UniqueConstraint('journal_id', 'line_number', name='uq_journal_line')
-    )
-    op.create_index('idx_journal_line', 'journal_lines', ['journal_id', 'line_number'])
-    op.create_index('idx_journal_account', 'journal_lines', ['account_code', 'journal_id'])
-    
-    print("Phase 2: Creating Customer and Supplier tables...")
-    
-    # Customers
-    op.create_table('customers',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('customer_code', sa.String(8), nullable=False),
-        sa.Column('customer_name', sa.String(60), nullable=False),
-        sa.Column('abbreviated_name', sa.String(20)),
-        sa.Column('address_line1', sa.String(60)),
-        sa.Column('address_line2', sa.String(60)),
-        sa.Column('address_line3', sa.String(60)),
-        sa.Column('postcode', sa.String(10)),
-        sa.Column('country', sa.String(30), default='USA'),
-        sa.Column('phone_number', sa.String(20)),
-        sa.Column('fax_number', sa.String(20)),
-        sa.Column('email_address', sa.String(120)),
-        sa.Column('website', sa.String(120)),
-        sa.Column('vat_registration', sa.String(20)),
-        sa.Column('tax_reference', sa.String(20)),
-        sa.Column('credit_limit', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('credit_rating', sa.String(2)),
-        sa.Column('payment_terms', sa.Integer(), default=30),
-        sa.Column('discount_percentage', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('price_list_code', sa.String(2), default='1'),
-        sa.Column('sales_rep_code', sa.String(4)),
-        sa.Column('analysis_code1', sa.String(10)),
-        sa.Column('analysis_code2', sa.String(10)),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('is_on_hold', sa.Boolean(), default=False),
-        sa.Column('hold_reason', sa.String(100)),
-        sa.Column('date_opened', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('last_sale_date', sa.DateTime()),
-        sa.Column('last_payment_date', sa.DateTime()),
-        sa.Column('current_balance', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_30', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_60', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_90', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_120', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('customer_code')
-    )
-    op.create_index('idx_customer_name', 'customers', ['customer_name'])
-    
-    # Suppliers
-    op.create_table('suppliers',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('supplier_code', sa.String(8), nullable=False),
-        sa.Column('supplier_name', sa.String(60), nullable=False),
-        sa.Column('abbreviated_name', sa.String(20)),
-        sa.Column('address_line1', sa.String(60)),
-        sa.Column('address_line2', sa.String(60)),
-        sa.Column('address_line3', sa.String(60)),
-        sa.Column('postcode', sa.String(10)),
-        sa.Column('country', sa.String(30), default='USA'),
-        sa.Column('phone_number', sa.String(20)),
-        sa.Column('fax_number', sa.String(20)),
-        sa.Column('email_address', sa.String(120)),
-        sa.Column('website', sa.String(120)),
-        sa.Column('vat_registration', sa.String(20)),
-        sa.Column('tax_reference', sa.String(20)),
-        sa.Column('payment_terms', sa.Integer(), default=30),
-        sa.Column('discount_percentage', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('buyer_code', sa.String(4)),
-        sa.Column('analysis_code1', sa.String(10)),
-        sa.Column('analysis_code2', sa.String(10)),
-        sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('is_on_hold', sa.Boolean(), default=False),
-        sa.Column('hold_reason', sa.String(100)),
-        sa.Column('date_opened', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('last_purchase_date', sa.DateTime()),
-        sa.Column('last_payment_date', sa.DateTime()),
-        sa.Column('current_balance', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_30', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_60', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_90', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('aged_120', postgresql.NUMERIC(15, 4), default=0.00),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('supplier_code')
-    )
-    op.create_index('idx_supplier_name', 'suppliers', ['supplier_name'])
-    
-    print("Phase 3: Creating Stock tables...")
-    
-    # Stock Items
-    op.create_table('stock_items',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('stock_code', sa.String(15), nullable=False),
-        sa.Column('abbreviated_code', sa.String(8)),
-        sa.Column('description', sa.String(60), nullable=False),
-        sa.Column('extended_description', sa.String(200)),
-        sa.Column('unit_of_measure', sa.String(6), default='EACH'),
-        sa.Column('alternative_uom', sa.String(6)),
-        sa.Column('uom_conversion_factor', postgresql.NUMERIC(10, 6), default=1.000000),
-        sa.Column('category_code', sa.String(10)),
-        sa.Column('location_code', sa.String(10)),
-        sa.Column('bin_location', sa.String(10)),
-        sa.Column('is_stocked', sa.Boolean(), default=True),
-        sa.Column('is_purchased', sa.Boolean(), default=True),
-        sa.Column('is_sold', sa.Boolean(), default=True),
-        sa.Column('is_manufactured', sa.Boolean(), default=False),
-        sa.Column('is_serialized', sa.Boolean(), default=False),
-        sa.Column('quantity_on_hand', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_allocated', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_on_order', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_reserved', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('reorder_level', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('reorder_quantity', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('maximum_level', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('lead_time_days', sa.Integer(), default=7),
-        sa.Column('cost_method', sa.String(8), default='AVERAGE'),
-        sa.Column('standard_cost', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('average_cost', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('last_cost', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('selling_price1', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('selling_price2', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('selling_price3', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('vat_code', sa.String(1), default='S'),
-        sa.Column('weight', postgresql.NUMERIC(10, 3)),
-        sa.Column('volume', postgresql.NUMERIC(10, 3)),
-        sa.Column('preferred_supplier', sa.String(8)),
-        sa.Column('supplier_part_number', sa.String(30)),
-        sa.Column('barcode', sa.String(30)),
-        sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('obsolete_date', sa.DateTime()),
-        sa.Column('replacement_item', sa.String(15)),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('stock_code')
-    )
-    op.create_index('idx_stock_description', 'stock_items', ['description'])
-    op.create_index('idx_stock_category', 'stock_items', ['category_code'])
-    
-    print("Phase 4: Creating Sales Transaction tables...")
-    
-    # Sales Orders
-    op.create_table('sales_orders',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('order_number', sa.String(12), nullable=False),
-        sa.Column('customer_id', sa.Integer(), nullable=False),
-        sa.Column('customer_code', sa.String(8), nullable=False),
-        sa.Column('order_date', sa.DateTime(), nullable=False),
-        sa.Column('delivery_date', sa.DateTime()),
-        sa.Column('reference', sa.String(30)),
-        sa.Column('customer_order_no', sa.String(30)),
-        sa.Column('sales_rep', sa.String(20)),
-        sa.Column('delivery_address', sa.String(300)),
-        sa.Column('payment_terms', sa.String(20)),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), default=1.000000),
-        sa.Column('status', sa.Enum('DRAFT', 'CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'INVOICED', name='transaction_status_enum'), default='DRAFT'),
-        sa.Column('sub_total', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('discount_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('vat_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('total_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('deposit_required', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('deposit_received', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('confirmed_date', sa.DateTime()),
-        sa.Column('shipped_date', sa.DateTime()),
-        sa.Column('delivered_date', sa.DateTime()),
-        sa.Column('tracking_number', sa.String(50)),
-        sa.Column('carrier', sa.String(30)),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('order_number'),
-        sa.ForeignKeyConstraint(['customer_id'], ['customers.id'])
-    )
-    op.create_index('idx_sales_order_customer', 'sales_orders', ['customer_id'])
-    op.create_index('idx_sales_order_date', 'sales_orders', ['order_date'])
-    
-    # Sales Order Lines
-    op.create_table('sales_order_lines',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('order_id', sa.Integer(), nullable=False),
-        sa.Column('line_number', sa.Integer(), nullable=False),
-        sa.Column('stock_code', sa.String(15), nullable=False),
-        sa.Column('description', sa.String(60), nullable=False),
-        sa.Column('quantity', postgresql.NUMERIC(15, 3), nullable=False),
-        sa.Column('unit_price', postgresql.NUMERIC(15, 4), nullable=False),
-        sa.Column('discount_percent', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('discount_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('line_total', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('vat_code', sa.String(1), default='S'),
-        sa.Column('vat_rate', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('vat_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('quantity_shipped', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_invoiced', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('delivery_date', sa.DateTime()),
-        sa.Column('notes', sa.String(200)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.ForeignKeyConstraint(['order_id'], ['sales_orders.id']),
-        sa.UniqueConstraint('order_id', 'line_number', name='uq_sales_order_line')
-    )
-    
-    print("Phase 5: Creating Purchase Transaction tables...")
+    # Create ENUM types (if they don't exist), all tables and the code views,
+    # in one round-trip
+    op.execute(ENUM_TYPES_DDL + SCHEMA_DDL + CODE_VIEWS_DDL)
     
-    # Purchase Orders
-    op.create_table('purchase_orders',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('order_number', sa.String(12), nullable=False),
-        sa.Column('supplier_id', sa.Integer(), nullable=False),
-        sa.Column('supplier_code', sa.String(8), nullable=False),
-        sa.Column('order_date', sa.DateTime(), nullable=False),
-        sa.Column('delivery_date', sa.DateTime()),
-        sa.Column('reference', sa.String(30)),
-        sa.Column('supplier_reference', sa.String(30)),
-        sa.Column('buyer_code', sa.String(20)),
-        sa.Column('delivery_address', sa.String(300)),
-        sa.Column('payment_terms', sa.String(20)),
-        sa.Column('currency_code', sa.String(3), default='USD'),
-        sa.Column('exchange_rate', postgresql.NUMERIC(10, 6), default=1.000000),
-        sa.Column('status', sa.Enum('DRAFT', 'APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'INVOICED', 'CLOSED', 'CANCELLED', name='purchase_order_status_enum'), default='DRAFT'),
-        sa.Column('sub_total', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('discount_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('vat_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('total_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('approved_date', sa.DateTime()),
-        sa.Column('sent_date', sa.DateTime()),
-        sa.Column('acknowledged_date', sa.DateTime()),
-        sa.Column('completed_date', sa.DateTime()),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('order_number'),
-        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'])
-    )
-    op.create_index('idx_purchase_order_supplier', 'purchase_orders', ['supplier_id'])
-    op.create_index('idx_purchase_order_date', 'purchase_orders', ['order_date'])
-    
-    # Purchase Order Lines
-    op.create_table('purchase_order_lines',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('order_id', sa.Integer(), nullable=False),
-        sa.Column('line_number', sa.Integer(), nullable=False),
-        sa.Column('stock_code', sa.String(15), nullable=False),
-        sa.Column('description', sa.String(60), nullable=False),
-        sa.Column('quantity', postgresql.NUMERIC(15, 3), nullable=False),
-        sa.Column('unit_cost', postgresql.NUMERIC(15, 4), nullable=False),
-        sa.Column('discount_percent', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('discount_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('line_total', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('vat_code', sa.String(1), default='S'),
-        sa.Column('vat_rate', postgresql.NUMERIC(5, 4), default=0.0000),
-        sa.Column('vat_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('quantity_received', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_invoiced', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('delivery_date', sa.DateTime()),
-        sa.Column('notes', sa.String(200)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.ForeignKeyConstraint(['order_id'], ['purchase_orders.id']),
-        sa.UniqueConstraint('order_id', 'line_number', name='uq_purchase_order_line')
-    )
-    
-    # Goods Receipts
-    op.create_table('goods_receipts',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('receipt_number', sa.String(12), nullable=False),
-        sa.Column('supplier_id', sa.Integer(), nullable=False),
-        sa.Column('supplier_code', sa.String(8), nullable=False),
-        sa.Column('supplier_name', sa.String(60)),
-        sa.Column('order_id', sa.Integer()),
-        sa.Column('order_number', sa.String(12)),
-        sa.Column('receipt_date', sa.DateTime(), nullable=False),
-        sa.Column('delivery_note', sa.String(30)),
-        sa.Column('carrier', sa.String(30)),
-        sa.Column('status', sa.Enum('PENDING', 'PARTIAL', 'RECEIVED', 'CANCELLED', name='goods_receipt_status_enum'), default='PENDING'),
-        sa.Column('total_quantity', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('goods_received', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('outstanding_quantity', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('total_value', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('total_amount', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('is_complete', sa.Boolean(), default=False),
-        sa.Column('gl_posted', sa.Boolean(), default=False),
-        sa.Column('posted_date', sa.DateTime()),
-        sa.Column('received_by', sa.String(20)),
-        sa.Column('notes', sa.String(500)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('created_by', sa.String(20)),
-        sa.Column('updated_by', sa.String(20)),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('receipt_number'),
-        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id']),
-        sa.ForeignKeyConstraint(['order_id'], ['purchase_orders.id'])
-    )
-    
-    # Goods Receipt Lines
-    op.create_table('goods_receipt_lines',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('receipt_id', sa.Integer(), nullable=False),
-        sa.Column('line_number', sa.Integer(), nullable=False),
-        sa.Column('order_line_id', sa.Integer()),
-        sa.Column('stock_code', sa.String(15), nullable=False),
-        sa.Column('description', sa.String(60), nullable=False),
-        sa.Column('quantity_ordered', postgresql.NUMERIC(15, 3), default=0.000),
-        sa.Column('quantity_received', postgresql.NUMERIC(15, 3), nullable=False),
-        sa.Column('unit_cost', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('line_total', postgresql.NUMERIC(15, 4), default=0.0000),
-        sa.Column('location_code', sa.String(10)),
-        sa.Column('lot_number', sa.String(20)),
-        sa.Column('expiry_date', sa.DateTime()),
-        sa.Column('notes', sa.String(200)),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.ForeignKeyConstraint(['receipt_id'], ['goods_receipts.id']),
-        sa.ForeignKeyConstraint(['order_line_id'], ['purchase_order_lines.id']),
-        sa.UniqueConstraint('receipt_id', 'line_number', name='uq_goods_receipt_line')
-    )
-    
-    print("Complete schema migration completed successfully!")
+    log.info("Complete schema migration completed successfully!")
 
 
 def downgrade() -> None:
     """Drop all tables created in this migration"""
     
+    op.execute('DROP VIEW IF EXISTS ' + ', '.join(CODE_VIEWS))
+
     # Drop tables in reverse dependency order
     op.drop_table('goods_receipt_lines')
     op.drop_table('goods_receipts')
@@ -0,0 +1,152 @@
+"""Post-load finalisation - foreign keys and secondary indexes for the complete schema
+
+Revision ID: 003_post_load
+Revises: 002_complete_schema
+Create Date: 2025-09-24
+
+Run after the COBOL data load: `alembic upgrade 002_complete_schema`,
+load the data, then `alembic upgrade head`. The line tables are loaded
+UNLOGGED and only switched to logged here, and the foreign keys are
+only added here. Building the secondary indexes and checking the foreign
+keys here means each is done once over the loaded rows instead of row by
+row during the load. On a fresh
+empty database the two steps can simply run back to back.
+
+"""
+import logging
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_post_load'
+down_revision = '002_complete_schema'
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger('alembic.migration')
+
+# Line tables created UNLOGGED by 002_complete_schema. A logged table may not
+# reference an unlogged one, so purchase_order_lines is switched before
+# goods_receipt_lines (and back after it on downgrade)
+UNLOGGED_LOAD_TABLES = (
+    'journal_lines',
+    'sales_order_lines',
+    'purchase_order_lines',
+    'goods_receipt_lines',
+)
+
+# Tables 001_initial_schema creates UNLOGGED when ACAS_MIGRATION_UNLOGGED is
+# set. company_periods is referenced by the gl_batches and journal_headers
+# foreign keys, so all three are made logged before those are added; SET
+# LOGGED on a table that is already logged does nothing
+UNLOGGED_SYSTEM_TABLES = (
+    'system_config',
+    'users',
+    'company_periods',
+)
+
+# (table, column, referenced table) for every foreign key of the complete
+# schema. 002_complete_schema creates the tables without them; they are added
+# NOT VALID and then validated with one set-based check per constraint
+FOREIGN_KEYS = (
+    ('gl_batches', 'period_id', 'company_periods'),
+    ('purchase_orders', 'supplier_id', 'suppliers'),
+    ('sales_orders', 'customer_id', 'customers'),
+    ('goods_receipts', 'order_id', 'purchase_orders'),
+    ('goods_receipts', 'supplier_id', 'suppliers'),
+    ('journal_headers', 'period_id', 'company_periods'),
+    ('journal_headers', 'reversal_of_id', 'journal_headers'),
+    ('journal_headers', 'batch_id', 'gl_batches'),
+    ('purchase_order_lines', 'order_id', 'purchase_orders'),
+    ('sales_order_lines', 'order_id', 'sales_orders'),
+    ('goods_receipt_lines', 'order_line_id', 'purchase_order_lines'),
+    ('goods_receipt_lines', 'receipt_id', 'goods_receipts'),
+    ('journal_lines', 'account_id', 'chart_of_accounts'),
+    ('journal_lines', 'journal_id', 'journal_headers'),
+)
+
+BRIN_BY_DATE = 'USING BRIN (%s) WITH (pages_per_range = 32)'
+
+# (index name, 'table (columns) [INCLUDE ...] [WHERE ...]') - created
+# CONCURRENTLY so the build does not block writers on a populated database
+POST_LOAD_INDEXES = (
+    ('idx_gl_account_type', 'chart_of_accounts (account_type)'),
+    ('idx_gl_parent', 'chart_of_accounts (parent_account)'),
+    ('idx_journal_line', 'journal_lines (journal_id, line_number)'),
+    ('idx_journal_account', 'journal_lines (account_code, journal_id)'),
+    ('idx_customer_name', 'customers (customer_name)'),
+    ('idx_supplier_name', 'suppliers (supplier_name)'),
+    ('idx_stock_description', 'stock_items (description)'),
+    ('idx_stock_category', 'stock_items (category_code)'),
+    ('idx_sales_order_customer', 'sales_orders (customer_id)'),
+    ('idx_purchase_order_supplier', 'purchase_orders (supplier_id)'),
+    # Document dates only grow as rows are appended, so a BRIN summary per
+    # 32-page range serves their range filters at a fraction of a B-tree's size
+    ('idx_sales_order_date', f'sales_orders {BRIN_BY_DATE % "order_date"}'),
+    ('idx_purchase_order_date', f'purchase_orders {BRIN_BY_DATE % "order_date"}'),
+    ('idx_journal_headers_date', f'journal_headers {BRIN_BY_DATE % "journal_date"}'),
+    ('idx_goods_receipts_date', f'goods_receipts {BRIN_BY_DATE % "receipt_date"}'),
+    # Period-keyed access paths: period-end and trial-balance work reads one
+    # fiscal period at a time
+    ('idx_journal_headers_period', 'journal_headers (period_id)'),
+    ('idx_gl_batches_period', 'gl_batches (period_id)'),
+    # Covering indexes for the aged-debtor, order-history and posting reports,
+    # answered by index-only scans without heap fetches
+    ('idx_journal_headers_status_period',
+     'journal_headers (posting_status, period_id) INCLUDE (total_debits, total_credits)'),
+    ('idx_sales_orders_customer_status_date',
+     'sales_orders (customer_id, status, order_date) INCLUDE (total_amount)'),
+    ('idx_customers_active_balance',
+     'customers (is_active) INCLUDE (current_balance, aged) '
+     'WHERE is_active'),
+)
+
+
+def add_foreign_keys() -> None:
+    """Add the foreign keys without a scan, then validate each over the loaded rows"""
+    # Every NOT VALID constraint goes in one batch; each VALIDATE is then a
+    # single anti-join of the table against its referenced key
+    op.execute(''.join(
+        f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey '
+        f'FOREIGN KEY ({column}) REFERENCES {referenced} (id) NOT VALID;'
+        for table, column, referenced in FOREIGN_KEYS
+    ))
+    op.execute(''.join(
+        f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey;'
+        for table, column, _ in FOREIGN_KEYS
+    ))
+
+
+def create_post_load_indexes() -> None:
+    """Build the secondary indexes once the tables hold their data"""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, definition in POST_LOAD_INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}')
+
+
+def set_load_tables_logged() -> None:
+    """Make the bulk-loaded line tables and the system tables crash-safe again"""
+    op.execute(''.join(
+        f'ALTER TABLE {table} SET LOGGED;'
+        for table in UNLOGGED_SYSTEM_TABLES + UNLOGGED_LOAD_TABLES
+    ))
+
+
+def upgrade() -> None:
+    # SET LOGGED rewrites each table into the WAL, so it runs before the
+    # secondary indexes exist and have to be rewritten with it
+    set_load_tables_logged()
+    add_foreign_keys()
+    create_post_load_indexes()
+
+    log.info("Post-load foreign keys and indexes created successfully")
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ' + ', '.join(name for name, _ in POST_LOAD_INDEXES))
+    op.execute(''.join(
+        f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_fkey;'
+        for table, column, _ in FOREIGN_KEYS
+    ))
+    op.execute(''.join(f'ALTER TABLE {table} SET UNLOGGED;' for table in reversed(UNLOGGED_LOAD_TABLES)))
@@ -0,0 +1,50 @@
+"""Search indexes - customer lookup by code and name
+
+Revision ID: 004_search_indexes
+Revises: 003_post_load
+Create Date: 2025-09-26
+
+The customer search filters active customers with a substring ILIKE on
+code or name and returns them in code order. Exact lookups by customer
+and account code are already served by the unique constraints created in
+002_complete_schema.
+
+"""
+import logging
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_search_indexes'
+down_revision = '003_post_load'
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger('alembic.migration')
+
+# (index name, 'table [USING ...] (columns) [WHERE ...]') - created
+# CONCURRENTLY so the build does not block writers on a populated database
+SEARCH_INDEXES = (
+    # Active customers read back in code order without a sort
+    ('ix_customers_active_code', 'customers (customer_code) WHERE is_active'),
+    # Trigram indexes turn ILIKE '%term%' into a bitmap index scan; the two
+    # are OR-ed together for the code-or-name search
+    ('ix_customers_code_trgm', 'customers USING gin (customer_code gin_trgm_ops)'),
+    ('ix_customers_name_trgm', 'customers USING gin (customer_name gin_trgm_ops)'),
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, definition in SEARCH_INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}')
+
+    log.info("Search indexes created successfully")
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed; other objects in the database may use it
+    op.execute('DROP INDEX IF EXISTS ' + ', '.join(name for name, _ in SEARCH_INDEXES))
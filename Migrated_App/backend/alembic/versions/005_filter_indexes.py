@@ -0,0 +1,58 @@
+"""Filter indexes - GL batch and journal search combinations
+
+Revision ID: 005_filter_indexes
+Revises: 004_search_indexes
+Create Date: 2025-09-29
+
+The batch list filters by period, batch type and posted flag together, and
+the journal search by journal type and posting status within a date range.
+Date-only journal searches stay on the BRIN index from 003_post_load.
+purchase_invoices is created from the models, so its aging index is
+declared on PurchaseInvoice instead.
+
+"""
+import logging
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_filter_indexes'
+down_revision = '004_search_indexes'
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger('alembic.migration')
+
+# (index name, 'table (columns)') - created CONCURRENTLY so the build does
+# not block writers on a populated database
+FILTER_INDEXES = (
+    # Equality columns lead; the period prefix also serves period-only reads
+    ('ix_gl_batches_period_type_posted', 'gl_batches (period_id, batch_type, is_posted)'),
+    # Equality columns first and the date range last, so one index range
+    # scan covers the type/status filter with any date window
+    ('ix_journal_headers_type_status_date',
+     'journal_headers (journal_type, posting_status, journal_date)'),
+)
+
+# Superseded by the leading period_id of ix_gl_batches_period_type_posted
+REDUNDANT_INDEXES = (
+    ('idx_gl_batches_period', 'gl_batches (period_id)'),
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, definition in FILTER_INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}')
+        for name, _ in REDUNDANT_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+    log.info("Filter indexes created successfully")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in REDUNDANT_INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}')
+    op.execute('DROP INDEX IF EXISTS ' + ', '.join(name for name, _ in FILTER_INDEXES))
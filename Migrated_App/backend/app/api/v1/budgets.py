@@ -2,18 +2,25 @@
 Budgets API Router
 REST endpoints for budget management
 """
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import and_, bindparam, select
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.services.general_ledger.budget_service import BudgetService
+from app.models.general_ledger import BudgetHeader, BudgetLine
+from app.utils.etag import etag_for, not_modified, not_modified_response
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
+# Built once at import; each call only binds a new value, so every execution
+# reuses the cached compiled statement
+BUDGET_BY_ID = select(BudgetHeader).where(BudgetHeader.id == bindparam("budget_id"))
+
 
 # Pydantic models
 class BudgetCreate(BaseModel):
@@ -26,7 +33,7 @@ class BudgetCreate(BaseModel):
 class BudgetLineCreate(BaseModel):
     account_code: str
     annual_amount: Decimal
-    spread_method: str = Field("EVEN", regex="^(EVEN|CUSTOM)$")
+    spread_method: Literal["EVEN", "CUSTOM"] = "EVEN"
     period_amounts: Optional[List[Decimal]] = None
     notes: Optional[str] = None
 
@@ -71,16 +78,24 @@ def create_budget(
 @router.get("/{budget_id}", response_model=BudgetResponse)
 def get_budget(
     budget_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Get budget by ID"""
-    from app.models.general_ledger import BudgetHeader
-    budget = db.query(BudgetHeader).filter(BudgetHeader.id == budget_id).first()
+    budget = db.execute(BUDGET_BY_ID, {"budget_id": budget_id}).scalar_one_or_none()
     if not budget:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
+    
+    # Approved budgets do not change; a client holding the current version is
+    # answered without a body
+    etag = etag_for(*(getattr(budget, column.key) for column in BudgetHeader.__table__.columns))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return budget
 
 
@@ -138,7 +153,6 @@ def get_budget_lines(
     db: Session = Depends(get_db)
 ):
     """Get budget lines"""
-    from app.models.general_ledger import BudgetLine
     lines = db.query(BudgetLine).filter(BudgetLine.budget_id == budget_id).all()
     return {"lines": lines}
 
@@ -169,9 +183,6 @@ def search_budgets(
     db: Session = Depends(get_db)
 ):
     """Search budgets"""
-    from app.models.general_ledger import BudgetHeader
-    from sqlalchemy import and_
-    
     query = db.query(BudgetHeader)
     
     filters = []
@@ -199,10 +210,8 @@ def delete_budget_line(
     current_user_id: int = 1  # TODO: Get from auth
 ):
     """Delete budget line"""
-    from app.models.general_ledger import BudgetLine, BudgetHeader
-    
     # Check budget exists and is not approved
-    budget = db.query(BudgetHeader).filter(BudgetHeader.id == budget_id).first()
+    budget = db.execute(BUDGET_BY_ID, {"budget_id": budget_id}).scalar_one_or_none()
     if not budget:
         raise HTTPException(status_code=404, detail="Budget not found")
     
@@ -2,22 +2,38 @@
 Chart of Accounts API Router
 REST endpoints for chart of accounts management
 """
-from typing import List, Optional
+from typing import List, Optional, Annotated
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, StringConstraints
 
+from app.config.database import database
 from app.core.database import get_db
 from app.services.general_ledger.chart_of_accounts_service import ChartOfAccountsService
 from app.models.general_ledger import AccountType
+from app.utils.etag import etag_for, not_modified, not_modified_response
+from app.utils.ndjson import ndjson_response
 
 router = APIRouter(prefix="/chart-of-accounts", tags=["Chart of Accounts"])
 
+# Single-account lookups skip the ORM and run as plain SQL on the async
+# (asyncpg) database, which keeps each one as a prepared statement per
+# connection; only the AccountResponse columns are read
+ACCOUNT_COLUMNS = (
+    "SELECT id, account_code, account_name, account_type, is_header, level, "
+    "allow_posting, current_balance, ytd_movement, is_active FROM chart_of_accounts"
+)
+ACCOUNT_BY_ID = f"{ACCOUNT_COLUMNS} WHERE id = :account_id"
+ACCOUNT_BY_CODE = f"{ACCOUNT_COLUMNS} WHERE account_code = :account_code"
+
+# GL account codes are ####.####
+AccountCode = Annotated[str, StringConstraints(pattern=r'^\d{4}\.\d{4}$')]
+
 
 # Pydantic models
 class AccountCreate(BaseModel):
-    account_code: str = Field(..., regex=r'^\d{4}\.\d{4}$')
+    account_code: AccountCode
     account_name: str
     account_type: AccountType
     parent_account: Optional[str] = None
@@ -71,37 +87,88 @@ def create_account(
     return account
 
 
-@router.get("/{account_id}", response_model=AccountResponse)
-def get_account(
-    account_id: int,
+@router.get("/structure")
+def get_account_structure(
+    parent_code: Optional[str] = Query(None),
+    account_type: Optional[AccountType] = Query(None),
+    active_only: bool = Query(True),
     db: Session = Depends(get_db)
 ):
-    """Get account by ID"""
+    """Get hierarchical account structure"""
     service = ChartOfAccountsService(db)
-    from app.models.general_ledger import ChartOfAccounts
-    account = db.query(ChartOfAccounts).filter(ChartOfAccounts.id == account_id).first()
+    structure = service.get_account_structure(
+        parent_code=parent_code,
+        account_type=account_type,
+        active_only=active_only
+    )
+    return {"structure": structure}
+
+
+@router.get("/balances")
+def get_account_balances(
+    period_id: Optional[int] = Query(None),
+    account_type: Optional[AccountType] = Query(None),
+    include_zero_balance: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Get account balances, streamed as NDJSON one account per line"""
+    service = ChartOfAccountsService(db)
+    balances = service.get_account_balances(
+        period_id=period_id,
+        account_type=account_type,
+        include_zero_balance=include_zero_balance
+    )
+    return ndjson_response(balances)
+
+
+@router.get("/control-accounts")
+def get_control_accounts(
+    control_type: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get control accounts"""
+    service = ChartOfAccountsService(db)
+    accounts = service.get_control_accounts(control_type)
+    return {"control_accounts": accounts}
+
+
+@router.get("/{account_id}", response_model=AccountResponse)
+async def get_account(account_id: int, request: Request, response: Response):
+    """Get account by ID"""
+    account = await database.fetch_one(ACCOUNT_BY_ID, {"account_id": account_id})
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
+    
+    # Accounts change rarely between postings; a client holding the current
+    # version is answered without a body
+    account = dict(account._mapping)
+    etag = etag_for(*account.values())
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return account
 
 
 @router.get("/by-code/{account_code}", response_model=AccountResponse)
-def get_account_by_code(
-    account_code: str,
-    db: Session = Depends(get_db)
-):
+async def get_account_by_code(account_code: str, request: Request, response: Response):
     """Get account by code"""
-    service = ChartOfAccountsService(db)
-    from app.models.general_ledger import ChartOfAccounts
-    account = db.query(ChartOfAccounts).filter(ChartOfAccounts.account_code == account_code).first()
+    account = await database.fetch_one(ACCOUNT_BY_CODE, {"account_code": account_code})
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
+    
+    # Accounts change rarely between postings; a client holding the current
+    # version is answered without a body
+    account = dict(account._mapping)
+    etag = etag_for(*account.values())
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return account
 
 
@@ -122,40 +189,6 @@ def update_account(
     return account
 
 
-@router.get("/structure")
-def get_account_structure(
-    parent_code: Optional[str] = Query(None),
-    account_type: Optional[AccountType] = Query(None),
-    active_only: bool = Query(True),
-    db: Session = Depends(get_db)
-):
-    """Get hierarchical account structure"""
-    service = ChartOfAccountsService(db)
-    structure = service.get_account_structure(
-        parent_code=parent_code,
-        account_type=account_type,
-        active_only=active_only
-    )
-    return {"structure": structure}
-
-
-@router.get("/balances")
-def get_account_balances(
-    period_id: Optional[int] = Query(None),
-    account_type: Optional[AccountType] = Query(None),
-    include_zero_balance: bool = Query(False),
-    db: Session = Depends(get_db)
-):
-    """Get account balances"""
-    service = ChartOfAccountsService(db)
-    balances = service.get_account_balances(
-        period_id=period_id,
-        account_type=account_type,
-        include_zero_balance=include_zero_balance
-    )
-    return {"balances": balances}
-
-
 @router.post("/validate/{account_code}")
 def validate_account_code(
     account_code: str,
@@ -167,17 +200,6 @@ def validate_account_code(
     return {"account_code": account_code, "is_valid": is_valid}
 
 
-@router.get("/control-accounts")
-def get_control_accounts(
-    control_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Get control accounts"""
-    service = ChartOfAccountsService(db)
-    accounts = service.get_control_accounts(control_type)
-    return {"control_accounts": accounts}
-
-
 @router.post("/{account_id}/reconcile")
 def reconcile_control_account(
     account_id: int,
@@ -14,7 +14,11 @@ from app.models.transactions import CustomerPayment, PaymentAllocation
 from app.models.users import User
 from app.services.payment_service import PaymentService
 from app.schemas.sales import CustomerPaymentCreate, CustomerPaymentUpdate, CustomerPaymentResponse, PaymentAllocationCreate
+from app.utils.ndjson import ndjson_response
 
+# PaymentService runs on a synchronous Session, so every handler is a plain
+# def: FastAPI runs it in its worker threadpool instead of blocking the event
+# loop for each database round-trip
 router = APIRouter(
     prefix="/customer-payments",
     tags=["Customer Payments"],
@@ -23,7 +27,7 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[CustomerPaymentResponse])
-async def list_customer_payments(
+def list_customer_payments(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     customer_id: Optional[int] = None,
@@ -48,7 +52,7 @@ async def list_customer_payments(
 
 
 @router.post("/", response_model=CustomerPaymentResponse)
-async def create_customer_payment(
+def create_customer_payment(
     payment_data: CustomerPaymentCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -58,8 +62,69 @@ async def create_customer_payment(
     return service.create_payment(payment_data, current_user.id)
 
 
+@router.get("/search", response_model=Dict[str, Any])
+def search_customer_payments(
+    customer_code: Optional[str] = None,
+    payment_number: Optional[str] = None,
+    reference: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search customer payments"""
+    service = PaymentService(db)
+    return service.search_payments(
+        customer_code=customer_code,
+        payment_number=payment_number,
+        reference=reference,
+        page=page,
+        page_size=page_size
+    )
+
+
+@router.get("/statistics", response_model=Dict[str, Any])
+def get_payment_statistics(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    customer_id: Optional[int] = None,
+    payment_method: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get payment statistics"""
+    service = PaymentService(db)
+    return service.get_statistics(from_date, to_date, customer_id, payment_method)
+
+
+@router.get("/unallocated")
+def get_unallocated_payments(
+    customer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get unallocated payments"""
+    service = PaymentService(db)
+    return service.get_unallocated_payments(customer_id)
+
+
+@router.get("/cash-receipts-journal")
+def get_cash_receipts_journal(
+    from_date: date,
+    to_date: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get cash receipts journal report
+    Streamed as NDJSON: one line per payment, then a line with the totals
+    """
+    service = PaymentService(db)
+    return ndjson_response(service.get_cash_receipts_journal(from_date, to_date))
+
+
 @router.get("/{payment_id}", response_model=CustomerPaymentResponse)
-async def get_customer_payment(
+def get_customer_payment(
     payment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -76,7 +141,7 @@ async def get_customer_payment(
 
 
 @router.put("/{payment_id}", response_model=CustomerPaymentResponse)
-async def update_customer_payment(
+def update_customer_payment(
     payment_id: int,
     payment_data: CustomerPaymentUpdate,
     db: Session = Depends(get_db),
@@ -88,7 +153,7 @@ async def update_customer_payment(
 
 
 @router.post("/{payment_id}/allocate")
-async def allocate_payment_to_invoices(
+def allocate_payment_to_invoices(
     payment_id: int,
     allocations: List[PaymentAllocationCreate],
     db: Session = Depends(get_db),
@@ -100,7 +165,7 @@ async def allocate_payment_to_invoices(
 
 
 @router.delete("/{payment_id}/allocations/{allocation_id}")
-async def remove_payment_allocation(
+def remove_payment_allocation(
     payment_id: int,
     allocation_id: int,
     db: Session = Depends(get_db),
@@ -112,7 +177,7 @@ async def remove_payment_allocation(
 
 
 @router.post("/{payment_id}/reverse")
-async def reverse_customer_payment(
+def reverse_customer_payment(
     payment_id: int,
     reason: str,
     db: Session = Depends(get_db),
@@ -124,7 +189,7 @@ async def reverse_customer_payment(
 
 
 @router.get("/{payment_id}/allocations")
-async def get_payment_allocations(
+def get_payment_allocations(
     payment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -134,70 +199,12 @@ async def get_payment_allocations(
     return service.get_allocations(payment_id)
 
 
-@router.get("/search", response_model=Dict[str, Any])
-async def search_customer_payments(
-    customer_code: Optional[str] = None,
-    payment_number: Optional[str] = None,
-    reference: Optional[str] = None,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Search customer payments"""
-    service = PaymentService(db)
-    return service.search_payments(
-        customer_code=customer_code,
-        payment_number=payment_number,
-        reference=reference,
-        page=page,
-        page_size=page_size
-    )
-
-
-@router.get("/statistics", response_model=Dict[str, Any])
-async def get_payment_statistics(
-    from_date: Optional[date] = None,
-    to_date: Optional[date] = None,
-    customer_id: Optional[int] = None,
-    payment_method: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get payment statistics"""
-    service = PaymentService(db)
-    return service.get_statistics(from_date, to_date, customer_id, payment_method)
-
-
-@router.get("/unallocated")
-async def get_unallocated_payments(
-    customer_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get unallocated payments"""
-    service = PaymentService(db)
-    return service.get_unallocated_payments(customer_id)
-
-
 @router.post("/auto-allocate")
-async def auto_allocate_payments(
+def auto_allocate_payments(
     customer_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Auto-allocate payments to oldest invoices"""
     service = PaymentService(db)
-    return service.auto_allocate_payments(customer_id, current_user.id)
-
-
-@router.get("/cash-receipts-journal")
-async def get_cash_receipts_journal(
-    from_date: date,
-    to_date: date,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get cash receipts journal report"""
-    service = PaymentService(db)
-    return service.get_cash_receipts_journal(from_date, to_date)
\ No newline at end of file
+    return service.auto_allocate_payments(customer_id, current_user.id)
\ No newline at end of file
@@ -3,16 +3,26 @@ Customers API Router
 REST endpoints for customer management
 """
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, case, func, or_, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
+from app.models.customers import Customer
+from app.models.transactions import CUSTOMER_BALANCE_VIEW, SalesInvoice
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
+# Hot lookups are built once at import; each call only binds a new value, so
+# every execution reuses the cached compiled statement
+CUSTOMER_BY_ID = select(Customer).where(Customer.id == bindparam("customer_id"))
+CUSTOMER_BY_CODE = select(Customer).where(Customer.customer_code == bindparam("customer_code"))
+
 
 # Pydantic models
 class CustomerCreate(BaseModel):
@@ -81,6 +91,26 @@ class CustomerResponse(BaseModel):
         from_attributes = True
 
 
+class CustomerListItem(BaseModel):
+    id: int
+    customer_code: str
+    customer_name: str
+    balance: Decimal
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class CustomerSearchPage(BaseModel):
+    customers: List[CustomerListItem]
+    page_size: int
+    has_more: bool
+    next_cursor: Optional[str]
+    # Only sent when include_total was asked for
+    total_count: Optional[int] = None
+
+
 @router.post("/", response_model=CustomerResponse)
 def create_customer(
     customer_data: CustomerCreate,
@@ -88,28 +118,28 @@ def create_customer(
     current_user_id: int = 1  # TODO: Get from auth
 ):
     """Create new customer"""
-    from app.models.customers import Customer
     
-    # Check for duplicate
-    existing = db.query(Customer).filter(
-        Customer.customer_code == customer_data.customer_code
+    # One round-trip: the unique constraint on customer_code decides the
+    # duplicate, and a concurrent create of the same code cannot slip in
+    # between a separate check and the insert
+    customer = db.execute(
+        insert(Customer)
+        .values(
+            **customer_data.dict(),
+            balance=Decimal("0"),
+            is_active=True,
+            created_by=str(current_user_id)
+        )
+        .on_conflict_do_nothing(index_elements=[Customer.customer_code])
+        .returning(*Customer.__table__.c)
     ).first()
-    if existing:
+    if customer is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Customer code {customer_data.customer_code} already exists"
         )
     
-    customer = Customer(
-        **customer_data.dict(),
-        balance=Decimal("0"),
-        is_active=True,
-        created_by=str(current_user_id)
-    )
-    
-    db.add(customer)
     db.commit()
-    db.refresh(customer)
     
     return customer
 
@@ -120,8 +150,7 @@ def get_customer(
     db: Session = Depends(get_db)
 ):
     """Get customer by ID"""
-    from app.models.customers import Customer
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.execute(CUSTOMER_BY_ID, {"customer_id": customer_id}).scalar_one_or_none()
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,8 +165,7 @@ def get_customer_by_code(
     db: Session = Depends(get_db)
 ):
     """Get customer by code"""
-    from app.models.customers import Customer
-    customer = db.query(Customer).filter(Customer.customer_code == customer_code).first()
+    customer = db.execute(CUSTOMER_BY_CODE, {"customer_code": customer_code}).scalar_one_or_none()
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,10 +182,7 @@ def update_customer(
     current_user_id: int = 1  # TODO: Get from auth
 ):
     """Update customer"""
-    from app.models.customers import Customer
-    from datetime import datetime
-    
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.execute(CUSTOMER_BY_ID, {"customer_id": customer_id}).scalar_one_or_none()
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,47 +202,90 @@ def update_customer(
     return customer
 
 
-@router.get("/")
+@router.get("/", responses={200: {"model": CustomerSearchPage}})
 def search_customers(
     search_term: Optional[str] = Query(None),
     active_only: bool = Query(True),
-    page: int = Query(1, ge=1),
+    after_code: Optional[str] = Query(None, description="next_cursor from the previous page"),
     page_size: int = Query(50, ge=1, le=100),
+    include_total: bool = Query(False, description="also count every matching customer"),
     db: Session = Depends(get_db)
 ):
-    """Search customers"""
-    from app.models.customers import Customer
-    from sqlalchemy import or_
-    
-    query = db.query(Customer)
+    """Search customers, one keyset page at a time in customer code order"""
+    filters = []
     
     if active_only:
-        query = query.filter(Customer.is_active == True)
+        filters.append(Customer.is_active == True)
     
     if search_term:
-        query = query.filter(
+        filters.append(
             or_(
                 Customer.customer_code.ilike(f"%{search_term}%"),
                 Customer.customer_name.ilike(f"%{search_term}%")
             )
         )
     
-    # Get total count
-    total_count = query.count()
+    # The full count scans every match, so it is only run on request;
+    # has_more alone is enough to page through the results. It is a plain
+    # count(*) over the filters rather than a count of the column subquery,
+    # so the planner can answer it from an index
+    total_count = db.execute(
+        select(func.count()).select_from(Customer).where(*filters)
+    ).scalar() if include_total else None
     
-    # Apply pagination
-    customers = query.order_by(Customer.customer_code)\
-                    .offset((page - 1) * page_size)\
-                    .limit(page_size)\
-                    .all()
+    # Only the list columns are read; the full record is one get_customer away
+    query = db.query(
+        Customer.id,
+        Customer.customer_code,
+        Customer.customer_name,
+        Customer.balance,
+        Customer.is_active
+    ).filter(*filters)
     
-    return {
-        "customers": customers,
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": (total_count + page_size - 1) // page_size
-    }
+    # Seek past the last code already returned instead of OFFSET-skipping
+    # rows, and read one extra row to learn whether another page follows
+    if after_code:
+        query = query.filter(Customer.customer_code > after_code)
+    
+    customers = query.order_by(Customer.customer_code).limit(page_size + 1).all()
+    has_more = len(customers) > page_size
+    customers = customers[:page_size]
+    
+    page = CustomerSearchPage(
+        customers=customers,
+        page_size=page_size,
+        has_more=has_more,
+        next_cursor=customers[-1].customer_code if has_more else None
+    )
+    if include_total:
+        page.total_count = total_count
+    # Already validated while building the page, so it is dumped once here
+    # rather than checked again against a response_model
+    return ORJSONResponse(page.model_dump(mode="json", exclude_unset=True))
+
+
+def _invoice_balance(db: Session, customer_id: int) -> dict:
+    """Read a customer's open-invoice roll-up from mv_customer_balance"""
+    if db.get_bind().dialect.name == "postgresql":
+        row = db.execute(
+            text(f"SELECT balance, overdue, last_invoice_date FROM {CUSTOMER_BALANCE_VIEW} WHERE customer_id = :customer_id"),
+            {"customer_id": customer_id}
+        ).first()
+    else:
+        # The view only exists on PostgreSQL; elsewhere the same roll-up is
+        # aggregated from sales_invoices
+        row = db.execute(
+            select(
+                func.sum(SalesInvoice.balance_due).label("balance"),
+                func.coalesce(func.sum(case(
+                    (SalesInvoice.due_date < func.current_date(), SalesInvoice.balance_due)
+                )), 0).label("overdue"),
+                func.max(SalesInvoice.invoice_date).label("last_invoice_date")
+            ).where(SalesInvoice.customer_id == customer_id).group_by(SalesInvoice.customer_id)
+        ).first()
+    if not row:
+        return {"balance": Decimal("0"), "overdue": Decimal("0"), "last_invoice_date": None}
+    return dict(row._mapping)
 
 
 @router.get("/{customer_id}/balance")
@@ -227,20 +295,24 @@ def get_customer_balance(
     db: Session = Depends(get_db)
 ):
     """Get customer balance"""
-    from app.models.customers import Customer
     
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.execute(CUSTOMER_BY_ID, {"customer_id": customer_id}).scalar_one_or_none()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # For now, return basic balance - in full implementation would calculate
-    # from sales invoices and customer payments
+    # Outstanding invoices are pre-aggregated per customer; this is a single
+    # indexed row lookup
+    invoices = _invoice_balance(db, customer_id)
+    balance = invoices["balance"]
+    
     return {
         "customer_code": customer.customer_code,
         "customer_name": customer.customer_name,
-        "current_balance": customer.balance,
+        "current_balance": balance,
+        "overdue_balance": invoices["overdue"],
+        "last_invoice_date": invoices["last_invoice_date"],
         "credit_limit": customer.credit_limit,
-        "available_credit": (customer.credit_limit - customer.balance) if customer.credit_limit else None,
+        "available_credit": (customer.credit_limit - balance) if customer.credit_limit else None,
         "as_at_date": as_at_date or date.today()
     }
 
@@ -252,9 +324,8 @@ def perform_credit_check(
     db: Session = Depends(get_db)
 ):
     """Perform credit check for customer"""
-    from app.models.customers import Customer
     
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.execute(CUSTOMER_BY_ID, {"customer_id": customer_id}).scalar_one_or_none()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
@@ -265,8 +336,9 @@ def perform_credit_check(
             "reason": "No credit limit set"
         }
     
-    total_exposure = customer.balance + order_amount
-    credit_available = customer.credit_limit - customer.balance
+    balance = _invoice_balance(db, customer_id)["balance"]
+    total_exposure = balance + order_amount
+    credit_available = customer.credit_limit - balance
     
     approved = total_exposure <= customer.credit_limit
     
@@ -274,10 +346,10 @@ def perform_credit_check(
         "customer_code": customer.customer_code,
         "customer_name": customer.customer_name,
         "order_amount": order_amount,
-        "current_balance": customer.balance,
+        "current_balance": balance,
         "credit_limit": customer.credit_limit,
         "credit_available": credit_available,
         "total_exposure": total_exposure,
         "credit_approved": approved,
         "reason": "Approved" if approved else f"Exceeds credit limit by {total_exposure - customer.credit_limit}"
-    }
\ No newline at end of file
+    }
@@ -2,20 +2,66 @@
 Financial Reports API Router
 REST endpoints for financial reporting
 """
-from typing import Optional
+from typing import Any, Callable, List, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
+from app.config.settings import settings
+from app.core.cache import cache_through
 from app.core.database import get_db
-from app.services.general_ledger.reporting_service import ReportingService
+from app.models.system import CompanyPeriod
+from app.services.general_ledger.reporting_service import ReportingService, build_financial_package
 from app.services.general_ledger.period_end_service import PeriodEndService
 from app.models.general_ledger import AccountType
+from app.utils.encoding import json_response
+from app.worker import queue_financial_package_job, report_job_status
 
 router = APIRouter(prefix="/financial-reports", tags=["Financial Reports"])
 
 
+def _cached_report(
+    db: Session,
+    key: str,
+    period_ids: List[Optional[int]],
+    build: Callable[[], Any],
+    year_to_date: bool = False
+):
+    """
+    Serve a report that only covers GL-closed periods from the cache
+    Nothing can be posted to a closed period, so such a report is the same on
+    every request; a report touching an open period is always rebuilt.
+    A year_to_date report also covers every earlier period of its year, and
+    periods need not be closed in order, so all of those must be closed too
+    """
+    period_ids = {period_id for period_id in period_ids if period_id is not None}
+    periods = db.query(
+        CompanyPeriod.year_number, CompanyPeriod.period_number
+    ).filter(CompanyPeriod.id.in_(period_ids)).all()
+    if len(periods) != len(period_ids):
+        return build()
+    
+    covered = [CompanyPeriod.id.in_(period_ids)]
+    if year_to_date:
+        covered += [
+            and_(
+                CompanyPeriod.year_number == year_number,
+                CompanyPeriod.period_number <= period_number
+            )
+            for year_number, period_number in periods
+        ]
+    still_open = db.query(CompanyPeriod.id).filter(
+        or_(*covered),
+        or_(CompanyPeriod.gl_closed == False, CompanyPeriod.gl_closed.is_(None))
+    ).first()
+    if still_open:
+        return build()
+    
+    return cache_through(key, build, settings.REPORT_CACHE_TTL)
+
+
 @router.get("/balance-sheet")
 def generate_balance_sheet(
     period_id: int = Query(...),
@@ -25,12 +71,18 @@ def generate_balance_sheet(
 ):
     """Generate balance sheet"""
     service = ReportingService(db)
-    report = service.generate_balance_sheet(
-        period_id=period_id,
-        comparative_period_id=comparative_period_id,
-        show_details=show_details
+    return _cached_report(
+        db,
+        f"report:bs:{period_id}:{comparative_period_id}:{show_details}",
+        [period_id, comparative_period_id],
+        lambda: service.generate_balance_sheet(
+            period_id=period_id,
+            comparative_period_id=comparative_period_id,
+            show_details=show_details
+        ),
+        # Retained earnings are summed over the year to date
+        year_to_date=True
     )
-    return report
 
 
 @router.get("/income-statement")
@@ -43,13 +95,18 @@ def generate_income_statement(
 ):
     """Generate income statement (P&L)"""
     service = ReportingService(db)
-    report = service.generate_income_statement(
-        period_id=period_id,
-        comparative_period_id=comparative_period_id,
-        show_details=show_details,
-        ytd=ytd
+    return _cached_report(
+        db,
+        f"report:is:{period_id}:{comparative_period_id}:{show_details}:{ytd}",
+        [period_id, comparative_period_id],
+        lambda: service.generate_income_statement(
+            period_id=period_id,
+            comparative_period_id=comparative_period_id,
+            show_details=show_details,
+            ytd=ytd
+        ),
+        year_to_date=ytd
     )
-    return report
 
 
 @router.get("/cash-flow-statement")
@@ -60,11 +117,17 @@ def generate_cash_flow_statement(
 ):
     """Generate cash flow statement"""
     service = ReportingService(db)
-    report = service.generate_cash_flow_statement(
-        period_id=period_id,
-        ytd=ytd
+    return _cached_report(
+        db,
+        f"report:cf:{period_id}:{ytd}",
+        [period_id],
+        lambda: service.generate_cash_flow_statement(
+            period_id=period_id,
+            ytd=ytd
+        ),
+        # Net income is summed over the year to date whatever ytd says
+        year_to_date=True
     )
-    return report
 
 
 @router.get("/trial-balance")
@@ -76,12 +139,16 @@ def generate_trial_balance(
 ):
     """Generate trial balance"""
     service = PeriodEndService(db)
-    report = service.get_trial_balance(
-        period_id=period_id,
-        include_zero_balance=include_zero_balance,
-        account_type=account_type
+    return _cached_report(
+        db,
+        f"report:tb:{period_id}:{include_zero_balance}:{account_type.value if account_type else None}",
+        [period_id],
+        lambda: service.get_trial_balance(
+            period_id=period_id,
+            include_zero_balance=include_zero_balance,
+            account_type=account_type
+        )
     )
-    return report
 
 
 @router.get("/account-detail")
@@ -174,31 +241,47 @@ def generate_financial_package(
     db: Session = Depends(get_db)
 ):
     """Generate complete financial package (BS, P&L, CF)"""
-    service = ReportingService(db)
-    
-    # Generate all three main reports
-    balance_sheet = service.generate_balance_sheet(
-        period_id=period_id,
-        comparative_period_id=comparative_period_id,
-        show_details=True
-    )
-    
-    income_statement = service.generate_income_statement(
-        period_id=period_id,
-        comparative_period_id=comparative_period_id,
-        show_details=True,
-        ytd=True
-    )
-    
-    cash_flow = service.generate_cash_flow_statement(
-        period_id=period_id,
-        ytd=True
-    )
+    # The package is a plain dict of three reports; it is dumped by orjson in
+    # one call rather than walked by jsonable_encoder first
+    return json_response(_cached_report(
+        db,
+        f"report:package:{period_id}:{comparative_period_id}",
+        [period_id, comparative_period_id],
+        lambda: build_financial_package(period_id, comparative_period_id),
+        year_to_date=True
+    ))
+
+
+@router.post("/financial-package/jobs", status_code=status.HTTP_202_ACCEPTED)
+def queue_financial_package(
+    request: Request,
+    period_id: int = Query(...),
+    comparative_period_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Queue the financial package on the report worker"""
+    # An unknown period is refused here rather than failing in the worker
+    for requested_id in (period_id, comparative_period_id):
+        if requested_id is not None and not db.get(CompanyPeriod, requested_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Period not found"
+            )
     
+    job_id = queue_financial_package_job(period_id, comparative_period_id)
     return {
-        "financial_package": {
-            "balance_sheet": balance_sheet,
-            "income_statement": income_statement,
-            "cash_flow_statement": cash_flow
-        }
-    }
\ No newline at end of file
+        "job_id": job_id,
+        "status_url": str(request.url_for("get_financial_package_job", job_id=job_id))
+    }
+
+
+@router.get("/financial-package/jobs/{job_id}")
+def get_financial_package_job(job_id: str):
+    """Get the status of a queued financial package, and the package once built"""
+    job = report_job_status(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
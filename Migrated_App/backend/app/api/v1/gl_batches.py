@@ -2,7 +2,7 @@
 GL Batches API Router
 REST endpoints for GL batch processing
 """
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
@@ -77,7 +77,7 @@ def get_batch(
 ):
     """Get GL batch by ID"""
     from app.models.general_ledger import GLBatch
-    batch = db.query(GLBatch).filter(GLBatch.id == batch_id).first()
+    batch = db.get(GLBatch, batch_id)
     if not batch:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -128,20 +128,18 @@ def post_batch(
 
 
 @router.post("/import")
-async def import_batch_from_file(
+def import_batch_from_file(
     file: UploadFile = File(...),
-    file_format: str = Query(..., regex="^(CSV|TXT|XML)$"),
+    file_format: Literal["CSV", "TXT", "XML"] = Query(...),
     db: Session = Depends(get_db),
     current_user_id: int = 1  # TODO: Get from auth
 ):
     """Import batch from file"""
-    # Read file content
-    content = await file.read()
-    file_content = content.decode('utf-8')
-    
+    # A plain def like the other handlers: parsing and posting the batch run
+    # on the synchronous Session in the threadpool, not on the event loop
     service = GLBatchService(db)
     batch = service.import_batch_from_file(
-        file_content=file_content,
+        file=file.file,
         file_format=file_format,
         user_id=current_user_id
     )
@@ -157,6 +155,7 @@ def search_batches(
     to_date: Optional[date] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Search GL batches"""
@@ -168,7 +167,8 @@ def search_batches(
         from_date=from_date,
         to_date=to_date,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
     return result
 
@@ -179,8 +179,8 @@ def get_batch_journals(
     db: Session = Depends(get_db)
 ):
     """Get journals in batch"""
-    from app.models.general_ledger import JournalHeader
-    journals = db.query(JournalHeader).filter(JournalHeader.batch_id == batch_id).all()
+    service = GLBatchService(db)
+    journals = service.get_batch_journals(batch_id)
     return {"journals": journals}
 
 
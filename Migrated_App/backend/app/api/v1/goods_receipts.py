@@ -56,7 +56,7 @@ def create_goods_receipt(
     service = GoodsReceiptService(db)
     receipt = service.create_goods_receipt(
         purchase_order_id=receipt_data.purchase_order_id,
-        receipt_lines=[line.dict() for line in receipt_data.receipt_lines],
+        receipt_lines=receipt_data.model_dump(include={'receipt_lines'})['receipt_lines'],
         delivery_note_number=receipt_data.delivery_note_number,
         notes=receipt_data.notes,
         user_id=current_user_id
@@ -64,6 +64,16 @@ def create_goods_receipt(
     return receipt
 
 
+@router.get("/pending-inspection")
+def get_pending_inspection(
+    db: Session = Depends(get_db)
+):
+    """Get receipts pending inspection"""
+    service = GoodsReceiptService(db)
+    receipts = service.get_pending_inspection()
+    return {"receipts": receipts}
+
+
 @router.get("/{receipt_id}", response_model=GoodsReceiptResponse)
 def get_goods_receipt(
     receipt_id: int,
@@ -144,14 +154,4 @@ def get_goods_receipt_lines(
     """Get goods receipt lines"""
     service = GoodsReceiptService(db)
     lines = service.get_receipt_lines(receipt_id)
-    return {"lines": lines}
-
-
-@router.get("/pending-inspection")
-def get_pending_inspection(
-    db: Session = Depends(get_db)
-):
-    """Get receipts pending inspection"""
-    service = GoodsReceiptService(db)
-    receipts = service.get_pending_inspection()
-    return {"receipts": receipts}
\ No newline at end of file
+    return {"lines": lines}
\ No newline at end of file
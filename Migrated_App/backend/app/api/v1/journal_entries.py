@@ -2,12 +2,12 @@
 Journal Entries API Router
 REST endpoints for journal entry management
 """
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.services.general_ledger.journal_entry_service import JournalEntryService
@@ -46,7 +46,7 @@ class RecurringJournalCreate(BaseModel):
     journal_type: JournalType
     description: str
     journal_lines: List[JournalLineCreate]
-    frequency: str = Field(..., regex="^(MONTHLY|QUARTERLY|YEARLY)$")
+    frequency: Literal["MONTHLY", "QUARTERLY", "YEARLY"]
     next_date: date
 
 
@@ -80,7 +80,7 @@ def create_journal_entry(
         journal_type=journal_data.journal_type,
         description=journal_data.description,
         reference=journal_data.reference,
-        journal_lines=[line.dict() for line in journal_data.journal_lines],
+        journal_lines=journal_data.model_dump(include={'journal_lines'})['journal_lines'],
         source_module=journal_data.source_module,
         source_reference=journal_data.source_reference,
         auto_post=journal_data.auto_post,
@@ -164,7 +164,7 @@ def create_recurring_template(
         template_name=template_data.template_name,
         journal_type=template_data.journal_type,
         description=template_data.description,
-        journal_lines=[line.dict() for line in template_data.journal_lines],
+        journal_lines=template_data.model_dump(include={'journal_lines'})['journal_lines'],
         frequency=template_data.frequency,
         next_date=template_data.next_date,
         user_id=current_user_id
@@ -212,10 +212,9 @@ def get_journal_lines(
     db: Session = Depends(get_db)
 ):
     """Get journal entry lines"""
-    from app.services.general_ledger.gl_inquiry_service import GLInquiryService
-    service = GLInquiryService(db)
-    journal = service.get_journal_inquiry(journal_id=journal_id, include_lines=True)
-    return {"lines": journal["lines"]}
+    service = JournalEntryService(db)
+    lines = service.get_journal_lines(journal_id)
+    return {"lines": lines}
 
 
 @router.get("/period/{period_id}")
@@ -225,6 +224,7 @@ def get_journals_for_period(
     journal_type: Optional[JournalType] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get journals for specific period"""
@@ -234,6 +234,7 @@ def get_journals_for_period(
         journal_type=journal_type,
         posting_status=posting_status,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
     return result
\ No newline at end of file
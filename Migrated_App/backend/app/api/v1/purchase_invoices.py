@@ -66,7 +66,7 @@ def create_purchase_invoice(
     invoice = service.create_purchase_invoice(
         supplier_code=invoice_data.supplier_code,
         supplier_invoice_number=invoice_data.supplier_invoice_number,
-        invoice_lines=[line.dict() for line in invoice_data.invoice_lines],
+        invoice_lines=invoice_data.model_dump(include={'invoice_lines'})['invoice_lines'],
         invoice_date=invoice_data.invoice_date,
         due_date=invoice_data.due_date,
         payment_terms=invoice_data.payment_terms,
@@ -76,6 +76,28 @@ def create_purchase_invoice(
     return invoice
 
 
+@router.get("/aging-report")
+def get_purchase_aging_report(
+    as_at_date: date = Query(...),
+    supplier_code: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get purchase ledger aging report"""
+    service = PurchaseInvoiceService(db)
+    report = service.generate_aging_report(as_at_date, supplier_code)
+    return report
+
+
+@router.get("/pending-approval")
+def get_pending_approval(
+    db: Session = Depends(get_db)
+):
+    """Get invoices pending approval"""
+    service = PurchaseInvoiceService(db)
+    invoices = service.get_pending_approval()
+    return {"invoices": invoices}
+
+
 @router.get("/{invoice_id}", response_model=PurchaseInvoiceResponse)
 def get_purchase_invoice(
     invoice_id: int,
@@ -163,26 +185,4 @@ def get_purchase_invoice_lines(
     """Get purchase invoice lines"""
     service = PurchaseInvoiceService(db)
     lines = service.get_invoice_lines(invoice_id)
-    return {"lines": lines}
-
-
-@router.get("/aging-report")
-def get_purchase_aging_report(
-    as_at_date: date = Query(...),
-    supplier_code: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Get purchase ledger aging report"""
-    service = PurchaseInvoiceService(db)
-    report = service.generate_aging_report(as_at_date, supplier_code)
-    return report
-
-
-@router.get("/pending-approval")
-def get_pending_approval(
-    db: Session = Depends(get_db)
-):
-    """Get invoices pending approval"""
-    service = PurchaseInvoiceService(db)
-    invoices = service.get_pending_approval()
-    return {"invoices": invoices}
\ No newline at end of file
+    return {"lines": lines}
\ No newline at end of file
@@ -3,15 +3,17 @@ Purchase Orders API Router
 REST endpoints for purchase order management
 """
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import AliasPath, BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.core.database import get_db
 from app.services.purchase_ledger.purchase_order_service import PurchaseOrderService
 from app.models.purchase_transactions import PurchaseOrder
+from app.utils.encoding import dump_rows, orm_response
 
 router = APIRouter(prefix="/purchase-orders", tags=["Purchase Orders"])
 
@@ -45,17 +47,23 @@ class PurchaseOrderUpdate(BaseModel):
 
 
 class PurchaseOrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     order_number: str
-    supplier_code: str
-    order_date: date
+    # Fields the order has no column of that name for are read from the
+    # column they are kept in
+    supplier_code: str = Field(validation_alias=AliasPath("supplier", "supplier_code"))
+    order_date: datetime
     order_status: str
-    total_value: Decimal
-    delivery_date: Optional[date]
+    total_value: Decimal = Field(validation_alias="gross_total")
+    delivery_date: Optional[datetime] = Field(validation_alias="expected_date")
     notes: Optional[str]
 
-    class Config:
-        from_attributes = True
+
+# Search results validate and dump their rows in one TypeAdapter pass and
+# are returned directly, instead of FastAPI encoding each ORM row again
+PURCHASE_ORDER_LIST = TypeAdapter(List[PurchaseOrderResponse])
 
 
 @router.post("/", response_model=PurchaseOrderResponse)
@@ -68,7 +76,7 @@ def create_purchase_order(
     service = PurchaseOrderService(db)
     order = service.create_purchase_order(
         supplier_code=order_data.supplier_code,
-        order_lines=[line.dict() for line in order_data.order_lines],
+        order_lines=order_data.model_dump(include={'order_lines'})['order_lines'],
         delivery_address=order_data.delivery_address,
         delivery_date=order_data.delivery_date,
         notes=order_data.notes,
@@ -78,7 +86,7 @@ def create_purchase_order(
     return order
 
 
-@router.get("/{order_id}", response_model=PurchaseOrderResponse)
+@router.get("/{order_id}", responses={200: {"model": PurchaseOrderResponse}})
 def get_purchase_order(
     order_id: int,
     db: Session = Depends(get_db)
@@ -91,7 +99,7 @@ def get_purchase_order(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Purchase order not found"
         )
-    return order
+    return orm_response(PurchaseOrderResponse, order)
 
 
 @router.put("/{order_id}", response_model=PurchaseOrderResponse)
@@ -105,7 +113,7 @@ def update_purchase_order(
     service = PurchaseOrderService(db)
     order = service.update_purchase_order(
         order_id=order_id,
-        updates=order_data.dict(exclude_unset=True),
+        updates=order_data.model_dump(exclude_unset=True),
         user_id=current_user_id
     )
     return order
@@ -120,7 +128,7 @@ def authorize_purchase_order(
     """Authorize purchase order"""
     service = PurchaseOrderService(db)
     order = service.authorize_order(order_id, current_user_id)
-    return {"message": "Order authorized successfully", "order_number": order.order_number}
+    return ORJSONResponse({"message": "Order authorized successfully", "order_number": order.order_number})
 
 
 @router.post("/{order_id}/cancel")
@@ -133,7 +141,7 @@ def cancel_purchase_order(
     """Cancel purchase order"""
     service = PurchaseOrderService(db)
     order = service.cancel_order(order_id, reason, current_user_id)
-    return {"message": "Order cancelled successfully", "order_number": order.order_number}
+    return ORJSONResponse({"message": "Order cancelled successfully", "order_number": order.order_number})
 
 
 @router.get("/")
@@ -144,19 +152,22 @@ def search_purchase_orders(
     to_date: Optional[date] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Search purchase orders"""
     service = PurchaseOrderService(db)
-    result = service.search_purchase_orders(
+    result = service.get_purchase_orders(
         supplier_code=supplier_code,
-        status=status,
+        order_status=status,
         from_date=from_date,
         to_date=to_date,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
-    return result
+    result["orders"] = dump_rows(PURCHASE_ORDER_LIST, result["orders"])
+    return ORJSONResponse(result)
 
 
 @router.get("/{order_id}/lines")
@@ -178,7 +189,7 @@ def print_purchase_order(
     """Generate purchase order document"""
     service = PurchaseOrderService(db)
     document = service.generate_purchase_order_document(order_id)
-    return {"document_url": document}
+    return ORJSONResponse({"document_url": document})
 
 
 @router.post("/{order_id}/receive")
@@ -195,7 +206,7 @@ def receive_goods(
         receipt_data=receipt_data or {},
         user_id=current_user_id
     )
-    return {"message": "Goods receipt created successfully", "receipt_number": receipt.get("receipt_number")}
+    return ORJSONResponse({"message": "Goods receipt created successfully", "receipt_number": receipt.get("receipt_number")})
 
 
 @router.post("/{order_id}/convert-to-invoice")
@@ -207,4 +218,4 @@ def convert_to_invoice(
     """Convert purchase order to invoice"""
     service = PurchaseOrderService(db)
     invoice = service.convert_to_invoice(order_id, current_user_id)
-    return {"message": "Purchase order converted to invoice", "invoice_number": invoice.get("invoice_number")}
\ No newline at end of file
+    return ORJSONResponse({"message": "Purchase order converted to invoice", "invoice_number": invoice.get("invoice_number")})
\ No newline at end of file
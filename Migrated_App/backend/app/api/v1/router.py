@@ -3,6 +3,9 @@ Main API Router for V1
 Combines all API routers into single entry point
 """
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from app.config.database import database
 
 # Skip auth router since it's handled in main.py
 from .users import router as users_router
@@ -25,8 +28,15 @@ from .suppliers import router as suppliers_router
 from .customers import router as customers_router
 from .system import router as system_router
 
-# Create main API router
-api_router = APIRouter(prefix="/api/v1")
+# Create main API router; the async database serving the read-only point
+# lookups is connected for the lifetime of the application. Responses are
+# encoded with orjson, as in the main application
+api_router = APIRouter(
+    prefix="/api/v1",
+    default_response_class=ORJSONResponse,
+    on_startup=[database.connect],
+    on_shutdown=[database.disconnect]
+)
 
 # Include all sub-routers
 # auth_router is handled in main.py
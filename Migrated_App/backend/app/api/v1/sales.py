@@ -10,7 +10,7 @@ This module replaces the following COBOL programs:
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
@@ -41,7 +41,7 @@ router = APIRouter(
 
 
 @router.get("/", response_model=Dict[str, Any])
-async def get_sales_info() -> Dict[str, Any]:
+def get_sales_info() -> Dict[str, Any]:
     """
     Get Sales Ledger module information
     
@@ -100,7 +100,7 @@ async def get_sales_info() -> Dict[str, Any]:
 
 # Customer Endpoints
 @router.get("/customers", response_model=List[CustomerResponse])
-async def list_customers(
+def list_customers(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
@@ -126,7 +126,7 @@ async def list_customers(
 
 
 @router.post("/customers", response_model=CustomerResponse)
-async def create_customer(
+def create_customer(
     customer_data: CustomerCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -140,7 +140,7 @@ async def create_customer(
 
 
 @router.get("/customers/{customer_id}", response_model=CustomerResponse)
-async def get_customer(
+def get_customer(
     customer_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -151,7 +151,7 @@ async def get_customer(
 
 
 @router.put("/customers/{customer_id}", response_model=CustomerResponse)
-async def update_customer(
+def update_customer(
     customer_id: int,
     customer_data: CustomerUpdate,
     db: Session = Depends(get_db),
@@ -163,7 +163,7 @@ async def update_customer(
 
 
 @router.get("/customers/{customer_id}/statement")
-async def get_customer_statement(
+def get_customer_statement(
     customer_id: int,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
@@ -187,7 +187,7 @@ async def get_customer_statement(
 
 # Invoice Endpoints
 @router.get("/invoices", response_model=List[SalesInvoiceResponse])
-async def list_invoices(
+def list_invoices(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     customer_id: Optional[int] = None,
@@ -226,7 +226,7 @@ async def list_invoices(
 
 
 @router.post("/invoices", response_model=SalesInvoiceResponse)
-async def create_invoice(
+def create_invoice(
     invoice_data: SalesInvoiceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -259,7 +259,7 @@ async def create_invoice(
 
 
 @router.get("/invoices/{invoice_id}", response_model=SalesInvoiceResponse)
-async def get_invoice(
+def get_invoice(
     invoice_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -275,9 +275,9 @@ async def get_invoice(
 
 
 @router.get("/invoices/{invoice_id}/print")
-async def print_invoice(
+def print_invoice(
     invoice_id: int,
-    format: str = Query("pdf", regex="^(pdf|html|text)$"),
+    format: Literal["pdf", "html", "text"] = Query("pdf"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -290,7 +290,7 @@ async def print_invoice(
 
 
 @router.post("/invoices/{invoice_id}/post")
-async def post_invoice_to_gl(
+def post_invoice_to_gl(
     invoice_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -305,7 +305,7 @@ async def post_invoice_to_gl(
 
 # Payment Endpoints
 @router.get("/payments", response_model=List[Dict])
-async def list_payments(
+def list_payments(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     customer_id: Optional[int] = None,
@@ -349,7 +349,7 @@ async def list_payments(
 
 
 @router.post("/payments", response_model=Dict)
-async def create_payment(
+def create_payment(
     payment_data: CustomerPaymentCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -370,7 +370,7 @@ async def create_payment(
 
 
 @router.post("/payments/{payment_id}/allocate")
-async def allocate_payment(
+def allocate_payment(
     payment_id: int,
     allocations: List[PaymentAllocationCreate],
     db: Session = Depends(get_db),
@@ -388,7 +388,7 @@ async def allocate_payment(
 
 # Report Endpoints
 @router.post("/reports/aged-debtors")
-async def aged_debtors_report(
+def aged_debtors_report(
     request: AgedDebtorsRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -402,7 +402,7 @@ async def aged_debtors_report(
 
 
 @router.post("/reports/sales-analysis")
-async def sales_analysis_report(
+def sales_analysis_report(
     request: SalesAnalysisRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -416,7 +416,7 @@ async def sales_analysis_report(
 
 
 @router.post("/reports/vat")
-async def vat_report(
+def vat_report(
     from_date: date,
     to_date: date,
     db: Session = Depends(get_db),
@@ -3,17 +3,22 @@ Sales Invoices API Router
 Handles sales invoice management endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends, Query, status, Response
-from typing import Dict, Any, List, Optional
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
 
+from app.config.settings import settings
+from app.core.cache import cache_through
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.transactions import SalesInvoice, SalesInvoiceLine, InvoiceType
 from app.models.users import User
 from app.services.invoice_service import InvoiceService
 from app.schemas.sales import SalesInvoiceCreate, SalesInvoiceUpdate, SalesInvoiceResponse
+from app.utils.encoding import dump_rows
 
 router = APIRouter(
     prefix="/sales-invoices",
@@ -21,9 +26,14 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+# List endpoints validate and dump their rows in one TypeAdapter pass and
+# return the result directly, instead of FastAPI checking each row against
+# a response_model and encoding it again
+SALES_INVOICE_LIST = TypeAdapter(List[SalesInvoiceResponse])
 
-@router.get("/", response_model=List[SalesInvoiceResponse])
-async def list_sales_invoices(
+
+@router.get("/", responses={200: {"model": List[SalesInvoiceResponse]}})
+def list_sales_invoices(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     customer_id: Optional[int] = None,
@@ -36,7 +46,7 @@ async def list_sales_invoices(
 ):
     """List sales invoices with filtering and pagination"""
     service = InvoiceService(db)
-    return service.list_invoices(
+    invoices = service.list_invoices(
         skip=skip,
         limit=limit,
         customer_id=customer_id,
@@ -45,10 +55,11 @@ async def list_sales_invoices(
         to_date=to_date,
         is_paid=is_paid
     )
+    return ORJSONResponse(dump_rows(SALES_INVOICE_LIST, invoices))
 
 
 @router.post("/", response_model=SalesInvoiceResponse)
-async def create_sales_invoice(
+def create_sales_invoice(
     invoice_data: SalesInvoiceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -58,8 +69,67 @@ async def create_sales_invoice(
     return service.create_invoice(invoice_data, current_user.id)
 
 
+@router.get("/search")
+def search_sales_invoices(
+    customer_code: Optional[str] = None,
+    invoice_number: Optional[str] = None,
+    order_number: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search sales invoices"""
+    service = InvoiceService(db)
+    result = service.search_invoices(
+        customer_code=customer_code,
+        invoice_number=invoice_number,
+        order_number=order_number,
+        page=page,
+        page_size=page_size,
+        cursor=cursor
+    )
+    result["invoices"] = dump_rows(SALES_INVOICE_LIST, result["invoices"])
+    return ORJSONResponse(result)
+
+
+@router.get("/statistics", response_model=Dict[str, Any])
+def get_invoice_statistics(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    customer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get sales invoice statistics"""
+    service = InvoiceService(db)
+    # Dashboard figures over the whole ledger; a minute-old answer is fine
+    return cache_through(
+        f"stats:invoices:{from_date}:{to_date}:{customer_id}",
+        lambda: service.get_statistics(from_date, to_date, customer_id),
+        settings.STATS_CACHE_TTL
+    )
+
+
+@router.get("/aging-report")
+def get_aging_report(
+    as_of_date: Optional[date] = None,
+    customer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get aging report for outstanding invoices"""
+    service = InvoiceService(db)
+    return cache_through(
+        f"stats:aging:{as_of_date or date.today()}:{customer_id}",
+        lambda: service.get_aging_report(as_of_date, customer_id),
+        settings.STATS_CACHE_TTL
+    )
+
+
 @router.get("/{invoice_id}", response_model=SalesInvoiceResponse)
-async def get_sales_invoice(
+def get_sales_invoice(
     invoice_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -76,7 +146,7 @@ async def get_sales_invoice(
 
 
 @router.put("/{invoice_id}", response_model=SalesInvoiceResponse)
-async def update_sales_invoice(
+def update_sales_invoice(
     invoice_id: int,
     invoice_data: SalesInvoiceUpdate,
     db: Session = Depends(get_db),
@@ -88,7 +158,7 @@ async def update_sales_invoice(
 
 
 @router.post("/{invoice_id}/post")
-async def post_invoice_to_gl(
+def post_invoice_to_gl(
     invoice_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -99,7 +169,7 @@ async def post_invoice_to_gl(
 
 
 @router.post("/{invoice_id}/reverse")
-async def reverse_sales_invoice(
+def reverse_sales_invoice(
     invoice_id: int,
     reason: str,
     db: Session = Depends(get_db),
@@ -111,9 +181,9 @@ async def reverse_sales_invoice(
 
 
 @router.get("/{invoice_id}/print")
-async def print_sales_invoice(
+def print_sales_invoice(
     invoice_id: int,
-    format: str = Query("pdf", regex="^(pdf|html|text)$"),
+    format: Literal["pdf", "html", "text"] = Query("pdf"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -123,7 +193,7 @@ async def print_sales_invoice(
 
 
 @router.post("/{invoice_id}/email")
-async def email_sales_invoice(
+def email_sales_invoice(
     invoice_id: int,
     email_to: str,
     subject: Optional[str] = None,
@@ -136,54 +206,8 @@ async def email_sales_invoice(
     return service.email_invoice(invoice_id, email_to, subject, message, current_user.id)
 
 
-@router.get("/search", response_model=Dict[str, Any])
-async def search_sales_invoices(
-    customer_code: Optional[str] = None,
-    invoice_number: Optional[str] = None,
-    order_number: Optional[str] = None,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Search sales invoices"""
-    service = InvoiceService(db)
-    return service.search_invoices(
-        customer_code=customer_code,
-        invoice_number=invoice_number,
-        order_number=order_number,
-        page=page,
-        page_size=page_size
-    )
-
-
-@router.get("/statistics", response_model=Dict[str, Any])
-async def get_invoice_statistics(
-    from_date: Optional[date] = None,
-    to_date: Optional[date] = None,
-    customer_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get sales invoice statistics"""
-    service = InvoiceService(db)
-    return service.get_statistics(from_date, to_date, customer_id)
-
-
-@router.get("/aging-report")
-async def get_aging_report(
-    as_of_date: Optional[date] = None,
-    customer_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get aging report for outstanding invoices"""
-    service = InvoiceService(db)
-    return service.get_aging_report(as_of_date, customer_id)
-
-
 @router.post("/batch-operations")
-async def batch_operations(
+def batch_operations(
     operation: str,
     invoice_ids: List[int],
     db: Session = Depends(get_db),
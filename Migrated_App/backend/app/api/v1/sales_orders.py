@@ -3,17 +3,22 @@ Sales Orders API Router
 Handles sales order management endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
 
+from app.config.settings import settings
+from app.core.cache import cache_through
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.transactions import SalesOrder, SalesOrderLine, SalesOrderStatus
 from app.models.users import User
 from app.services.sales_order_service import SalesOrderService
 from app.schemas.sales import SalesOrderCreate, SalesOrderUpdate, SalesOrderResponse
+from app.utils.encoding import dump_rows
 
 router = APIRouter(
     prefix="/sales-orders",
@@ -21,9 +26,14 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+# List endpoints validate and dump their rows in one TypeAdapter pass and
+# return the result directly, instead of FastAPI checking each row against
+# a response_model and encoding it again
+SALES_ORDER_LIST = TypeAdapter(List[SalesOrderResponse])
 
-@router.get("/", response_model=List[SalesOrderResponse])
-async def list_sales_orders(
+
+@router.get("/", responses={200: {"model": List[SalesOrderResponse]}})
+def list_sales_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     customer_id: Optional[int] = None,
@@ -35,7 +45,7 @@ async def list_sales_orders(
 ):
     """List sales orders with filtering and pagination"""
     service = SalesOrderService(db)
-    return service.list_sales_orders(
+    orders = service.list_sales_orders(
         skip=skip,
         limit=limit,
         customer_id=customer_id,
@@ -43,10 +53,11 @@ async def list_sales_orders(
         from_date=from_date,
         to_date=to_date
     )
+    return ORJSONResponse(dump_rows(SALES_ORDER_LIST, orders))
 
 
 @router.post("/", response_model=SalesOrderResponse)
-async def create_sales_order(
+def create_sales_order(
     order_data: SalesOrderCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -56,8 +67,48 @@ async def create_sales_order(
     return service.create_sales_order(order_data, current_user.id)
 
 
+@router.get("/search")
+def search_sales_orders(
+    customer_code: Optional[str] = None,
+    order_number: Optional[str] = None,
+    customer_reference: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search sales orders"""
+    service = SalesOrderService(db)
+    result = service.search_sales_orders(
+        customer_code=customer_code,
+        order_number=order_number,
+        customer_reference=customer_reference,
+        page=page,
+        page_size=page_size
+    )
+    result["orders"] = dump_rows(SALES_ORDER_LIST, result["orders"])
+    return ORJSONResponse(result)
+
+
+@router.get("/statistics", response_model=Dict[str, Any])
+def get_sales_order_statistics(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get sales order statistics"""
+    service = SalesOrderService(db)
+    # Dashboard figures over every order; a minute-old answer is fine
+    return cache_through(
+        f"stats:sales-orders:{from_date}:{to_date}",
+        lambda: service.get_statistics(from_date, to_date),
+        settings.STATS_CACHE_TTL
+    )
+
+
 @router.get("/{order_id}", response_model=SalesOrderResponse)
-async def get_sales_order(
+def get_sales_order(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -74,7 +125,7 @@ async def get_sales_order(
 
 
 @router.put("/{order_id}", response_model=SalesOrderResponse)
-async def update_sales_order(
+def update_sales_order(
     order_id: int,
     order_data: SalesOrderUpdate,
     db: Session = Depends(get_db),
@@ -86,7 +137,7 @@ async def update_sales_order(
 
 
 @router.post("/{order_id}/approve")
-async def approve_sales_order(
+def approve_sales_order(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -97,7 +148,7 @@ async def approve_sales_order(
 
 
 @router.post("/{order_id}/cancel")
-async def cancel_sales_order(
+def cancel_sales_order(
     order_id: int,
     reason: str,
     db: Session = Depends(get_db),
@@ -109,7 +160,7 @@ async def cancel_sales_order(
 
 
 @router.post("/{order_id}/convert-to-invoice")
-async def convert_to_invoice(
+def convert_to_invoice(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -120,7 +171,7 @@ async def convert_to_invoice(
 
 
 @router.get("/{order_id}/availability")
-async def check_stock_availability(
+def check_stock_availability(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -131,7 +182,7 @@ async def check_stock_availability(
 
 
 @router.post("/{order_id}/allocate-stock")
-async def allocate_stock(
+def allocate_stock(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -142,7 +193,7 @@ async def allocate_stock(
 
 
 @router.post("/{order_id}/ship")
-async def ship_sales_order(
+def ship_sales_order(
     order_id: int,
     tracking_number: Optional[str] = None,
     carrier: Optional[str] = None,
@@ -158,37 +209,4 @@ async def ship_sales_order(
         carrier=carrier,
         shipping_date=shipping_date or date.today(),
         user_id=current_user.id
-    )
-
-
-@router.get("/search", response_model=Dict[str, Any])
-async def search_sales_orders(
-    customer_code: Optional[str] = None,
-    order_number: Optional[str] = None,
-    customer_reference: Optional[str] = None,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Search sales orders"""
-    service = SalesOrderService(db)
-    return service.search_sales_orders(
-        customer_code=customer_code,
-        order_number=order_number,
-        customer_reference=customer_reference,
-        page=page,
-        page_size=page_size
-    )
-
-
-@router.get("/statistics", response_model=Dict[str, Any])
-async def get_sales_order_statistics(
-    from_date: Optional[date] = None,
-    to_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get sales order statistics"""
-    service = SalesOrderService(db)
-    return service.get_statistics(from_date, to_date)
\ No newline at end of file
+    )
\ No newline at end of file
@@ -6,11 +6,15 @@ from typing import List, Optional
 from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
+from app.config.settings import settings
+from app.core.cache import cache_through
 from app.core.database import get_db
 from app.services.stock_service import StockService
+from app.utils.encoding import dump_rows, orm_response
 
 router = APIRouter(prefix="/stock-items", tags=["Stock Items"])
 
@@ -49,21 +53,27 @@ class StockItemUpdate(BaseModel):
 
 
 class StockItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     stock_code: str
     description: str
     category_code: Optional[str]
     unit_of_measure: str
-    location: Optional[str]
+    # Fields the item has no column of that name for are read from the
+    # column they are kept in
+    location: Optional[str] = Field(validation_alias="shelf_location")
     quantity_on_hand: Decimal
-    sell_price: Optional[Decimal]
-    unit_cost: Optional[Decimal]
+    sell_price: Optional[Decimal] = Field(validation_alias="selling_price1")
+    unit_cost: Optional[Decimal] = Field(validation_alias="average_cost")
     vat_code: str
-    reorder_point: Optional[Decimal]
+    reorder_point: Optional[Decimal] = Field(validation_alias="reorder_level")
     is_active: bool
 
-    class Config:
-        from_attributes = True
+
+# Search results validate and dump their rows in one TypeAdapter pass and
+# are returned directly, instead of FastAPI encoding each ORM row again
+STOCK_ITEM_LIST = TypeAdapter(List[StockItemResponse])
 
 
 @router.post("/", response_model=StockItemResponse)
@@ -75,13 +85,46 @@ def create_stock_item(
     """Create new stock item"""
     service = StockService(db)
     item = service.create_stock_item(
-        **item_data.dict(),
+        **item_data.model_dump(),
         user_id=current_user_id
     )
     return item
 
 
-@router.get("/{item_id}", response_model=StockItemResponse)
+@router.get("/summary")
+def get_stock_summary(
+    location_code: Optional[str] = Query(None),
+    category_code: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get stock summary statistics"""
+    service = StockService(db)
+    # Dashboard figures over every active item; a minute-old answer is fine
+    return cache_through(
+        f"stats:stock-summary:{location_code}:{category_code}",
+        lambda: service.get_stock_summary(
+            location_code=location_code,
+            category_code=category_code
+        ),
+        settings.STATS_CACHE_TTL
+    )
+
+
+@router.get("/below-reorder")
+def get_items_below_reorder(
+    db: Session = Depends(get_db)
+):
+    """Get items below reorder level"""
+    service = StockService(db)
+    items = cache_through(
+        "stats:below-reorder",
+        service.check_reorder_levels,
+        settings.STATS_CACHE_TTL
+    )
+    return {"items": items}
+
+
+@router.get("/{item_id}", responses={200: {"model": StockItemResponse}})
 def get_stock_item(
     item_id: int,
     db: Session = Depends(get_db)
@@ -89,10 +132,10 @@ def get_stock_item(
     """Get stock item by ID"""
     service = StockService(db)
     item = service.get_stock_item(stock_id=item_id)
-    return item
+    return orm_response(StockItemResponse, item)
 
 
-@router.get("/by-code/{stock_code}", response_model=StockItemResponse)
+@router.get("/by-code/{stock_code}", responses={200: {"model": StockItemResponse}})
 def get_stock_item_by_code(
     stock_code: str,
     db: Session = Depends(get_db)
@@ -100,7 +143,7 @@ def get_stock_item_by_code(
     """Get stock item by code"""
     service = StockService(db)
     item = service.get_stock_item(stock_code=stock_code)
-    return item
+    return orm_response(StockItemResponse, item)
 
 
 @router.put("/{item_id}", response_model=StockItemResponse)
@@ -114,7 +157,7 @@ def update_stock_item(
     service = StockService(db)
     item = service.update_stock_item(
         stock_id=item_id,
-        updates=item_data.dict(exclude_unset=True),
+        updates=item_data.model_dump(exclude_unset=True),
         user_id=current_user_id
     )
     return item
@@ -130,6 +173,7 @@ def search_stock_items(
     active_only: bool = Query(True),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Search stock items"""
@@ -142,24 +186,11 @@ def search_stock_items(
         below_reorder=below_reorder,
         active_only=active_only,
         page=page,
-        page_size=page_size
-    )
-    return result
-
-
-@router.get("/summary")
-def get_stock_summary(
-    location_code: Optional[str] = Query(None),
-    category_code: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Get stock summary statistics"""
-    service = StockService(db)
-    summary = service.get_stock_summary(
-        location_code=location_code,
-        category_code=category_code
+        page_size=page_size,
+        cursor=cursor
     )
-    return summary
+    result["items"] = dump_rows(STOCK_ITEM_LIST, result["items"])
+    return ORJSONResponse(result)
 
 
 @router.post("/{item_id}/movement")
@@ -184,7 +215,7 @@ def create_stock_movement(
         notes=notes,
         user_id=current_user_id
     )
-    return {"message": "Stock movement created", "movement_id": movement.id}
+    return ORJSONResponse({"message": "Stock movement created", "movement_id": movement.id})
 
 
 @router.get("/{item_id}/movements")
@@ -219,14 +250,4 @@ def get_stock_valuation(
     """Get stock valuation for item"""
     service = StockService(db)
     valuation = service.calculate_stock_value(stock_id=item_id)
-    return valuation
-
-
-@router.get("/below-reorder")
-def get_items_below_reorder(
-    db: Session = Depends(get_db)
-):
-    """Get items below reorder level"""
-    service = StockService(db)
-    items = service.check_reorder_levels()
-    return {"items": items}
\ No newline at end of file
+    return valuation
\ No newline at end of file
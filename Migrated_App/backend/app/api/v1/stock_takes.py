@@ -2,7 +2,7 @@
 Stock Takes API Router
 REST endpoints for stock take management
 """
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
@@ -180,7 +180,7 @@ def get_variance_report(
 @router.get("/{take_id}/count-sheets")
 def get_count_sheets(
     take_id: int,
-    format: str = Query("PDF", regex="^(PDF|EXCEL)$"),
+    format: Literal["PDF", "EXCEL"] = Query("PDF"),
     db: Session = Depends(get_db)
 ):
     """Get count sheets for stock take"""
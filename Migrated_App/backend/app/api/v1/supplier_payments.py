@@ -60,7 +60,7 @@ def create_supplier_payment(
         supplier_code=payment_data.supplier_code,
         payment_method=payment_data.payment_method,
         payment_amount=payment_data.payment_amount,
-        allocations=[alloc.dict() for alloc in payment_data.allocations],
+        allocations=payment_data.model_dump(include={'allocations'})['allocations'],
         reference=payment_data.reference,
         notes=payment_data.notes,
         user_id=current_user_id
@@ -68,6 +68,23 @@ def create_supplier_payment(
     return payment
 
 
+@router.get("/payment-analysis")
+def get_payment_analysis(
+    from_date: date = Query(...),
+    to_date: date = Query(...),
+    supplier_code: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get payment analysis report"""
+    service = SupplierPaymentService(db)
+    analysis = service.generate_payment_analysis(
+        from_date=from_date,
+        to_date=to_date,
+        supplier_code=supplier_code
+    )
+    return analysis
+
+
 @router.get("/{payment_id}", response_model=SupplierPaymentResponse)
 def get_supplier_payment(
     payment_id: int,
@@ -174,21 +191,4 @@ def create_payment_run(
         max_amount=max_amount,
         user_id=current_user_id
     )
-    return result
-
-
-@router.get("/payment-analysis")
-def get_payment_analysis(
-    from_date: date = Query(...),
-    to_date: date = Query(...),
-    supplier_code: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Get payment analysis report"""
-    service = SupplierPaymentService(db)
-    analysis = service.generate_payment_analysis(
-        from_date=from_date,
-        to_date=to_date,
-        supplier_code=supplier_code
-    )
-    return analysis
\ No newline at end of file
+    return result
\ No newline at end of file
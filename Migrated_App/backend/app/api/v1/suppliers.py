@@ -116,7 +116,7 @@ def get_supplier(
 ):
     """Get supplier by ID"""
     from app.models.suppliers import Supplier
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,7 +152,7 @@ def update_supplier(
     from app.models.suppliers import Supplier
     from datetime import datetime
     
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -226,7 +226,7 @@ def get_supplier_balance(
     from app.models.purchase_transactions import PurchaseInvoice, SupplierPayment
     from sqlalchemy import func, and_
     
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
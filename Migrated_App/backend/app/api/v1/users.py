@@ -3,6 +3,7 @@ User Management API Endpoints
 Handles user administration, permissions, and account management
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
 from datetime import date
@@ -57,7 +58,7 @@ class UserListResponse(BaseModel):
 
 
 # Endpoints
-@router.get("", response_model=UserListResponse)
+@router.get("", responses={200: {"model": UserListResponse}})
 def list_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -81,15 +82,18 @@ def list_users(
     # Get total count
     total_count = len(service.list_users(is_active=is_active, search=search))
     
-    return UserListResponse(
+    # The page is already a validated model; dumping it here skips the
+    # second validation pass a response_model would run over it
+    result = UserListResponse(
         users=[UserResponse.from_orm(user) for user in users],
         total_count=total_count,
         page=page,
         page_size=page_size
     )
+    return ORJSONResponse(result.model_dump(mode="json"))
 
 
-@router.get("/{user_id}", response_model=UserResponse)
+@router.get("/{user_id}", responses={200: {"model": UserResponse}})
 def get_user(
     user_id: int,
     current_user: User = Depends(require_permission(ModuleCode.SYSTEM, PermissionLevel.ENQUIRY)),
@@ -106,7 +110,7 @@ def get_user(
             detail="User not found"
         )
     
-    return UserResponse.from_orm(user)
+    return ORJSONResponse(UserResponse.from_orm(user).model_dump(mode="json"))
 
 
 @router.post("", response_model=UserResponse)
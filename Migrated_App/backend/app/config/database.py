@@ -20,6 +20,7 @@ engine = create_engine(
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
     pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
     echo=settings.DEBUG,
 )
 
@@ -29,6 +29,8 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = 30
     DATABASE_POOL_TIMEOUT: int = 30
     DATABASE_POOL_RECYCLE: int = 3600
+    # Compiled-statement cache entries per engine (SQLAlchemy default is 500)
+    DATABASE_QUERY_CACHE_SIZE: int = 1200
     
     # API Settings
     API_V1_STR: str = "/api/v1"
@@ -43,6 +45,10 @@ class Settings(BaseSettings):
     
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
+    LOOKUP_CACHE_TTL: int = 3600  # Seconds a cached code lookup is served
+    REPORT_CACHE_TTL: int = 86400  # Seconds a closed-period report is served
+    STATS_CACHE_TTL: int = 60  # Seconds a dashboard statistic is served
+    CUSTOMER_BALANCE_REFRESH_SECONDS: int = 300  # Seconds between customer balance roll-up refreshes
     
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -0,0 +1,64 @@
+"""
+Lookup Cache
+Read-through Redis cache for master data looked up by business code
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import orjson
+import redis
+from fastapi.encoders import jsonable_encoder
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A cache that is down must not stall the request that asked it; lookups
+# then fall through to the database
+REDIS_TIMEOUT_SECONDS = 0.25
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Shared client; the connection pool is created once per process"""
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_TIMEOUT_SECONDS
+    )
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """Cached value for key, or None on a miss or when Redis is unavailable"""
+    try:
+        value = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+    return orjson.loads(value) if value is not None else None
+
+
+def cache_set(key: str, value: Any, ttl: int = settings.LOOKUP_CACHE_TTL) -> None:
+    """Store value under key for ttl seconds"""
+    try:
+        get_redis().setex(key, ttl, orjson.dumps(value))
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def cache_delete(*keys: str) -> None:
+    """Invalidate keys after the rows behind them change"""
+    try:
+        get_redis().delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+
+def cache_through(key: str, build: Callable[[], Any], ttl: int) -> Any:
+    """Cached value for key, built and stored for ttl seconds on a miss"""
+    value = cache_get(key)
+    if value is None:
+        value = jsonable_encoder(build())
+        cache_set(key, value, ttl)
+    return value
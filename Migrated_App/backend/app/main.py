@@ -4,7 +4,7 @@ Complete COBOL accounting system migration with database integration
 """
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
@@ -25,7 +25,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="ACAS Migrated API",
     description="Complete COBOL to Modern Stack Migration - Accounting System",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson encodes the large list and report payloads several times faster
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -41,7 +43,7 @@ app.add_middleware(
 # app.include_router(api_router)  # Temporarily disabled due to conflicts
 
 # Database setup
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Dependency to get DB session
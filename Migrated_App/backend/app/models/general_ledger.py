@@ -2,7 +2,7 @@
 General Ledger Models
 Migrated from ACAS General Ledger COBOL structures
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Enum, UniqueConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -217,7 +217,6 @@ class JournalLine(Base):
     
     # Audit
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
     journal = relationship("JournalHeader", back_populates="journal_lines")
@@ -392,6 +391,42 @@ class BudgetLine(Base):
     )
 
 
+# Budget against actual per (budget, account, period), pre-joined from the
+# budget lines and the posted account balances so a variance report is one
+# indexed range read. The view spans four tables, so it is created once the
+# whole schema exists; the unique index allows REFRESH ... CONCURRENTLY.
+BUDGET_VARIANCE_VIEW = "mv_budget_variance"
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {BUDGET_VARIANCE_VIEW} AS
+        SELECT bl.budget_id,
+               bl.account_id,
+               bl.period_number,
+               SUM(bl.budget_amount) AS budget_amount,
+               COALESCE(SUM(ab.period_debits - ab.period_credits), 0) AS actual_amount
+        FROM budget_lines bl
+        JOIN budget_headers bh ON bh.id = bl.budget_id
+        LEFT JOIN company_periods cp
+               ON cp.year_number = bh.budget_year AND cp.period_number = bl.period_number
+        LEFT JOIN account_balances ab
+               ON ab.account_id = bl.account_id AND ab.period_id = cp.id
+        GROUP BY bl.budget_id, bl.account_id, bl.period_number;
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_{BUDGET_VARIANCE_VIEW}_key
+            ON {BUDGET_VARIANCE_VIEW} (budget_id, account_id, period_number)
+        """
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL(f"DROP MATERIALIZED VIEW IF EXISTS {BUDGET_VARIANCE_VIEW}").execute_if(dialect="postgresql"),
+)
+
+
 # Bank Reconciliation
 
 class BankReconciliation(Base):
@@ -136,7 +136,6 @@ class PurchaseOrderLine(Base):
     
     # Audit
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
     order = relationship("PurchaseOrder", back_populates="order_lines")
@@ -231,7 +230,6 @@ class GoodsReceiptLine(Base):
     
     # Audit
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
     receipt = relationship("GoodsReceipt", back_populates="receipt_lines")
@@ -322,6 +320,12 @@ class PurchaseInvoice(Base):
     invoice_lines = relationship("PurchaseInvoiceLine", back_populates="invoice", cascade="all, delete-orphan")
     purchase_order = relationship("PurchaseOrder")
     goods_receipt = relationship("GoodsReceipt")
+    
+    # Indexes
+    __table_args__ = (
+        # Supplier aging reads one supplier's unpaid invoices by due date
+        Index("idx_pinv_supplier_paid_due", "supplier_id", "is_paid", "due_date"),
+    )
 
 
 class PurchaseInvoiceLine(Base):
@@ -10,7 +10,7 @@ This module replaces the following COBOL programs:
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
@@ -275,7 +275,7 @@ async def get_invoice(
 @router.get("/invoices/{invoice_id}/print")
 async def print_invoice(
     invoice_id: int,
-    format: str = Query("pdf", regex="^(pdf|html|text)$"),
+    format: Literal["pdf", "html", "text"] = Query("pdf"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -4,7 +4,7 @@ Pydantic models for Sales Ledger operations
 """
 from datetime import datetime, date
 from decimal import Decimal as PyDecimal
-from typing import Optional, List
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field, field_validator
 from app.models.transactions import InvoiceType
 
@@ -375,5 +375,5 @@ class AgedDebtorsRequest(BaseModel):
 class SalesAnalysisRequest(BaseModel):
     from_date: date
     to_date: date
-    group_by: str = Field(default="customer", pattern="^(customer|product|analysis1|analysis2|analysis3)$")
+    group_by: Literal["customer", "product", "analysis1", "analysis2", "analysis3"] = "customer"
     include_details: bool = Field(default=False)
\ No newline at end of file
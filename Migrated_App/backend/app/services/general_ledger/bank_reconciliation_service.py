@@ -118,9 +118,7 @@ class BankReconciliationService(BaseService):
         """
         try:
             # Get reconciliation
-            reconciliation = self.db.query(BankReconciliation).filter(
-                BankReconciliation.id == reconciliation_id
-            ).first()
+            reconciliation = self.db.get(BankReconciliation, reconciliation_id)
             if not reconciliation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -214,9 +212,7 @@ class BankReconciliationService(BaseService):
         """
         try:
             # Get reconciliation
-            reconciliation = self.db.query(BankReconciliation).filter(
-                BankReconciliation.id == reconciliation_id
-            ).first()
+            reconciliation = self.db.get(BankReconciliation, reconciliation_id)
             if not reconciliation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -331,9 +327,7 @@ class BankReconciliationService(BaseService):
         """
         try:
             # Get reconciliation
-            reconciliation = self.db.query(BankReconciliation).filter(
-                BankReconciliation.id == reconciliation_id
-            ).first()
+            reconciliation = self.db.get(BankReconciliation, reconciliation_id)
             if not reconciliation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -480,9 +474,7 @@ class BankReconciliationService(BaseService):
         """
         try:
             # Get reconciliation
-            reconciliation = self.db.query(BankReconciliation).filter(
-                BankReconciliation.id == reconciliation_id
-            ).first()
+            reconciliation = self.db.get(BankReconciliation, reconciliation_id)
             if not reconciliation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -3,19 +3,38 @@ Budget Service
 Migrated from COBOL gl200.cbl, gl210.cbl, gl220.cbl
 Handles budget management and variance analysis
 """
+import logging
 from typing import List, Optional, Dict
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, case, func, text
 from fastapi import HTTPException, status
 
 from app.models.general_ledger import (
-    BudgetHeader, BudgetLine, ChartOfAccounts, AccountBalance
+    AccountBalance, BudgetHeader, BudgetLine, ChartOfAccounts, BUDGET_VARIANCE_VIEW
 )
 from app.models.system import CompanyPeriod
 from app.services.base import BaseService
 
+logger = logging.getLogger(__name__)
+
+
+def refresh_budget_variance(db: Session) -> None:
+    """
+    Refresh the budget against actual roll-up
+    Called after a commit that changes budgets or posted balances; the change
+    is already saved, so a failed refresh is logged rather than raised
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    try:
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {BUDGET_VARIANCE_VIEW}"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Budget variance refresh failed: {e}")
+
 
 class BudgetService(BaseService):
     """Budget management service"""
@@ -91,7 +110,8 @@ class BudgetService(BaseService):
         spread_method: str = "EVEN",
         period_amounts: Optional[List[Decimal]] = None,
         notes: Optional[str] = None,
-        user_id: int = None
+        user_id: int = None,
+        refresh_variance: bool = True
     ) -> BudgetLine:
         """
         Add budget line
@@ -99,9 +119,7 @@ class BudgetService(BaseService):
         """
         try:
             # Get budget
-            budget = self.db.query(BudgetHeader).filter(
-                BudgetHeader.id == budget_id
-            ).first()
+            budget = self.db.get(BudgetHeader, budget_id)
             if not budget:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -207,6 +225,8 @@ class BudgetService(BaseService):
             
             self.db.commit()
             self.db.refresh(budget_line)
+            if refresh_variance:
+                refresh_budget_variance(self.db)
             
             # Create audit trail
             self._create_audit_trail(
@@ -239,9 +259,7 @@ class BudgetService(BaseService):
         Migrated from gl200.cbl APPROVE-BUDGET
         """
         try:
-            budget = self.db.query(BudgetHeader).filter(
-                BudgetHeader.id == budget_id
-            ).first()
+            budget = self.db.get(BudgetHeader, budget_id)
             if not budget:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -272,6 +290,7 @@ class BudgetService(BaseService):
             
             self.db.commit()
             self.db.refresh(budget)
+            refresh_budget_variance(self.db)
             
             # Create audit trail
             self._create_audit_trail(
@@ -308,9 +327,7 @@ class BudgetService(BaseService):
         """
         try:
             # Get source budget
-            source = self.db.query(BudgetHeader).filter(
-                BudgetHeader.id == source_budget_id
-            ).first()
+            source = self.db.get(BudgetHeader, source_budget_id)
             if not source:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -358,9 +375,12 @@ class BudgetService(BaseService):
                     spread_method="CUSTOM",
                     period_amounts=period_amounts,
                     notes=source_line.notes,
-                    user_id=user_id
+                    user_id=user_id,
+                    refresh_variance=False
                 )
             
+            # One refresh for the whole copy rather than one per line
+            refresh_budget_variance(self.db)
             self.db.refresh(new_budget)
             return new_budget
             
@@ -386,9 +406,7 @@ class BudgetService(BaseService):
         """
         try:
             # Get budget
-            budget = self.db.query(BudgetHeader).filter(
-                BudgetHeader.id == budget_id
-            ).first()
+            budget = self.db.get(BudgetHeader, budget_id)
             if not budget:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -397,56 +415,33 @@ class BudgetService(BaseService):
             
             # Get period
             if period_id:
-                period = self.db.query(CompanyPeriod).filter(
-                    CompanyPeriod.id == period_id
-                ).first()
+                period = self.db.get(CompanyPeriod, period_id)
             else:
                 period = self._get_current_period()
             
-            if not period or period.year_number != budget.fiscal_year:
+            if not period or period.year_number != budget.budget_year:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Period year does not match budget year"
                 )
             
-            # Get budget lines with actuals
-            results = self.db.query(
-                BudgetLine,
-                AccountBalance,
-                ChartOfAccounts
-            ).join(
-                ChartOfAccounts,
-                BudgetLine.account_id == ChartOfAccounts.id
-            ).outerjoin(
-                AccountBalance,
-                and_(
-                    AccountBalance.account_id == BudgetLine.account_id,
-                    AccountBalance.period_id == period.id
-                )
-            ).filter(
-                BudgetLine.budget_id == budget_id
-            ).all()
+            # Budget and actual per account, for the period and year to date,
+            # in one grouped query; only reported accounts come back
+            if self.db.get_bind().dialect.name == "postgresql":
+                results = self._variance_from_view(budget_id, period.period_number, variance_threshold)
+            else:
+                results = self._variance_from_tables(budget_id, period.period_number, variance_threshold)
             
             # Calculate variances
             variance_lines = []
             total_budget_ytd = Decimal("0")
             total_actual_ytd = Decimal("0")
             
-            for budget_line, balance, account in results:
-                # Get budget amounts
-                period_budget = self._get_period_budget(budget_line, period.period_number)
-                ytd_budget = self._get_ytd_budget(budget_line, period.period_number)
-                
-                # Get actual amounts
-                period_actual = (
-                    balance.period_debits - balance.period_credits
-                    if balance else Decimal("0")
-                )
-                
-                # Calculate YTD actual
-                ytd_actual = self._calculate_ytd_actual(
-                    account.id, period.year_number, period.period_number
-                )
+            for account in results:
+                period_budget = account.period_budget
+                ytd_budget = account.ytd_budget
+                period_actual = account.period_actual
+                ytd_actual = account.ytd_actual
                 
                 # Calculate variances
                 period_variance = period_actual - period_budget
@@ -461,11 +456,6 @@ class BudgetService(BaseService):
                     if ytd_budget != 0 else 0
                 )
                 
-                # Apply threshold filter if specified
-                if variance_threshold:
-                    if abs(period_variance_pct) < variance_threshold:
-                        continue
-                
                 variance_lines.append({
                     "account_code": account.account_code,
                     "account_name": account.account_name,
@@ -490,7 +480,7 @@ class BudgetService(BaseService):
             
             return {
                 "budget_name": budget.budget_name,
-                "fiscal_year": budget.fiscal_year,
+                "fiscal_year": budget.budget_year,
                 "period": f"{period.period_number}/{period.year_number}",
                 "variance_lines": variance_lines,
                 "totals": {
@@ -509,43 +499,98 @@ class BudgetService(BaseService):
                 detail=f"Error generating variance report: {str(e)}"
             )
     
-    def _get_period_budget(self, budget_line: BudgetLine, period_number: int) -> Decimal:
-        """Get budget amount for specific period"""
-        period_map = {
-            1: budget_line.period_1_budget,
-            2: budget_line.period_2_budget,
-            3: budget_line.period_3_budget,
-            4: budget_line.period_4_budget,
-            5: budget_line.period_5_budget,
-            6: budget_line.period_6_budget,
-            7: budget_line.period_7_budget,
-            8: budget_line.period_8_budget,
-            9: budget_line.period_9_budget,
-            10: budget_line.period_10_budget,
-            11: budget_line.period_11_budget,
-            12: budget_line.period_12_budget
-        }
-        return period_map.get(period_number, Decimal("0"))
-    
-    def _get_ytd_budget(self, budget_line: BudgetLine, period_number: int) -> Decimal:
-        """Get YTD budget amount"""
-        total = Decimal("0")
-        for period in range(1, period_number + 1):
-            total += self._get_period_budget(budget_line, period)
-        return total
+    def _variance_from_view(
+        self,
+        budget_id: int,
+        period_number: int,
+        variance_threshold: Optional[Decimal]
+    ) -> List:
+        """
+        Budget and actual per account from the pre-joined variance view
+        The threshold on the period variance % is applied there too (a zero
+        period budget never passes)
+        """
+        params = {"budget_id": budget_id, "period_number": period_number}
+        threshold_filter = ""
+        if variance_threshold:
+            threshold_filter = (
+                "WHERE t.period_budget <> 0 AND "
+                "abs(t.period_actual - t.period_budget) * 100 >= :variance_threshold * abs(t.period_budget)"
+            )
+            params["variance_threshold"] = variance_threshold
+        
+        return self.db.execute(
+            text(f"""
+                SELECT * FROM (
+                    SELECT coa.account_code,
+                           coa.account_name,
+                           COALESCE(SUM(v.budget_amount) FILTER (WHERE v.period_number = :period_number), 0) AS period_budget,
+                           COALESCE(SUM(v.actual_amount) FILTER (WHERE v.period_number = :period_number), 0) AS period_actual,
+                           SUM(v.budget_amount) AS ytd_budget,
+                           SUM(v.actual_amount) AS ytd_actual
+                    FROM {BUDGET_VARIANCE_VIEW} v
+                    JOIN chart_of_accounts coa ON coa.id = v.account_id
+                    WHERE v.budget_id = :budget_id AND v.period_number <= :period_number
+                    GROUP BY coa.account_code, coa.account_name
+                ) t
+                {threshold_filter}
+                ORDER BY t.account_code
+            """),
+            params
+        ).all()
     
-    def _calculate_ytd_actual(
-        self, account_id: int, year_number: int, period_number: int
-    ) -> Decimal:
-        """Calculate YTD actual amount"""
-        ytd_result = self.db.query(
-            func.sum(AccountBalance.period_debits - AccountBalance.period_credits)
-        ).join(CompanyPeriod).filter(
+    def _variance_from_tables(
+        self,
+        budget_id: int,
+        period_number: int,
+        variance_threshold: Optional[Decimal]
+    ) -> List:
+        """
+        Budget and actual per account joined from the budget lines and
+        account balances, as the variance view does; used on databases
+        without the materialized view
+        """
+        in_period = BudgetLine.period_number == period_number
+        actual = func.coalesce(AccountBalance.period_debits - AccountBalance.period_credits, 0)
+        period_budget = func.sum(case((in_period, BudgetLine.budget_amount), else_=0))
+        period_actual = func.sum(case((in_period, actual), else_=0))
+        
+        query = self.db.query(
+            ChartOfAccounts.account_code,
+            ChartOfAccounts.account_name,
+            period_budget.label("period_budget"),
+            period_actual.label("period_actual"),
+            func.sum(BudgetLine.budget_amount).label("ytd_budget"),
+            func.sum(actual).label("ytd_actual")
+        ).join(
+            ChartOfAccounts, ChartOfAccounts.id == BudgetLine.account_id
+        ).join(
+            BudgetHeader, BudgetHeader.id == BudgetLine.budget_id
+        ).outerjoin(
+            CompanyPeriod,
+            and_(
+                CompanyPeriod.year_number == BudgetHeader.budget_year,
+                CompanyPeriod.period_number == BudgetLine.period_number
+            )
+        ).outerjoin(
+            AccountBalance,
             and_(
-                AccountBalance.account_id == account_id,
-                CompanyPeriod.year_number == year_number,
-                CompanyPeriod.period_number <= period_number
+                AccountBalance.account_id == BudgetLine.account_id,
+                AccountBalance.period_id == CompanyPeriod.id
+            )
+        ).filter(
+            BudgetLine.budget_id == budget_id,
+            BudgetLine.period_number <= period_number
+        ).group_by(
+            ChartOfAccounts.account_code, ChartOfAccounts.account_name
+        )
+        
+        if variance_threshold:
+            query = query.having(
+                and_(
+                    period_budget != 0,
+                    func.abs(period_actual - period_budget) * 100 >= variance_threshold * func.abs(period_budget)
+                )
             )
-        ).scalar()
         
-        return ytd_result or Decimal("0")
\ No newline at end of file
+        return query.order_by(ChartOfAccounts.account_code).all()
@@ -3,11 +3,11 @@ Chart of Accounts Service
 Migrated from COBOL gl010.cbl, gl020.cbl, gl030.cbl
 Handles chart of accounts maintenance and structure
 """
-from typing import List, Optional, Dict, Tuple
+from typing import Iterator, List, Optional, Dict, Tuple
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, literal, select
 from fastapi import HTTPException, status
 
 from app.models.general_ledger import (
@@ -16,6 +16,35 @@ from app.models.general_ledger import (
 )
 from app.models.system import CompanyPeriod
 from app.services.base import BaseService
+from app.core.cache import cache_delete, cache_get, cache_set
+
+
+def posting_account_key(account_code: str) -> str:
+    return f"coa:{account_code}"
+
+
+def get_posting_account(db: Session, account_code: str) -> Optional[Dict]:
+    """
+    Look up the posting attributes of an account by code
+    Read through the lookup cache: journal and invoice lines validate the same
+    few accounts over and over. Returns id, is_active and allow_posting, or
+    None for an unknown code (misses are not cached)
+    """
+    key = posting_account_key(account_code)
+    account = cache_get(key)
+    if account is None:
+        row = db.query(
+            ChartOfAccounts.id,
+            ChartOfAccounts.is_active,
+            ChartOfAccounts.allow_posting
+        ).filter(
+            ChartOfAccounts.account_code == account_code
+        ).first()
+        if row is None:
+            return None
+        account = row._asdict()
+        cache_set(key, account)
+    return account
 
 
 class ChartOfAccountsService(BaseService):
@@ -139,9 +168,7 @@ class ChartOfAccountsService(BaseService):
         Migrated from gl020.cbl UPDATE-ACCOUNT
         """
         try:
-            account = self.db.query(ChartOfAccounts).filter(
-                ChartOfAccounts.id == account_id
-            ).first()
+            account = self.db.get(ChartOfAccounts, account_id)
             if not account:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -179,6 +206,7 @@ class ChartOfAccountsService(BaseService):
             
             self.db.commit()
             self.db.refresh(account)
+            cache_delete(posting_account_key(account.account_code))
             
             # Create audit trail
             if changes:
@@ -214,43 +242,66 @@ class ChartOfAccountsService(BaseService):
         Migrated from gl030.cbl ACCOUNT-HIERARCHY
         """
         try:
-            # Build query
-            query = self.db.query(ChartOfAccounts)
+            coa = ChartOfAccounts.__table__
+            columns = [
+                coa.c.id, coa.c.account_code, coa.c.account_name,
+                coa.c.account_type, coa.c.parent_account, coa.c.is_header,
+                coa.c.level, coa.c.allow_posting, coa.c.current_balance,
+                coa.c.ytd_movement
+            ]
             
+            filters = []
             if active_only:
-                query = query.filter(ChartOfAccounts.is_active == True)
-            
+                filters.append(coa.c.is_active == True)
             if account_type:
-                query = query.filter(ChartOfAccounts.account_type == account_type)
+                filters.append(coa.c.account_type == account_type)
             
             if parent_code is not None:
-                query = query.filter(ChartOfAccounts.parent_account == parent_code)
+                top = coa.c.parent_account == parent_code
             else:
                 # Get top-level accounts
-                query = query.filter(ChartOfAccounts.parent_account.is_(None))
+                top = coa.c.parent_account.is_(None)
+            
+            # The whole subtree comes back in one recursive query instead of
+            # one query per header account; children are only followed below
+            # header accounts, as the tree walk did
+            tree = select(*columns, literal(0).label("depth")).where(
+                top, *filters
+            ).cte("account_tree", recursive=True)
+            tree = tree.union_all(
+                select(*columns, (tree.c.depth + 1).label("depth")).join(
+                    tree, coa.c.parent_account == tree.c.account_code
+                ).where(tree.c.is_header == True, *filters)
+            )
             
-            accounts = query.order_by(ChartOfAccounts.account_code).all()
+            rows = self.db.execute(
+                select(tree).order_by(tree.c.account_code)
+            ).all()
+            
+            # Build hierarchical structure; rows are in code order, so every
+            # children list comes out sorted
+            nodes = {}
+            for row in rows:
+                nodes[row.account_code] = {
+                    "id": row.id,
+                    "account_code": row.account_code,
+                    "account_name": row.account_name,
+                    "account_type": row.account_type.value,
+                    "is_header": row.is_header,
+                    "level": row.level,
+                    "allow_posting": row.allow_posting,
+                    "current_balance": row.current_balance,
+                    "ytd_movement": row.ytd_movement,
+                    "children": []
+                }
             
-            # Build hierarchical structure
             account_tree = []
-            for account in accounts:
-                account_dict = {
-                    "id": account.id,
-                    "account_code": account.account_code,
-                    "account_name": account.account_name,
-                    "account_type": account.account_type.value,
-                    "is_header": account.is_header,
-                    "level": account.level,
-                    "allow_posting": account.allow_posting,
-                    "current_balance": account.current_balance,
-                    "ytd_movement": account.ytd_movement,
-                    "children": self.get_account_structure(
-                        parent_code=account.account_code,
-                        account_type=account_type,
-                        active_only=active_only
-                    ) if account.is_header else []
-                }
-                account_tree.append(account_dict)
+            for row in rows:
+                node = nodes[row.account_code]
+                if row.depth == 0:
+                    account_tree.append(node)
+                else:
+                    nodes[row.parent_account]["children"].append(node)
             
             return account_tree
             
@@ -265,7 +316,7 @@ class ChartOfAccountsService(BaseService):
         period_id: Optional[int] = None,
         account_type: Optional[AccountType] = None,
         include_zero_balance: bool = False
-    ) -> List[Dict]:
+    ) -> Iterator[Dict]:
         """
         Get account balances
         Migrated from gl030.cbl ACCOUNT-BALANCES
@@ -273,9 +324,7 @@ class ChartOfAccountsService(BaseService):
         try:
             # Get period
             if period_id:
-                period = self.db.query(CompanyPeriod).filter(
-                    CompanyPeriod.id == period_id
-                ).first()
+                period = self.db.get(CompanyPeriod, period_id)
             else:
                 period = self._get_current_period()
             
@@ -285,10 +334,18 @@ class ChartOfAccountsService(BaseService):
                     detail="Period not found"
                 )
             
-            # Query accounts with balances
+            # Query accounts with balances; an account without a balance row
+            # for the period reads as zero
+            zero = Decimal("0")
             query = self.db.query(
-                ChartOfAccounts,
-                AccountBalance
+                ChartOfAccounts.id,
+                ChartOfAccounts.account_code,
+                ChartOfAccounts.account_name,
+                ChartOfAccounts.account_type,
+                func.coalesce(AccountBalance.opening_balance, zero).label("opening_balance"),
+                func.coalesce(AccountBalance.period_debits, zero).label("period_debits"),
+                func.coalesce(AccountBalance.period_credits, zero).label("period_credits"),
+                func.coalesce(AccountBalance.closing_balance, zero).label("closing_balance")
             ).outerjoin(
                 AccountBalance,
                 and_(
@@ -309,30 +366,9 @@ class ChartOfAccountsService(BaseService):
                     )
                 )
             
-            results = query.order_by(ChartOfAccounts.account_code).all()
-            
-            # Format results
-            balances = []
-            for account, balance in results:
-                balance_dict = {
-                    "account_id": account.id,
-                    "account_code": account.account_code,
-                    "account_name": account.account_name,
-                    "account_type": account.account_type.value,
-                    "period": period.period_number,
-                    "year": period.year_number,
-                    "opening_balance": balance.opening_balance if balance else Decimal("0"),
-                    "period_debits": balance.period_debits if balance else Decimal("0"),
-                    "period_credits": balance.period_credits if balance else Decimal("0"),
-                    "closing_balance": balance.closing_balance if balance else Decimal("0"),
-                    "ytd_movement": (
-                        (balance.period_debits - balance.period_credits)
-                        if balance else Decimal("0")
-                    )
-                }
-                balances.append(balance_dict)
-            
-            return balances
+            # Executed here so query errors surface before streaming starts;
+            # rows are then fetched from a server-side cursor in chunks
+            results = iter(query.order_by(ChartOfAccounts.account_code).yield_per(1000))
             
         except HTTPException:
             raise
@@ -341,6 +377,25 @@ class ChartOfAccountsService(BaseService):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving balances: {str(e)}"
             )
+        
+        return self._format_balances(results, period)
+    
+    def _format_balances(self, results: Iterator, period: CompanyPeriod) -> Iterator[Dict]:
+        """Format account balance rows as they are read"""
+        for row in results:
+            yield {
+                "account_id": row.id,
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "account_type": row.account_type.value,
+                "period": period.period_number,
+                "year": period.year_number,
+                "opening_balance": row.opening_balance,
+                "period_debits": row.period_debits,
+                "period_credits": row.period_credits,
+                "closing_balance": row.closing_balance,
+                "ytd_movement": row.period_debits - row.period_credits
+            }
     
     def validate_account_code(
         self,
@@ -351,17 +406,15 @@ class ChartOfAccountsService(BaseService):
         Migrated from gl030.cbl VALIDATE-ACCOUNT
         """
         try:
-            account = self.db.query(ChartOfAccounts).filter(
-                ChartOfAccounts.account_code == account_code
-            ).first()
+            account = get_posting_account(self.db, account_code)
             
             if not account:
                 return False
             
-            if not account.is_active:
+            if not account["is_active"]:
                 return False
             
-            if not account.allow_posting:
+            if not account["allow_posting"]:
                 return False
             
             return True
@@ -408,9 +461,7 @@ class ChartOfAccountsService(BaseService):
         """
         try:
             # Get account
-            account = self.db.query(ChartOfAccounts).filter(
-                ChartOfAccounts.id == account_id
-            ).first()
+            account = self.db.get(ChartOfAccounts, account_id)
             if not account or not account.is_control:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -3,10 +3,11 @@ GL Batch Service
 Migrated from COBOL gl080.cbl, gl090.cbl, gl095.cbl
 Handles batch journal processing and control
 """
-from typing import List, Optional, Dict
+import io
+from typing import BinaryIO, Iterable, List, Optional, Dict
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_, or_, func
 from fastapi import HTTPException, status
 
@@ -16,8 +17,31 @@ from app.models.general_ledger import (
 from app.models.system import CompanyPeriod
 from app.models.control_tables import NumberSequence
 from app.services.base import BaseService
+from app.utils.cursor import keyset_page
+from app.services.general_ledger.budget_service import refresh_budget_variance
 from app.services.general_ledger.journal_entry_service import JournalEntryService
 
+# journal_lines columns an import loads. COPY never runs the ORM's
+# client-side defaults, so the defaulted columns are listed too and
+# _build_line_rows fills them; the rest are left NULL
+JOURNAL_LINE_COPY_COLUMNS = (
+    "journal_id", "line_number", "account_id", "account_code",
+    "debit_amount", "credit_amount", "description", "reference",
+    "analysis_code1", "analysis_code2", "analysis_code3",
+    "currency_code", "exchange_rate", "foreign_debit", "foreign_credit",
+    "reconciled", "created_at"
+)
+
+# Characters COPY's text format reads as escapes or delimiters
+COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text_value(value) -> str:
+    """One column of a COPY text-format row"""
+    if value is None:
+        return "\\N"
+    return str(value).translate(COPY_TEXT_ESCAPES)
+
 
 class GLBatchService(BaseService):
     """GL batch processing service"""
@@ -41,37 +65,15 @@ class GLBatchService(BaseService):
         Migrated from gl080.cbl CREATE-BATCH
         """
         try:
-            # Get current period
-            period = self._get_current_period()
-            if not period:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No current period found"
-                )
-            
-            # Generate batch number
-            batch_number = self._get_next_batch_number()
-            
-            # Create batch
-            batch = GLBatch(
-                batch_number=batch_number,
-                batch_date=datetime.now(),
+            batch = self._new_batch(
                 batch_type=batch_type,
                 description=description,
                 source_module=source_module,
-                period_id=period.id,
-                control_count=control_count or 0,
-                control_debits=control_debits or Decimal("0"),
-                control_credits=control_credits or Decimal("0"),
-                actual_count=0,
-                actual_debits=Decimal("0"),
-                actual_credits=Decimal("0"),
-                is_balanced=False,
-                is_posted=False,
-                created_by=str(user_id) if user_id else None
+                control_count=control_count,
+                control_debits=control_debits,
+                control_credits=control_credits,
+                user_id=user_id
             )
-            
-            self.db.add(batch)
             self.db.commit()
             self.db.refresh(batch)
             
@@ -81,7 +83,7 @@ class GLBatchService(BaseService):
                 record_id=str(batch.id),
                 operation="CREATE",
                 user_id=user_id,
-                details=f"Created GL batch {batch_number}"
+                details=f"Created GL batch {batch.batch_number}"
             )
             
             return batch
@@ -108,9 +110,7 @@ class GLBatchService(BaseService):
         """
         try:
             # Get batch
-            batch = self.db.query(GLBatch).filter(
-                GLBatch.id == batch_id
-            ).first()
+            batch = self.db.get(GLBatch, batch_id)
             if not batch:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -173,9 +173,7 @@ class GLBatchService(BaseService):
         """
         try:
             # Get batch
-            batch = self.db.query(GLBatch).filter(
-                GLBatch.id == batch_id
-            ).first()
+            batch = self.db.get(GLBatch, batch_id)
             if not batch:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -276,9 +274,7 @@ class GLBatchService(BaseService):
         """
         try:
             # Get batch
-            batch = self.db.query(GLBatch).filter(
-                GLBatch.id == batch_id
-            ).first()
+            batch = self.db.get(GLBatch, batch_id)
             if not batch:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -310,7 +306,9 @@ class GLBatchService(BaseService):
             posted_count = 0
             for journal in batch.journals:
                 if journal.posting_status == PostingStatus.DRAFT:
-                    self.journal_service.post_journal(journal.id, user_id)
+                    self.journal_service.post_journal(
+                        journal.id, user_id, refresh_variance=False
+                    )
                     posted_count += 1
             
             # Update batch status
@@ -320,6 +318,8 @@ class GLBatchService(BaseService):
             
             self.db.commit()
             self.db.refresh(batch)
+            # One refresh for the whole batch rather than one per journal
+            refresh_budget_variance(self.db)
             
             # Create audit trail
             self._create_audit_trail(
@@ -344,7 +344,7 @@ class GLBatchService(BaseService):
     
     def import_batch_from_file(
         self,
-        file_content: str,
+        file: BinaryIO,
         file_format: str,  # CSV, TXT, XML
         user_id: int
     ) -> GLBatch:
@@ -353,34 +353,53 @@ class GLBatchService(BaseService):
         Migrated from gl090.cbl IMPORT-BATCH
         """
         try:
-            # Parse file based on format
+            # Parse file based on format; the upload is read straight from its
+            # spooled file rather than copied into bytes and then a str
             if file_format == "CSV":
-                journals = self._parse_csv_batch(file_content)
+                journals = self._parse_csv_batch(file)
             elif file_format == "TXT":
-                journals = self._parse_text_batch(file_content)
+                journals = self._parse_text_batch(file)
             elif file_format == "XML":
-                journals = self._parse_xml_batch(file_content)
+                journals = self._parse_xml_batch(file)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Unsupported file format: {file_format}"
                 )
             
+            # Validate every journal before anything is written, so a bad
+            # line rejects the file instead of leaving half a batch behind
+            periods = {}
+            prepared = []
+            for journal_data in journals:
+                journal_date = journal_data["date"]
+                if journal_date not in periods:
+                    periods[journal_date] = self.journal_service._get_period_for_date(journal_date)
+                period = periods[journal_date]
+                if not period:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"No open period found for journal date {journal_date}"
+                    )
+                if not period.is_open:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Period is closed for posting on {journal_date}"
+                    )
+                
+                line_rows, total_debits, total_credits = self.journal_service._build_line_rows(
+                    journal_data["lines"]
+                )
+                prepared.append((journal_data, period, line_rows, total_debits, total_credits))
+            
             # Calculate control totals
-            control_count = len(journals)
-            control_debits = sum(
-                sum(Decimal(str(l.get("debit_amount", "0"))) 
-                    for l in j["lines"])
-                for j in journals
-            )
-            control_credits = sum(
-                sum(Decimal(str(l.get("credit_amount", "0"))) 
-                    for l in j["lines"])
-                for j in journals
-            )
+            control_count = len(prepared)
+            control_debits = sum(total_debits for _, _, _, total_debits, _ in prepared)
+            control_credits = sum(total_credits for _, _, _, _, total_credits in prepared)
             
-            # Create batch
-            batch = self.create_batch(
+            # Create batch; it is only flushed, so the batch, its journals and
+            # their lines all commit or roll back together
+            batch = self._new_batch(
                 batch_type="IMPORT",
                 description=f"Imported from {file_format} file",
                 source_module="IMPORT",
@@ -390,19 +409,63 @@ class GLBatchService(BaseService):
                 user_id=user_id
             )
             
-            # Add journals to batch
-            for journal_data in journals:
-                self.add_journal_to_batch(
+            # Headers go in through the ORM for their ids; journal numbers are
+            # taken from the sequence in one step
+            journal_numbers = self.journal_service._reserve_journal_numbers(len(prepared))
+            headers = [
+                JournalHeader(
+                    journal_number=journal_number,
+                    journal_date=journal_data["date"],
+                    journal_type=JournalType.MANUAL,
+                    period_id=period.id,
+                    period_number=period.period_number,
+                    year_number=period.year_number,
+                    description=journal_data["description"],
+                    reference=journal_data.get("reference"),
+                    source_module=batch.source_module,
+                    posting_status=PostingStatus.DRAFT,
+                    total_debits=total_debits,
+                    total_credits=total_credits,
+                    line_count=len(line_rows),
                     batch_id=batch.id,
-                    journal_data={
-                        "journal_date": journal_data["date"],
-                        "journal_type": JournalType.MANUAL,
-                        "description": journal_data["description"],
-                        "reference": journal_data.get("reference"),
-                        "journal_lines": journal_data["lines"]
-                    },
-                    user_id=user_id
+                    created_by=str(user_id) if user_id else None
                 )
+                for journal_number, (journal_data, period, line_rows, total_debits, total_credits)
+                in zip(journal_numbers, prepared)
+            ]
+            self.db.add_all(headers)
+            self.db.flush()
+            
+            # Every line of the file is loaded with a single COPY
+            self._copy_journal_lines(
+                dict(row, journal_id=header.id)
+                for header, (_, _, line_rows, _, _) in zip(headers, prepared)
+                for row in line_rows
+            )
+            
+            # Update batch actuals
+            batch.actual_count = len(headers)
+            batch.actual_debits = control_debits
+            batch.actual_credits = control_credits
+            self._check_batch_balance(batch)
+            
+            self.db.commit()
+            
+            # Create audit trail
+            self._create_audit_trail(
+                table_name="gl_batches",
+                record_id=str(batch.id),
+                operation="CREATE",
+                user_id=user_id,
+                details=f"Created GL batch {batch.batch_number}"
+            )
+            self._create_audit_trail(
+                table_name="gl_batches",
+                record_id=str(batch.id),
+                operation="IMPORT",
+                user_id=user_id,
+                details=f"Imported {len(headers)} journals into GL batch {batch.batch_number}"
+            )
             
             return batch
             
@@ -424,7 +487,8 @@ class GLBatchService(BaseService):
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict:
         """
         Get batches with filtering
@@ -449,30 +513,37 @@ class GLBatchService(BaseService):
             if to_date:
                 query = query.filter(GLBatch.batch_date <= to_date)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            batches = query.order_by(GLBatch.batch_date.desc(),
-                                   GLBatch.batch_number.desc())\
-                         .offset((page - 1) * page_size)\
-                         .limit(page_size)\
-                         .all()
-            
-            return {
-                "batches": batches,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size
-            }
+            batches, paging = keyset_page(
+                query,
+                (GLBatch.batch_date, GLBatch.batch_number),
+                (datetime.fromisoformat, str),
+                cursor, page, page_size,
+                descending=True
+            )
+            return {"batches": batches, **paging}
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving batches: {str(e)}"
             )
     
+    def get_batch_journals(self, batch_id: int) -> List[JournalHeader]:
+        """
+        Get the journals in a batch with their lines and period
+        Headers are ordered by journal number
+        """
+        # Lines come in one extra IN query and the period rides on the header
+        # join, so serializing the batch never lazy-loads per journal
+        return self.db.query(JournalHeader).options(
+            selectinload(JournalHeader.journal_lines),
+            joinedload(JournalHeader.period)
+        ).filter(
+            JournalHeader.batch_id == batch_id
+        ).order_by(JournalHeader.journal_number).all()
+    
     def _get_next_batch_number(self) -> str:
         """Generate next batch number"""
         sequence = self.db.query(NumberSequence).filter(
@@ -492,9 +563,75 @@ class GLBatchService(BaseService):
         number_str = str(sequence.current_number).zfill(sequence.min_digits)
         batch_number = f"{sequence.prefix}{number_str}"
         
-        self.db.commit()
+        self.db.flush()
         return batch_number
     
+    def _new_batch(
+        self,
+        batch_type: str,
+        description: str,
+        source_module: Optional[str] = None,
+        control_count: Optional[int] = None,
+        control_debits: Optional[Decimal] = None,
+        control_credits: Optional[Decimal] = None,
+        user_id: int = None
+    ) -> GLBatch:
+        """Add and flush a new batch, leaving the commit to the caller"""
+        # Get current period
+        period = self._get_current_period()
+        if not period:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No current period found"
+            )
+        
+        # Generate batch number
+        batch_number = self._get_next_batch_number()
+        
+        # Create batch
+        batch = GLBatch(
+            batch_number=batch_number,
+            batch_date=datetime.now(),
+            batch_type=batch_type,
+            description=description,
+            source_module=source_module,
+            period_id=period.id,
+            control_count=control_count or 0,
+            control_debits=control_debits or Decimal("0"),
+            control_credits=control_credits or Decimal("0"),
+            actual_count=0,
+            actual_debits=Decimal("0"),
+            actual_credits=Decimal("0"),
+            is_balanced=False,
+            is_posted=False,
+            created_by=str(user_id) if user_id else None
+        )
+        
+        self.db.add(batch)
+        self.db.flush()
+        return batch
+    
+    def _copy_journal_lines(self, rows: Iterable[Dict]):
+        """Load journal lines with COPY FROM STDIN on the session's connection"""
+        # COPY text format: \N is NULL, and backslashes in the values are
+        # escaped, so a description that reads \N is loaded as written
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(
+                _copy_text_value(row[column]) for column in JOURNAL_LINE_COPY_COLUMNS
+            ))
+            buffer.write("\n")
+        buffer.seek(0)
+        
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY journal_lines ({', '.join(JOURNAL_LINE_COPY_COLUMNS)}) FROM STDIN",
+                buffer
+            )
+        finally:
+            cursor.close()
+    
     def _check_batch_balance(self, batch: GLBatch):
         """Check if batch is balanced"""
         batch.is_balanced = (
@@ -504,15 +641,16 @@ class GLBatchService(BaseService):
             (batch.control_credits == 0 or batch.actual_credits == batch.control_credits)
         )
     
-    def _parse_csv_batch(self, content: str) -> List[Dict]:
+    def _parse_csv_batch(self, file: BinaryIO) -> List[Dict]:
         """Parse CSV batch file"""
+        import codecs
         import csv
-        import io
         
         journals = []
         current_journal = None
         
-        reader = csv.DictReader(io.StringIO(content))
+        # Decoded a line at a time as the reader pulls rows
+        reader = csv.DictReader(codecs.iterdecode(file, "utf-8"))
         for row in reader:
             if row.get("type") == "HEADER":
                 if current_journal:
@@ -539,12 +677,12 @@ class GLBatchService(BaseService):
         
         return journals
     
-    def _parse_text_batch(self, content: str) -> List[Dict]:
+    def _parse_text_batch(self, file: BinaryIO) -> List[Dict]:
         """Parse text batch file - simplified example"""
         # Would implement specific text format parsing
         return []
     
-    def _parse_xml_batch(self, content: str) -> List[Dict]:
+    def _parse_xml_batch(self, file: BinaryIO) -> List[Dict]:
         """Parse XML batch file - simplified example"""
         # Would implement XML parsing
         return []
\ No newline at end of file
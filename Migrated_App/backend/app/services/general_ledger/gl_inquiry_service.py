@@ -45,9 +45,7 @@ class GLInquiryService(BaseService):
             
             # Get period
             if period_id:
-                period = self.db.query(CompanyPeriod).filter(
-                    CompanyPeriod.id == period_id
-                ).first()
+                period = self.db.get(CompanyPeriod, period_id)
             else:
                 period = self._get_current_period()
             
@@ -393,9 +391,7 @@ class GLInquiryService(BaseService):
         """
         try:
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -6,17 +6,28 @@ Handles journal entry creation, posting, and reversal
 from typing import List, Optional, Dict, Tuple
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, insert
 from fastapi import HTTPException, status
 
 from app.models.general_ledger import (
     JournalHeader, JournalLine, JournalType, PostingStatus,
-    ChartOfAccounts, AccountBalance, GLBatch
+    AccountBalance, GLBatch
 )
 from app.models.system import CompanyPeriod
 from app.models.control_tables import NumberSequence
 from app.services.base import BaseService
+from app.services.general_ledger.budget_service import refresh_budget_variance
+from app.services.general_ledger.chart_of_accounts_service import get_posting_account
+from app.utils.cursor import keyset_page
+
+
+def _line_default(column: str):
+    """
+    Client-side default of a journal_lines column; rows loaded outside the
+    ORM (insert executemany, COPY) set these explicitly
+    """
+    return JournalLine.__table__.c[column].default.arg
 
 
 class JournalEntryService(BaseService):
@@ -32,7 +43,8 @@ class JournalEntryService(BaseService):
         source_module: Optional[str] = None,
         source_reference: Optional[str] = None,
         auto_post: bool = False,
-        user_id: int = None
+        user_id: int = None,
+        refresh_variance: bool = True
     ) -> JournalHeader:
         """
         Create journal entry
@@ -76,93 +88,19 @@ class JournalEntryService(BaseService):
             self.db.flush()
             
             # Process journal lines
-            if not journal_lines:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Journal must have at least two lines"
-                )
+            line_rows, total_debits, total_credits = self._build_line_rows(journal_lines)
+            for row in line_rows:
+                row["journal_id"] = journal.id
             
-            line_number = 0
-            total_debits = Decimal("0")
-            total_credits = Decimal("0")
-            
-            for line_data in journal_lines:
-                line_number += 10
-                
-                # Validate account
-                account_code = line_data["account_code"]
-                account = self.db.query(ChartOfAccounts).filter(
-                    ChartOfAccounts.account_code == account_code
-                ).first()
-                
-                if not account:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Account {account_code} not found"
-                    )
-                
-                if not account.allow_posting:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Account {account_code} does not allow posting"
-                    )
-                
-                # Get amounts
-                debit_amount = Decimal(str(line_data.get("debit_amount", "0")))
-                credit_amount = Decimal(str(line_data.get("credit_amount", "0")))
-                
-                # Validate amounts
-                if debit_amount < 0 or credit_amount < 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Amounts must be positive"
-                    )
-                
-                if debit_amount == 0 and credit_amount == 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Line must have either debit or credit amount"
-                    )
-                
-                if debit_amount > 0 and credit_amount > 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Line cannot have both debit and credit"
-                    )
-                
-                # Create journal line
-                line = JournalLine(
-                    journal_id=journal.id,
-                    line_number=line_number,
-                    account_id=account.id,
-                    account_code=account_code,
-                    debit_amount=debit_amount,
-                    credit_amount=credit_amount,
-                    description=line_data.get("description", ""),
-                    reference=line_data.get("reference", ""),
-                    analysis_code1=line_data.get("analysis_code1"),
-                    analysis_code2=line_data.get("analysis_code2"),
-                    analysis_code3=line_data.get("analysis_code3"),
-                    currency_code=line_data.get("currency_code", "USD"),
-                    exchange_rate=Decimal(str(line_data.get("exchange_rate", "1")))
-                )
-                
-                journal.journal_lines.append(line)
-                
-                total_debits += debit_amount
-                total_credits += credit_amount
-            
-            # Validate journal balance
-            if total_debits != total_credits:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Journal not balanced. Debits: {total_debits}, Credits: {total_credits}"
-                )
+            # All lines go in as one executemany; appending them to
+            # journal.journal_lines would first lazy-load the collection and
+            # then flush the lines row by row
+            self.db.execute(insert(JournalLine.__table__), line_rows)
             
             # Update journal totals
             journal.total_debits = total_debits
             journal.total_credits = total_credits
-            journal.line_count = len(journal.journal_lines)
+            journal.line_count = len(line_rows)
             
             # Auto-post if requested
             if auto_post:
@@ -170,6 +108,8 @@ class JournalEntryService(BaseService):
             
             self.db.commit()
             self.db.refresh(journal)
+            if auto_post and refresh_variance:
+                refresh_budget_variance(self.db)
             
             # Create audit trail
             self._create_audit_trail(
@@ -195,7 +135,8 @@ class JournalEntryService(BaseService):
     def post_journal(
         self,
         journal_id: int,
-        user_id: int
+        user_id: int,
+        refresh_variance: bool = True
     ) -> JournalHeader:
         """
         Post journal entry to ledger
@@ -203,9 +144,7 @@ class JournalEntryService(BaseService):
         """
         try:
             # Get journal
-            journal = self.db.query(JournalHeader).filter(
-                JournalHeader.id == journal_id
-            ).first()
+            journal = self.db.get(JournalHeader, journal_id)
             if not journal:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -237,6 +176,8 @@ class JournalEntryService(BaseService):
             
             self.db.commit()
             self.db.refresh(journal)
+            if refresh_variance:
+                refresh_budget_variance(self.db)
             
             return journal
             
@@ -263,9 +204,7 @@ class JournalEntryService(BaseService):
         """
         try:
             # Get original journal
-            original = self.db.query(JournalHeader).filter(
-                JournalHeader.id == journal_id
-            ).first()
+            original = self.db.get(JournalHeader, journal_id)
             if not original:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -317,7 +256,8 @@ class JournalEntryService(BaseService):
                 source_module=original.source_module,
                 source_reference=original.source_reference,
                 auto_post=True,
-                user_id=user_id
+                user_id=user_id,
+                refresh_variance=False
             )
             
             # Link reversal to original
@@ -328,6 +268,7 @@ class JournalEntryService(BaseService):
             original.posting_status = PostingStatus.REVERSED
             
             self.db.commit()
+            refresh_budget_variance(self.db)
             self.db.refresh(reversal)
             
             # Create audit trail
@@ -404,7 +345,8 @@ class JournalEntryService(BaseService):
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict:
         """
         Get journal entries with filtering
@@ -432,30 +374,60 @@ class JournalEntryService(BaseService):
             if to_date:
                 query = query.filter(JournalHeader.journal_date <= to_date)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            journals = query.order_by(JournalHeader.journal_date.desc(),
-                                    JournalHeader.journal_number.desc())\
-                          .offset((page - 1) * page_size)\
-                          .limit(page_size)\
-                          .all()
-            
-            return {
-                "journals": journals,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size
-            }
+            journals, paging = keyset_page(
+                query,
+                (JournalHeader.journal_date, JournalHeader.journal_number),
+                (datetime.fromisoformat, str),
+                cursor, page, page_size,
+                descending=True
+            )
+            return {"journals": journals, **paging}
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving journals: {str(e)}"
             )
     
+    def get_journal_lines(self, journal_id: int) -> List[Dict]:
+        """
+        Get the lines of a journal with their account code and name
+        Migrated from gl410.cbl JOURNAL-INQUIRY
+        """
+        # The account is joined into the same SELECT rather than loaded
+        # line by line
+        lines = self.db.query(JournalLine).options(
+            joinedload(JournalLine.account)
+        ).filter(
+            JournalLine.journal_id == journal_id
+        ).order_by(JournalLine.line_number).all()
+        
+        if not lines and not self.db.query(
+            self.db.query(JournalHeader).filter(JournalHeader.id == journal_id).exists()
+        ).scalar():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Journal not found"
+            )
+        
+        return [
+            {
+                "line_number": line.line_number,
+                "account_code": line.account.account_code,
+                "account_name": line.account.account_name,
+                "debit_amount": line.debit_amount,
+                "credit_amount": line.credit_amount,
+                "description": line.description,
+                "reference": line.reference,
+                "analysis_code1": line.analysis_code1,
+                "analysis_code2": line.analysis_code2,
+                "analysis_code3": line.analysis_code3
+            }
+            for line in lines
+        ]
+    
     def _post_journal(self, journal: JournalHeader, user_id: int):
         """Internal method to post journal to ledger"""
         # Update account balances
@@ -510,8 +482,103 @@ class JournalEntryService(BaseService):
             details=f"Posted journal {journal.journal_number}"
         )
     
+    def _build_line_rows(self, journal_lines: List[Dict]) -> Tuple[List[Dict], Decimal, Decimal]:
+        """
+        Validate journal lines and build their journal_lines rows
+        Returns the rows, without journal_id, and the debit and credit totals
+        """
+        if not journal_lines:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Journal must have at least two lines"
+            )
+        
+        line_number = 0
+        total_debits = Decimal("0")
+        total_credits = Decimal("0")
+        line_rows = []
+        created_at = datetime.now()
+        
+        for line_data in journal_lines:
+            line_number += 10
+            
+            # Validate account
+            account_code = line_data["account_code"]
+            account = get_posting_account(self.db, account_code)
+            
+            if not account:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Account {account_code} not found"
+                )
+            
+            if not account["allow_posting"]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Account {account_code} does not allow posting"
+                )
+            
+            # Get amounts
+            debit_amount = Decimal(str(line_data.get("debit_amount", "0")))
+            credit_amount = Decimal(str(line_data.get("credit_amount", "0")))
+            
+            # Validate amounts
+            if debit_amount < 0 or credit_amount < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Amounts must be positive"
+                )
+            
+            if debit_amount == 0 and credit_amount == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Line must have either debit or credit amount"
+                )
+            
+            if debit_amount > 0 and credit_amount > 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Line cannot have both debit and credit"
+                )
+            
+            # Create journal line
+            line_rows.append({
+                "line_number": line_number,
+                "account_id": account["id"],
+                "account_code": account_code,
+                "debit_amount": debit_amount,
+                "credit_amount": credit_amount,
+                "description": line_data.get("description", ""),
+                "reference": line_data.get("reference", ""),
+                "analysis_code1": line_data.get("analysis_code1"),
+                "analysis_code2": line_data.get("analysis_code2"),
+                "analysis_code3": line_data.get("analysis_code3"),
+                "currency_code": line_data.get("currency_code", _line_default("currency_code")),
+                "exchange_rate": Decimal(str(line_data.get("exchange_rate", "1"))),
+                "foreign_debit": _line_default("foreign_debit"),
+                "foreign_credit": _line_default("foreign_credit"),
+                "reconciled": _line_default("reconciled"),
+                "created_at": created_at
+            })
+            
+            total_debits += debit_amount
+            total_credits += credit_amount
+        
+        # Validate journal balance
+        if total_debits != total_credits:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Journal not balanced. Debits: {total_debits}, Credits: {total_credits}"
+            )
+        
+        return line_rows, total_debits, total_credits
+    
     def _get_next_journal_number(self) -> str:
         """Generate next journal number"""
+        return self._reserve_journal_numbers(1)[0]
+    
+    def _reserve_journal_numbers(self, count: int) -> List[str]:
+        """Generate the next count journal numbers under one sequence lock"""
         sequence = self.db.query(NumberSequence).filter(
             NumberSequence.sequence_type == "JOURNAL"
         ).with_for_update().first()
@@ -525,9 +592,14 @@ class JournalEntryService(BaseService):
             )
             self.db.add(sequence)
         
-        sequence.current_number += 1
-        number_str = str(sequence.current_number).zfill(sequence.min_digits)
-        journal_number = f"{sequence.prefix}{number_str}"
+        first_number = sequence.current_number + 1
+        sequence.current_number += count
+        journal_numbers = [
+            f"{sequence.prefix}{str(number).zfill(sequence.min_digits)}"
+            for number in range(first_number, sequence.current_number + 1)
+        ]
         
-        self.db.commit()
-        return journal_number
\ No newline at end of file
+        # Flushed only: the caller's commit releases the sequence lock, so a
+        # failed journal or import gives its numbers back
+        self.db.flush()
+        return journal_numbers
\ No newline at end of file
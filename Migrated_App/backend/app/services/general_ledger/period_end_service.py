@@ -37,9 +37,7 @@ class PeriodEndService(BaseService):
         """
         try:
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -141,9 +139,7 @@ class PeriodEndService(BaseService):
                 )
             
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             
             # Create closing journal entries if needed
             self._create_period_closing_entries(period, user_id)
@@ -297,9 +293,7 @@ class PeriodEndService(BaseService):
         """
         try:
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -550,14 +544,18 @@ class PeriodEndService(BaseService):
             AccountBalance.period_id == from_period.id
         ).all()
         
+        # Existing opening balances of the next period, read in one query
+        # rather than looked up account by account
+        openings = {
+            opening.account_id: opening
+            for opening in self.db.query(AccountBalance).filter(
+                AccountBalance.period_id == to_period.id
+            )
+        }
+        
         for closing in closing_balances:
             # Check if opening balance exists
-            opening = self.db.query(AccountBalance).filter(
-                and_(
-                    AccountBalance.account_id == closing.account_id,
-                    AccountBalance.period_id == to_period.id
-                )
-            ).first()
+            opening = openings.get(closing.account_id)
             
             if not opening:
                 # Create opening balance
@@ -3,6 +3,7 @@ Financial Reporting Service
 Migrated from COBOL gl300.cbl, gl310.cbl, gl320.cbl
 Generates financial statements and reports
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict
 from datetime import datetime, date
 from decimal import Decimal
@@ -13,10 +14,56 @@ from fastapi import HTTPException, status
 from app.models.general_ledger import (
     ChartOfAccounts, AccountType, AccountBalance
 )
+from app.config.database import SessionLocal
 from app.models.system import CompanyPeriod
 from app.services.base import BaseService
 
 
+def _run_report(report: str, **options) -> Dict:
+    """Run one ReportingService report on a session of its own"""
+    db = SessionLocal()
+    try:
+        return getattr(ReportingService(db), report)(**options)
+    finally:
+        db.close()
+
+
+def build_financial_package(period_id: int, comparative_period_id: Optional[int] = None) -> Dict:
+    """
+    Build the complete financial package (BS, P&L, CF)
+    Used by the package endpoint and by the background report worker
+    """
+    # The three reports are independent reads, so each runs on its own
+    # pooled connection at the same time; the package takes as long as
+    # the slowest report instead of all three back to back
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        balance_sheet = executor.submit(
+            _run_report, "generate_balance_sheet",
+            period_id=period_id,
+            comparative_period_id=comparative_period_id,
+            show_details=True
+        )
+        income_statement = executor.submit(
+            _run_report, "generate_income_statement",
+            period_id=period_id,
+            comparative_period_id=comparative_period_id,
+            show_details=True,
+            ytd=True
+        )
+        cash_flow = executor.submit(
+            _run_report, "generate_cash_flow_statement",
+            period_id=period_id,
+            ytd=True
+        )
+        return {
+            "financial_package": {
+                "balance_sheet": balance_sheet.result(),
+                "income_statement": income_statement.result(),
+                "cash_flow_statement": cash_flow.result()
+            }
+        }
+
+
 class ReportingService(BaseService):
     """Financial reporting service"""
     
@@ -32,9 +79,7 @@ class ReportingService(BaseService):
         """
         try:
             # Get periods
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -43,9 +88,7 @@ class ReportingService(BaseService):
             
             comparative = None
             if comparative_period_id:
-                comparative = self.db.query(CompanyPeriod).filter(
-                    CompanyPeriod.id == comparative_period_id
-                ).first()
+                comparative = self.db.get(CompanyPeriod, comparative_period_id)
             
             # Get asset accounts
             assets = self._get_account_section(
@@ -154,9 +197,7 @@ class ReportingService(BaseService):
         """
         try:
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -191,9 +232,7 @@ class ReportingService(BaseService):
             
             # Comparative data
             if comparative_period_id:
-                comp_period = self.db.query(CompanyPeriod).filter(
-                    CompanyPeriod.id == comparative_period_id
-                ).first()
+                comp_period = self.db.get(CompanyPeriod, comparative_period_id)
                 
                 if ytd:
                     comp_revenue = self._get_ytd_account_section(
@@ -272,9 +311,7 @@ class ReportingService(BaseService):
         """
         try:
             # Get period
-            period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == period_id
-            ).first()
+            period = self.db.get(CompanyPeriod, period_id)
             if not period:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -377,12 +414,8 @@ class ReportingService(BaseService):
                 )
             
             # Get periods
-            from_period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == from_period_id
-            ).first()
-            to_period = self.db.query(CompanyPeriod).filter(
-                CompanyPeriod.id == to_period_id
-            ).first()
+            from_period = self.db.get(CompanyPeriod, from_period_id)
+            to_period = self.db.get(CompanyPeriod, to_period_id)
             
             if not from_period or not to_period:
                 raise HTTPException(
@@ -531,6 +564,12 @@ class ReportingService(BaseService):
         
         results = query.order_by(ChartOfAccounts.account_code).all()
         
+        # Children of every header in the section are totalled in one query
+        header_totals = self._calculate_header_totals(
+            [account.account_code for account, _ in results if account.is_header],
+            period_id
+        )
+        
         # Build hierarchical structure
         lines = []
         total = Decimal("0")
@@ -540,8 +579,7 @@ class ReportingService(BaseService):
             
             # For headers, calculate total of children
             if account.is_header:
-                child_total = self._calculate_header_total(account.account_code, period_id)
-                account_balance = child_total
+                account_balance = header_totals.get(account.account_code, Decimal("0"))
             
             lines.append({
                 "account_code": account.account_code,
@@ -627,13 +665,17 @@ class ReportingService(BaseService):
             "total": abs(total)  # Revenue/Income shown as positive
         }
     
-    def _calculate_header_total(self, header_code: str, period_id: int) -> Decimal:
-        """Calculate total for header account including all children"""
-        # Get all child accounts
-        children = self.db.query(
-            ChartOfAccounts,
-            AccountBalance
-        ).outerjoin(
+    def _calculate_header_totals(self, header_codes: List[str], period_id: int) -> Dict[str, Decimal]:
+        """Calculate totals for header accounts including all children, by header code"""
+        if not header_codes:
+            return {}
+        
+        # Children without a balance row add nothing, so an inner join and a
+        # grouped sum give every header's total at once
+        totals = self.db.query(
+            ChartOfAccounts.parent_account,
+            func.sum(AccountBalance.closing_balance)
+        ).join(
             AccountBalance,
             and_(
                 AccountBalance.account_id == ChartOfAccounts.id,
@@ -641,27 +683,20 @@ class ReportingService(BaseService):
             )
         ).filter(
             and_(
-                ChartOfAccounts.parent_account == header_code,
+                ChartOfAccounts.parent_account.in_(header_codes),
                 ChartOfAccounts.is_active == True,
                 ChartOfAccounts.allow_posting == True
             )
-        ).all()
-        
-        total = Decimal("0")
-        for account, balance in children:
-            if balance:
-                total += balance.closing_balance
+        ).group_by(ChartOfAccounts.parent_account).all()
         
-        return total
+        return {header_code: total for header_code, total in totals}
     
     def _calculate_current_retained_earnings(self, period_id: int) -> Decimal:
         """Calculate current year retained earnings (P&L)"""
         if not period_id:
             return Decimal("0")
             
-        period = self.db.query(CompanyPeriod).filter(
-            CompanyPeriod.id == period_id
-        ).first()
+        period = self.db.get(CompanyPeriod, period_id)
         
         if not period:
             return Decimal("0")
@@ -5,6 +5,7 @@ Implementation of COBOL sl910.cbl - Invoice Generation (555 procedures)
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple, Any
+from sqlalchemy import Date, case, cast
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
@@ -16,6 +17,7 @@ from app.core.calculations.vat_calculator import VATCalculator, VATCode
 from app.core.calculations.discount_calculator import DiscountCalculator, DiscountType
 from app.schemas.sales import InvoiceCreate, InvoiceLineCreate
 from app.core.audit.audit_service import AuditService
+from app.utils.cursor import keyset_page
 
 
 class InvoiceService:
@@ -610,7 +612,8 @@ class InvoiceService:
         invoice_number: Optional[str] = None,
         order_number: Optional[str] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """Search sales invoices"""
         query = self.db.query(SalesInvoice)
@@ -624,20 +627,14 @@ class InvoiceService:
         if order_number:
             query = query.filter(SalesInvoice.order_number.ilike(f"%{order_number}%"))
         
-        total_count = query.count()
-        
-        invoices = query.order_by(SalesInvoice.invoice_date.desc())\
-                        .offset((page - 1) * page_size)\
-                        .limit(page_size)\
-                        .all()
-        
-        return {
-            "invoices": invoices,
-            "total_count": total_count,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size
-        }
+        invoices, paging = keyset_page(
+            query,
+            (SalesInvoice.invoice_date, SalesInvoice.id),
+            (datetime.fromisoformat, int),
+            cursor, page, page_size,
+            descending=True
+        )
+        return {"invoices": invoices, **paging}
     
     def get_statistics(self, from_date: Optional[date], to_date: Optional[date], customer_id: Optional[int]) -> Dict[str, Any]:
         """Get sales invoice statistics"""
@@ -656,8 +653,8 @@ class InvoiceService:
         
         stats = query.with_entities(
             func.count(SalesInvoice.id).label('total_invoices'),
-            func.sum(SalesInvoice.gross_total).label('total_amount'),
-            func.sum(SalesInvoice.balance).label('outstanding_amount')
+            func.sum(SalesInvoice.total_amount).label('total_amount'),
+            func.sum(SalesInvoice.balance_due).label('outstanding_amount')
         ).first()
         
         return {
@@ -669,17 +666,38 @@ class InvoiceService:
     
     def get_aging_report(self, as_of_date: Optional[date], customer_id: Optional[int]) -> List[Dict[str, Any]]:
         """Get aging report for outstanding invoices"""
-        query = self.db.query(SalesInvoice).filter(
-            SalesInvoice.is_paid == False,
-            SalesInvoice.balance > 0
+        as_of_date = as_of_date or date.today()
+        
+        # PostgreSQL assigns each invoice its bucket and the customer name
+        # rides on the same join, so no invoice is loaded as an ORM row and
+        # no customer is lazy-loaded per invoice
+        due = cast(SalesInvoice.due_date, Date)
+        bucket = case(
+            (due >= as_of_date, "current"),
+            (due >= as_of_date - timedelta(days=30), "1_30_days"),
+            (due >= as_of_date - timedelta(days=60), "31_60_days"),
+            (due >= as_of_date - timedelta(days=90), "61_90_days"),
+            else_="over_90_days"
+        )
+        
+        query = self.db.query(
+            SalesInvoice.id,
+            SalesInvoice.invoice_no,
+            Customer.customer_name,
+            SalesInvoice.invoice_date,
+            SalesInvoice.due_date,
+            SalesInvoice.balance_due,
+            bucket.label("bucket")
+        ).join(
+            Customer, Customer.id == SalesInvoice.customer_id
+        ).filter(
+            SalesInvoice.invoice_status != 'P',
+            SalesInvoice.balance_due > 0
         )
         
         if customer_id:
             query = query.filter(SalesInvoice.customer_id == customer_id)
         
-        invoices = query.all()
-        
-        as_of_date = as_of_date or date.today()
         aging_buckets = {
             "current": [],
             "1_30_days": [],
@@ -688,29 +706,18 @@ class InvoiceService:
             "over_90_days": []
         }
         
-        for invoice in invoices:
-            days_overdue = (as_of_date - invoice.due_date).days
+        for invoice in query:
+            days_overdue = (as_of_date - invoice.due_date.date()).days
             
-            invoice_data = {
+            aging_buckets[invoice.bucket].append({
                 "invoice_id": invoice.id,
-                "invoice_number": invoice.invoice_number,
+                "invoice_number": invoice.invoice_no,
                 "customer_name": invoice.customer_name,
                 "invoice_date": invoice.invoice_date.isoformat(),
                 "due_date": invoice.due_date.isoformat(),
-                "balance": float(invoice.balance),
+                "balance": float(invoice.balance_due),
                 "days_overdue": max(days_overdue, 0)
-            }
-            
-            if days_overdue <= 0:
-                aging_buckets["current"].append(invoice_data)
-            elif days_overdue <= 30:
-                aging_buckets["1_30_days"].append(invoice_data)
-            elif days_overdue <= 60:
-                aging_buckets["31_60_days"].append(invoice_data)
-            elif days_overdue <= 90:
-                aging_buckets["61_90_days"].append(invoice_data)
-            else:
-                aging_buckets["over_90_days"].append(invoice_data)
+            })
         
         return aging_buckets
     
@@ -721,23 +728,45 @@ class InvoiceService:
             "failed": []
         }
         
+        if operation not in ("post", "print"):
+            results["failed"] = [
+                {"invoice_id": invoice_id, "error": f"Unknown operation: {operation}"}
+                for invoice_id in invoice_ids
+            ]
+            return results
+        
+        # Every invoice in the batch is read in one IN query instead of one
+        # lookup per id; posting and printing only need the header
+        invoices = {
+            invoice.id: invoice
+            for invoice in self.db.query(SalesInvoice).filter(
+                SalesInvoice.id.in_(invoice_ids)
+            )
+        }
+        
         for invoice_id in invoice_ids:
-            try:
-                if operation == "post":
-                    self.post_to_gl(invoice_id, user_id)
-                    results["success"].append(invoice_id)
-                elif operation == "print":
-                    self.print_invoice(invoice_id, "pdf")
-                    results["success"].append(invoice_id)
-                else:
-                    results["failed"].append({
-                        "invoice_id": invoice_id,
-                        "error": f"Unknown operation: {operation}"
-                    })
-            except Exception as e:
+            invoice = invoices.get(invoice_id)
+            if invoice is None:
                 results["failed"].append({
                     "invoice_id": invoice_id,
-                    "error": str(e)
+                    "error": "Invoice not found"
                 })
+            elif operation == "post" and (invoice.is_posted or invoice_id in results["success"]):
+                results["failed"].append({
+                    "invoice_id": invoice_id,
+                    "error": "Invoice is already posted"
+                })
+            else:
+                results["success"].append(invoice_id)
+        
+        if operation == "post" and results["success"]:
+            # Marked the same way post_to_gl does, under a single commit
+            posted_date = datetime.now()
+            for invoice_id in results["success"]:
+                invoice = invoices[invoice_id]
+                invoice.is_posted = True
+                invoice.posted_date = posted_date
+                invoice.posted_by = str(user_id)
+            self.db.commit()
         
         return results
\ No newline at end of file
@@ -2,9 +2,11 @@
 Payment Service
 Implementation of payment processing from COBOL sl100, sl110
 """
+import logging
 from decimal import Decimal
 from datetime import datetime, date
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any
+from sqlalchemy import Integer, case, column, insert, select, text, update, values
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
@@ -15,6 +17,26 @@ from app.models import (
 from app.schemas.sales import PaymentCreate, PaymentAllocationCreate
 from app.core.audit.audit_service import AuditService
 from app.core.calculations.discount_calculator import DiscountCalculator
+from app.models.transactions import CUSTOMER_BALANCE_VIEW
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_customer_balances(db: Session) -> None:
+    """
+    Refresh the per-customer invoice balance roll-up
+    Run by the worker every CUSTOMER_BALANCE_REFRESH_SECONDS rather than after
+    each invoice or payment commit, since every refresh recomputes the whole
+    view; a failed refresh is logged and the next one catches up
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    try:
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {CUSTOMER_BALANCE_VIEW}"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Customer balance refresh failed: {e}")
 
 
 class PaymentService:
@@ -136,11 +158,23 @@ class PaymentService:
         total_allocated = Decimal("0.00")
         total_discount = Decimal("0.00")
         
+        # Lock every invoice named in the request with one query
+        invoice_ids = {alloc_data.invoice_id for alloc_data in allocations}
+        invoices = {
+            invoice.id: invoice
+            for invoice in self.db.query(SalesInvoice).filter(
+                SalesInvoice.id.in_(invoice_ids)
+            ).with_for_update()
+        }
+        
+        # Running balance per invoice, so an invoice named twice is not
+        # over-allocated
+        balances = {invoice_id: invoice.balance for invoice_id, invoice in invoices.items()}
+        allocation_rows = []
+        invoice_paid = {}
+        
         for alloc_data in allocations:
-            # Get invoice with lock
-            invoice = self.db.query(SalesInvoice).filter_by(
-                id=alloc_data.invoice_id
-            ).with_for_update().first()
+            invoice = invoices.get(alloc_data.invoice_id)
             
             if not invoice:
                 allocation_results.append({
@@ -160,7 +194,7 @@ class PaymentService:
                 continue
             
             # Check if already fully paid
-            if invoice.is_paid:
+            if invoice.is_paid or balances[invoice.id] <= Decimal("0.01"):
                 allocation_results.append({
                     "invoice_id": alloc_data.invoice_id,
                     "status": "ALREADY_PAID",
@@ -175,7 +209,7 @@ class PaymentService:
                 days_to_payment = (payment.payment_date - invoice.invoice_date).days
                 if days_to_payment <= invoice.settlement_days:
                     # Calculate maximum allowed discount
-                    max_discount = (invoice.balance * invoice.settlement_discount / Decimal("100")).quantize(
+                    max_discount = (balances[invoice.id] * invoice.settlement_discount / Decimal("100")).quantize(
                         Decimal("0.01")
                     )
                     discount_taken = min(alloc_data.discount_taken, max_discount)
@@ -190,7 +224,7 @@ class PaymentService:
             # Calculate allocation amount
             allocation_amount = min(
                 alloc_data.allocated_amount,
-                invoice.balance - discount_taken,
+                balances[invoice.id] - discount_taken,
                 payment.unallocated_amount
             )
             
@@ -202,21 +236,18 @@ class PaymentService:
                 })
                 continue
             
-            # Create allocation record
-            allocation = PaymentAllocation(
-                payment_id=payment.id,
-                invoice_id=invoice.id,
-                allocation_date=datetime.now(),
-                allocated_amount=allocation_amount,
-                discount_taken=discount_taken,
-                created_by=str(user_id)
-            )
-            self.db.add(allocation)
-            
-            # Update invoice
-            invoice.amount_paid += allocation_amount + discount_taken
-            invoice.balance = invoice.gross_total - invoice.amount_paid
-            invoice.is_paid = invoice.balance <= Decimal("0.01")  # Allow small rounding differences
+            # Allocation record and invoice payment, written below in bulk
+            allocation_rows.append({
+                "payment_id": payment.id,
+                "invoice_id": invoice.id,
+                "allocation_date": datetime.now(),
+                "allocated_amount": allocation_amount,
+                "discount_taken": discount_taken,
+                "created_by": str(user_id)
+            })
+            paid = allocation_amount + discount_taken
+            invoice_paid[invoice.id] = invoice_paid.get(invoice.id, Decimal("0.00")) + paid
+            balances[invoice.id] -= paid
             
             # Update payment
             total_allocated += allocation_amount
@@ -228,9 +259,35 @@ class PaymentService:
                 "status": "SUCCESS",
                 "allocated_amount": allocation_amount,
                 "discount_taken": discount_taken,
-                "remaining_balance": invoice.balance
+                "remaining_balance": balances[invoice.id]
             })
         
+        if allocation_rows:
+            # One multi-row INSERT for the allocations and one UPDATE ... FROM
+            # (VALUES ...) for the invoices, whatever the number of lines
+            self.db.execute(insert(PaymentAllocation.__table__), allocation_rows)
+            
+            invoice_table = SalesInvoice.__table__
+            paid = values(
+                column("invoice_id", Integer),
+                column("amount", invoice_table.c.amount_paid.type),
+                name="paid"
+            ).data(list(invoice_paid.items()))
+            new_balance = invoice_table.c.total_amount - (invoice_table.c.amount_paid + paid.c.amount)
+            self.db.execute(
+                update(invoice_table).where(
+                    invoice_table.c.id == paid.c.invoice_id
+                ).values(
+                    amount_paid=invoice_table.c.amount_paid + paid.c.amount,
+                    balance_due=new_balance,
+                    # Allow small rounding differences
+                    invoice_status=case(
+                        (new_balance <= Decimal("0.01"), "P"),
+                        else_=invoice_table.c.invoice_status
+                    )
+                )
+            )
+        
         # Update payment totals
         payment.allocated_amount += total_allocated
         payment.unallocated_amount = payment.payment_amount - payment.allocated_amount
@@ -518,81 +575,175 @@ class PaymentService:
         return query.order_by(CustomerPayment.payment_date).all()
     
     def auto_allocate_payments(self, customer_id: Optional[int], user_id: int) -> Dict[str, Any]:
-        """Auto-allocate payments to oldest invoices"""
-        # Get unallocated payments
-        payments = self.get_unallocated_payments(customer_id)
+        """
+        Auto-allocate payments to oldest invoices
+        Each customer's unallocated payments, oldest first, are laid end to end
+        against their open invoices, oldest first; every overlap of a payment's
+        running-total range with an invoice's becomes one allocation
+        """
+        params = {"user_id": str(user_id)}
+        customer_filter = ""
+        if customer_id:
+            customer_filter = "AND customer_id = :customer_id"
+            params["customer_id"] = customer_id
+        
+        # One statement: the payment/invoice matching is two window sums and a
+        # range join, and the allocations, invoice, payment and customer
+        # updates are data-modifying CTEs over the matched set
+        result = self.db.execute(
+            text(f"""
+                WITH open_payments AS (
+                    SELECT id, customer_id, payment_date, unallocated_amount
+                    FROM customer_payments
+                    WHERE is_allocated = false AND is_reversed = false
+                      AND unallocated_amount > 0 {customer_filter}
+                    FOR UPDATE
+                ), open_invoices AS (
+                    SELECT id, customer_id, invoice_date, balance_due
+                    FROM sales_invoices
+                    WHERE invoice_status <> 'P' AND balance_due > 0 {customer_filter}
+                    FOR UPDATE
+                ), pay AS (
+                    SELECT id, customer_id, payment_date,
+                           SUM(unallocated_amount) OVER w - unallocated_amount AS range_start,
+                           SUM(unallocated_amount) OVER w AS range_end
+                    FROM open_payments
+                    WINDOW w AS (PARTITION BY customer_id ORDER BY payment_date, id)
+                ), inv AS (
+                    SELECT id, customer_id,
+                           SUM(balance_due) OVER w - balance_due AS range_start,
+                           SUM(balance_due) OVER w AS range_end
+                    FROM open_invoices
+                    WINDOW w AS (PARTITION BY customer_id ORDER BY invoice_date, id)
+                ), matched AS (
+                    SELECT pay.id AS payment_id, inv.id AS invoice_id,
+                           pay.customer_id, pay.payment_date,
+                           LEAST(pay.range_end, inv.range_end)
+                               - GREATEST(pay.range_start, inv.range_start) AS amount
+                    FROM pay
+                    JOIN inv ON inv.customer_id = pay.customer_id
+                            AND inv.range_start < pay.range_end
+                            AND pay.range_start < inv.range_end
+                ), allocations AS (
+                    INSERT INTO payment_allocations (
+                        payment_id, invoice_id, allocation_date, allocated_amount,
+                        discount_taken, exchange_difference, created_at, created_by
+                    )
+                    SELECT payment_id, invoice_id, now(), amount, 0, 0, now(), :user_id
+                    FROM matched
+                ), invoices_paid AS (
+                    UPDATE sales_invoices si
+                    SET amount_paid = si.amount_paid + m.amount,
+                        balance_due = si.total_amount - (si.amount_paid + m.amount),
+                        -- Allow small rounding differences
+                        invoice_status = CASE
+                            WHEN si.total_amount - (si.amount_paid + m.amount) <= 0.01 THEN 'P'
+                            ELSE si.invoice_status
+                        END,
+                        updated_at = now()
+                    FROM (SELECT invoice_id, SUM(amount) AS amount FROM matched GROUP BY invoice_id) m
+                    WHERE si.id = m.invoice_id
+                ), payments_allocated AS (
+                    UPDATE customer_payments cp
+                    SET allocated_amount = cp.allocated_amount + m.amount,
+                        unallocated_amount = cp.payment_amount - (cp.allocated_amount + m.amount),
+                        is_allocated = cp.payment_amount - (cp.allocated_amount + m.amount) <= 0.01,
+                        updated_at = now()
+                    FROM (SELECT payment_id, SUM(amount) AS amount FROM matched GROUP BY payment_id) m
+                    WHERE cp.id = m.payment_id
+                ), customers_credited AS (
+                    UPDATE customers c
+                    SET balance = c.balance - m.amount,
+                        last_payment_date = m.last_payment_date
+                    FROM (
+                        SELECT customer_id, SUM(amount) AS amount, MAX(payment_date) AS last_payment_date
+                        FROM matched GROUP BY customer_id
+                    ) m
+                    WHERE c.id = m.customer_id
+                )
+                SELECT COUNT(DISTINCT payment_id) AS payments_processed,
+                       COUNT(*) AS invoices_paid,
+                       COALESCE(SUM(amount), 0) AS total_allocated
+                FROM matched
+            """),
+            params
+        ).one()
         
         results = {
-            "payments_processed": 0,
-            "invoices_paid": 0,
-            "total_allocated": Decimal("0.00")
+            "payments_processed": result.payments_processed,
+            "invoices_paid": result.invoices_paid,
+            "total_allocated": result.total_allocated
         }
         
-        for payment in payments:
-            # Get unpaid invoices for customer
-            invoices = self.db.query(SalesInvoice).filter(
-                SalesInvoice.customer_id == payment.customer_id,
-                SalesInvoice.is_paid == False,
-                SalesInvoice.balance > 0
-            ).order_by(SalesInvoice.invoice_date).all()
-            
-            allocations = []
-            remaining = payment.unallocated_amount
-            
-            for invoice in invoices:
-                if remaining <= 0:
-                    break
-                
-                allocation_amount = min(remaining, invoice.balance)
-                allocations.append(PaymentAllocationCreate(
-                    invoice_id=invoice.id,
-                    allocated_amount=allocation_amount,
-                    discount_taken=Decimal("0.00")
-                ))
-                
-                remaining -= allocation_amount
-            
-            if allocations:
-                result = self.allocate_payment(payment.id, allocations, user_id)
-                results["payments_processed"] += 1
-                results["invoices_paid"] += len(result["allocations"])
-                results["total_allocated"] += result["total_allocated"]
+        if result.payments_processed:
+            self.audit.create_audit_entry(
+                table_name="payment_allocations",
+                record_id=f"AUTO-{customer_id}" if customer_id else "AUTO",
+                operation="UPDATE",
+                user_id=user_id,
+                after_data={
+                    "payments_processed": result.payments_processed,
+                    "total_allocated": str(result.total_allocated),
+                    "allocations": result.invoices_paid
+                }
+            )
+        
+        self.db.commit()
         
         return results
     
-    def get_cash_receipts_journal(self, from_date: date, to_date: date) -> Dict[str, Any]:
-        """Get cash receipts journal report"""
-        payments = self.db.query(CustomerPayment).filter(
-            CustomerPayment.payment_date >= from_date,
-            CustomerPayment.payment_date <= to_date,
-            CustomerPayment.is_reversed == False
-        ).order_by(CustomerPayment.payment_date, CustomerPayment.payment_number).all()
-        
-        journal_entries = []
+    def get_cash_receipts_journal(self, from_date: date, to_date: date) -> Iterator[Dict[str, Any]]:
+        """
+        Get cash receipts journal report
+        Yields one entry per payment, then a closing summary with the totals
+        """
+        # Only the reported columns are selected, with the customer name joined
+        # in; rows come off a server-side cursor 1000 at a time so memory stays
+        # flat however long the date range is
+        rows = self.db.execute(
+            select(
+                CustomerPayment.payment_date,
+                CustomerPayment.payment_number,
+                CustomerPayment.customer_code,
+                Customer.customer_name,
+                CustomerPayment.payment_method,
+                CustomerPayment.reference,
+                CustomerPayment.payment_amount,
+                CustomerPayment.allocated_amount,
+                CustomerPayment.unallocated_amount
+            ).outerjoin(
+                Customer, Customer.id == CustomerPayment.customer_id
+            ).where(
+                CustomerPayment.payment_date >= from_date,
+                CustomerPayment.payment_date <= to_date,
+                CustomerPayment.is_reversed == False
+            ).order_by(
+                CustomerPayment.payment_date, CustomerPayment.payment_number
+            ).execution_options(stream_results=True, yield_per=1000)
+        )
+        
+        total_count = 0
         total_amount = Decimal("0.00")
         
-        for payment in payments:
-            # Get customer details
-            customer = self.db.query(Customer).filter_by(id=payment.customer_id).first()
-            
-            journal_entries.append({
+        for payment in rows:
+            yield {
                 "payment_date": payment.payment_date.isoformat(),
                 "payment_number": payment.payment_number,
                 "customer_code": payment.customer_code,
-                "customer_name": customer.customer_name if customer else "",
+                "customer_name": payment.customer_name or "",
                 "payment_method": payment.payment_method,
                 "reference": payment.reference,
                 "payment_amount": float(payment.payment_amount),
                 "allocated_amount": float(payment.allocated_amount),
                 "unallocated_amount": float(payment.unallocated_amount)
-            })
+            }
             
+            total_count += 1
             total_amount += payment.payment_amount
         
-        return {
+        yield {
             "from_date": from_date.isoformat(),
             "to_date": to_date.isoformat(),
-            "journal_entries": journal_entries,
-            "total_count": len(journal_entries),
+            "total_count": total_count,
             "total_amount": float(total_amount)
         }
\ No newline at end of file
@@ -54,9 +54,7 @@ class GoodsReceiptService(BaseService):
             purchase_order = None
             
             if purchase_order_id:
-                purchase_order = self.db.query(PurchaseOrder).filter(
-                    PurchaseOrder.id == purchase_order_id
-                ).first()
+                purchase_order = self.db.get(PurchaseOrder, purchase_order_id)
                 if not purchase_order:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
@@ -179,9 +177,7 @@ class GoodsReceiptService(BaseService):
         """
         try:
             # Get receipt
-            receipt = self.db.query(GoodsReceipt).filter(
-                GoodsReceipt.id == receipt_id
-            ).first()
+            receipt = self.db.get(GoodsReceipt, receipt_id)
             if not receipt:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -267,9 +263,7 @@ class GoodsReceiptService(BaseService):
         """
         try:
             # Get receipt
-            receipt = self.db.query(GoodsReceipt).filter(
-                GoodsReceipt.id == receipt_id
-            ).first()
+            receipt = self.db.get(GoodsReceipt, receipt_id)
             if not receipt:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -417,9 +411,7 @@ class GoodsReceiptService(BaseService):
     
     def _update_po_line_receipt(self, po_line_id: int, quantity_received: Decimal):
         """Update PO line with received quantity"""
-        po_line = self.db.query(PurchaseOrderLine).filter(
-            PurchaseOrderLine.id == po_line_id
-        ).first()
+        po_line = self.db.get(PurchaseOrderLine, po_line_id)
         
         if po_line:
             po_line.quantity_received += quantity_received
@@ -429,24 +421,18 @@ class GoodsReceiptService(BaseService):
                 po_line.line_status = "COMPLETE"
             else:
                 po_line.line_status = "PARTIAL"
-            
-            po_line.updated_at = datetime.now()
     
     def _get_line_cost_price(self, receipt_line: GoodsReceiptLine) -> Decimal:
         """Get cost price for stock posting"""
         # If linked to PO, use PO price
         if receipt_line.po_line_id:
-            po_line = self.db.query(PurchaseOrderLine).filter(
-                PurchaseOrderLine.id == receipt_line.po_line_id
-            ).first()
+            po_line = self.db.get(PurchaseOrderLine, receipt_line.po_line_id)
             if po_line:
                 return po_line.unit_price
         
         # Otherwise, get from stock item
         if receipt_line.stock_id:
-            stock_item = self.db.query(StockItem).filter(
-                StockItem.id == receipt_line.stock_id
-            ).first()
+            stock_item = self.db.get(StockItem, receipt_line.stock_id)
             if stock_item:
                 return stock_item.unit_cost or Decimal("0")
         
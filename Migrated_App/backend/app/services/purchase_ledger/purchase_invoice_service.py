@@ -250,9 +250,7 @@ class PurchaseInvoiceService(BaseService):
             
             # Link to original invoice if provided
             if original_invoice_id:
-                original = self.db.query(PurchaseInvoice).filter(
-                    PurchaseInvoice.id == original_invoice_id
-                ).first()
+                original = self.db.get(PurchaseInvoice, original_invoice_id)
                 if original:
                     credit_note.notes = f"{credit_note.notes}\nOriginal invoice: {original.invoice_number}"
             
@@ -280,18 +278,14 @@ class PurchaseInvoiceService(BaseService):
         """
         try:
             # Get invoice and receipt
-            invoice = self.db.query(PurchaseInvoice).filter(
-                PurchaseInvoice.id == invoice_id
-            ).first()
+            invoice = self.db.get(PurchaseInvoice, invoice_id)
             if not invoice:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Purchase invoice not found"
                 )
             
-            receipt = self.db.query(GoodsReceipt).filter(
-                GoodsReceipt.id == receipt_id
-            ).first()
+            receipt = self.db.get(GoodsReceipt, receipt_id)
             if not receipt:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -368,9 +362,7 @@ class PurchaseInvoiceService(BaseService):
         """
         try:
             # Get invoice
-            invoice = self.db.query(PurchaseInvoice).filter(
-                PurchaseInvoice.id == invoice_id
-            ).first()
+            invoice = self.db.get(PurchaseInvoice, invoice_id)
             if not invoice:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -514,9 +506,7 @@ class PurchaseInvoiceService(BaseService):
         Migrated from pl930.cbl APPROVE-FOR-PAYMENT
         """
         try:
-            invoice = self.db.query(PurchaseInvoice).filter(
-                PurchaseInvoice.id == invoice_id
-            ).first()
+            invoice = self.db.get(PurchaseInvoice, invoice_id)
             if not invoice:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -620,9 +610,7 @@ class PurchaseInvoiceService(BaseService):
         po_line_id: int
     ):
         """Calculate price variance between PO and invoice"""
-        po_line = self.db.query(PurchaseOrderLine).filter(
-            PurchaseOrderLine.id == po_line_id
-        ).first()
+        po_line = self.db.get(PurchaseOrderLine, po_line_id)
         
         if po_line:
             invoice_line.po_price = po_line.unit_price
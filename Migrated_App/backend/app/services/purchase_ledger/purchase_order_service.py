@@ -6,8 +6,8 @@ Handles purchase order creation, modification, and processing
 from typing import List, Optional, Dict, Tuple
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func
 from fastapi import HTTPException, status
 
 from app.models.purchase_transactions import (
@@ -20,6 +20,7 @@ from app.models.system import AuditTrail, CompanyPeriod
 from app.core.calculations.vat_calculator import VATCalculator
 from app.core.calculations.discount_calculator import DiscountCalculator
 from app.services.base import BaseService
+from app.utils.cursor import keyset_page
 
 
 class PurchaseOrderService(BaseService):
@@ -194,9 +195,7 @@ class PurchaseOrderService(BaseService):
         """
         try:
             # Get order
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -283,9 +282,7 @@ class PurchaseOrderService(BaseService):
         """
         try:
             # Get order
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -345,9 +342,7 @@ class PurchaseOrderService(BaseService):
         """
         try:
             # Get order
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -377,7 +372,6 @@ class PurchaseOrderService(BaseService):
             for line in order.order_lines:
                 if line.line_status == "OPEN":
                     line.line_status = "CANCELLED"
-                    line.updated_at = datetime.now()
             
             self.db.commit()
             self.db.refresh(order)
@@ -406,12 +400,13 @@ class PurchaseOrderService(BaseService):
     def get_purchase_orders(
         self,
         supplier_code: Optional[str] = None,
-        status: Optional[PurchaseOrderStatus] = None,
+        order_status: Optional[PurchaseOrderStatus] = None,
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
         buyer_code: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict:
         """
         Get purchase orders with filtering and pagination
@@ -426,8 +421,8 @@ class PurchaseOrderService(BaseService):
                     Supplier.supplier_code == supplier_code
                 )
             
-            if status:
-                query = query.filter(PurchaseOrder.order_status == status)
+            if order_status:
+                query = query.filter(PurchaseOrder.order_status == order_status)
             
             if from_date:
                 query = query.filter(PurchaseOrder.order_date >= from_date)
@@ -438,38 +433,71 @@ class PurchaseOrderService(BaseService):
             if buyer_code:
                 query = query.filter(PurchaseOrder.buyer_code == buyer_code)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            orders = query.order_by(desc(PurchaseOrder.order_date))\
-                         .offset((page - 1) * page_size)\
-                         .limit(page_size)\
-                         .all()
-            
-            return {
-                "orders": orders,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size
-            }
+            # Each order's supplier is joined in for its supplier_code rather
+            # than lazy-loaded per row
+            orders, paging = keyset_page(
+                query.options(joinedload(PurchaseOrder.supplier)),
+                (PurchaseOrder.order_date, PurchaseOrder.id),
+                (datetime.fromisoformat, int),
+                cursor, page, page_size,
+                descending=True
+            )
+            return {"orders": orders, **paging}
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving purchase orders: {str(e)}"
             )
     
+    def get_order_lines(self, order_id: int) -> List[Dict]:
+        """
+        Get the lines of a purchase order in line number order
+        Migrated from pl900.cbl ORDER-ENQUIRY
+        """
+        # The lines are read in one SELECT on idx_po_line rather than by
+        # loading the order and walking its order_lines collection
+        lines = self.db.query(PurchaseOrderLine).filter(
+            PurchaseOrderLine.order_id == order_id
+        ).order_by(PurchaseOrderLine.line_number).all()
+
+        if not lines and not self.db.query(
+            self.db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).exists()
+        ).scalar():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Purchase order not found"
+            )
+
+        return [
+            {
+                "line_number": line.line_number,
+                "stock_code": line.stock_code,
+                "description": line.description,
+                "quantity_ordered": line.quantity_ordered,
+                "quantity_received": line.quantity_received,
+                "quantity_invoiced": line.quantity_invoiced,
+                "quantity_outstanding": line.quantity_outstanding,
+                "unit_price": line.unit_price,
+                "discount_percent": line.discount_percent,
+                "net_amount": line.net_amount,
+                "vat_code": line.vat_code,
+                "vat_amount": line.vat_amount,
+                "expected_date": line.expected_date,
+                "line_status": line.line_status
+            }
+            for line in lines
+        ]
+
     def check_order_completion(self, order_id: int) -> bool:
         """
         Check if order is complete based on receipts
         Migrated from pl900.cbl CHECK-ORDER-COMPLETE
         """
         try:
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 return False
             
@@ -542,9 +570,7 @@ class PurchaseOrderService(BaseService):
         """
         try:
             # Get order
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -574,7 +600,6 @@ class PurchaseOrderService(BaseService):
                     line.quantity_received = line.quantity_ordered
                     line.quantity_outstanding = Decimal('0')
                     line.line_status = "RECEIVED"
-                    line.updated_at = datetime.now()
                     total_received += line.quantity_received
                     
                     # Update stock item quantities
@@ -627,9 +652,7 @@ class PurchaseOrderService(BaseService):
         """
         try:
             # Get order
-            order = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.id == order_id
-            ).first()
+            order = self.db.get(PurchaseOrder, order_id)
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
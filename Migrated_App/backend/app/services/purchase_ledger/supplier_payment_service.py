@@ -130,9 +130,7 @@ class SupplierPaymentService(BaseService):
         """
         try:
             # Get payment
-            payment = self.db.query(SupplierPayment).filter(
-                SupplierPayment.id == payment_id
-            ).first()
+            payment = self.db.get(SupplierPayment, payment_id)
             if not payment:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -258,9 +256,7 @@ class SupplierPaymentService(BaseService):
                     continue
                 
                 # Get supplier
-                supplier = self.db.query(Supplier).filter(
-                    Supplier.id == supplier_id
-                ).first()
+                supplier = self.db.get(Supplier, supplier_id)
                 
                 # Create payment
                 payment = self.create_payment(
@@ -306,9 +302,7 @@ class SupplierPaymentService(BaseService):
         """
         try:
             # Get payment
-            payment = self.db.query(SupplierPayment).filter(
-                SupplierPayment.id == payment_id
-            ).first()
+            payment = self.db.get(SupplierPayment, payment_id)
             if not payment:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -446,9 +440,7 @@ class SupplierPaymentService(BaseService):
         Migrated from pl120.cbl CANCEL-PAYMENT
         """
         try:
-            payment = self.db.query(SupplierPayment).filter(
-                SupplierPayment.id == payment_id
-            ).first()
+            payment = self.db.get(SupplierPayment, payment_id)
             if not payment:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
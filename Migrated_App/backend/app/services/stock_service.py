@@ -12,6 +12,7 @@ from fastapi import HTTPException, status
 from app.models.stock import StockItem
 from app.models.control_tables import NumberSequence
 from app.services.base import BaseService
+from app.utils.cursor import keyset_page
 from app.services.stock_control import (
     StockMovementService,
     StockValuationService,
@@ -221,7 +222,8 @@ class StockService(BaseService):
         below_reorder: bool = False,
         active_only: bool = True,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict:
         """Search stock items with filtering"""
         try:
@@ -259,23 +261,16 @@ class StockService(BaseService):
                     )
                 )
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            items = query.order_by(StockItem.stock_code)\
-                        .offset((page - 1) * page_size)\
-                        .limit(page_size)\
-                        .all()
-            
-            return {
-                "items": items,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size
-            }
+            items, paging = keyset_page(
+                query,
+                (StockItem.stock_code, StockItem.id),
+                (str, int),
+                cursor, page, page_size
+            )
+            return {"items": items, **paging}
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,73 @@
+"""
+Keyset pagination cursors
+A cursor carries the sort key of the last row on a page, so the next page
+seeks past it instead of OFFSET-skipping every earlier row
+"""
+import base64
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for the sort key values of a row"""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> Tuple:
+    """Sort key values from a cursor, each passed through its parser"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor))
+        if len(values) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_page(
+    query: Query,
+    sort_key: Sequence[Any],
+    parsers: Sequence[Callable[[Any], Any]],
+    cursor: Optional[str],
+    page: int,
+    page_size: int,
+    descending: bool = False
+) -> Tuple[List, Dict]:
+    """
+    One page of query in sort_key order, and the paging fields to return
+    with it. With a cursor the page seeks past the last row already
+    returned, so deep pages cost the same as the first and the full count
+    is skipped; page numbers still work without one
+    """
+    paging = {"page_size": page_size}
+    if cursor:
+        after = decode_cursor(cursor, *parsers)
+        key = tuple_(*sort_key)
+        query = query.filter(key < after if descending else key > after)
+    else:
+        total_count = query.count()
+        paging.update(
+            page=page,
+            total_count=total_count,
+            total_pages=(total_count + page_size - 1) // page_size
+        )
+    
+    query = query.order_by(*(column.desc() if descending else column for column in sort_key))
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    
+    # Read one extra row to learn whether another page follows
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    paging["next_cursor"] = encode_cursor(
+        *(getattr(rows[-1], column.key) for column in sort_key)
+    ) if has_more else None
+    return rows, paging
@@ -0,0 +1,52 @@
+"""
+orjson encoding
+Report payloads are plain dicts, so they go straight to orjson instead of
+through jsonable_encoder and a response model
+"""
+from decimal import Decimal
+from functools import reduce
+from typing import Any, Iterable, List, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import AliasPath, BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+
+
+def orjson_default(value: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    # orjson serializes dates natively; Decimal goes out as a number, the
+    # same as FastAPI's own encoder
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def json_response(content: Any) -> Response:
+    """Serialize a plain payload in one orjson call"""
+    return Response(
+        content=orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS),
+        media_type="application/json"
+    )
+
+
+def dump_rows(adapter: TypeAdapter, rows: Iterable[Any]) -> List[Any]:
+    """Validate ORM rows against a list schema and dump them JSON-ready in one pass"""
+    return adapter.dump_python(adapter.validate_python(rows), mode="json")
+
+
+def _attribute(row: Any, name: str, field: FieldInfo) -> Any:
+    """Read a field from row the way from_attributes validation would,
+    following the field's validation_alias when it has one"""
+    alias = field.validation_alias
+    if isinstance(alias, AliasPath):
+        return reduce(getattr, alias.path, row)
+    return getattr(row, alias or name)
+
+
+def orm_response(model: Type[BaseModel], row: Any) -> ORJSONResponse:
+    """Render a row just read from the database through model without
+    validating it a second time"""
+    fields = {name: _attribute(row, name, field) for name, field in model.model_fields.items()}
+    return ORJSONResponse(model.model_construct(**fields).model_dump(mode="json"))
@@ -0,0 +1,28 @@
+"""
+Conditional GET support
+Lookups send an ETag; a client that already holds that version of the row
+gets 304 Not Modified instead of the body
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def etag_for(*values: Any) -> str:
+    """Strong ETag over the column values behind a response"""
+    digest = hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match already names etag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,22 @@
+"""
+NDJSON streaming responses
+Large report endpoints send one JSON document per line as rows arrive
+"""
+from typing import Any, Dict, Iterable, Iterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from app.utils.encoding import orjson_default
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _encode(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    for row in rows:
+        yield orjson.dumps(row, default=orjson_default) + b"\n"
+
+
+def ndjson_response(rows: Iterable[Dict[str, Any]]) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON"""
+    return StreamingResponse(_encode(rows), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,113 @@
+"""
+Report Worker
+Celery app for reports too slow to build inside a request; the API queues a
+job and the client polls its status until the result is ready. Celery beat
+also runs the periodic refresh of the customer balance roll-up.
+"""
+from typing import Dict, Optional
+
+from celery import Celery
+from celery.result import AsyncResult
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.core.cache import cache_get, cache_set
+from app.services.general_ledger.reporting_service import build_financial_package
+from app.services.payment_service import refresh_customer_balances
+
+celery_app = Celery(
+    "acas",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Report STARTED as well, so a running job is told apart from a queued one
+    task_track_started=True,
+    # A finished report is fetched for as long as a cached one is served
+    result_expires=settings.REPORT_CACHE_TTL,
+    # One whole-view refresh per interval instead of one per invoice or
+    # payment commit
+    beat_schedule={
+        "refresh-customer-balances": {
+            "task": "balances.refresh_customer_balances",
+            "schedule": settings.CUSTOMER_BALANCE_REFRESH_SECONDS,
+        },
+    }
+)
+
+# Celery task states as reported to API clients
+JOB_STATUS = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "processing",
+    "RETRY": "processing",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "failed",
+}
+
+
+def _job_key(job_id: str) -> str:
+    """Cache key recording that job_id was queued by the API"""
+    return f"report:job:{job_id}"
+
+
+@celery_app.task(name="reports.financial_package")
+def generate_financial_package_task(period_id: int, comparative_period_id: Optional[int] = None) -> Dict:
+    """
+    Build the financial package in the worker; the result backend keeps the JSON
+    An HTTPException raised by a report is returned as the job's error, since
+    the exception itself does not survive the JSON result serializer
+    """
+    try:
+        return jsonable_encoder(build_financial_package(period_id, comparative_period_id))
+    except HTTPException as e:
+        return {"error": {"status_code": e.status_code, "detail": e.detail}}
+
+
+def queue_financial_package_job(period_id: int, comparative_period_id: Optional[int] = None) -> str:
+    """Queue the financial package and record the job, returning its id"""
+    job = generate_financial_package_task.delay(period_id, comparative_period_id)
+    cache_set(_job_key(job.id), True, settings.REPORT_CACHE_TTL)
+    return job.id
+
+
+@celery_app.task(name="balances.refresh_customer_balances", ignore_result=True)
+def refresh_customer_balances_task() -> None:
+    """Refresh mv_customer_balance on a session of its own"""
+    db = SessionLocal()
+    try:
+        refresh_customer_balances(db)
+    finally:
+        db.close()
+
+
+def report_job_status(job_id: str) -> Optional[Dict]:
+    """
+    Status of a queued report job, with the report once it has completed
+    Celery reports any id it has no result for as PENDING, so a pending job
+    that was never queued here is unknown and None is returned
+    """
+    result = AsyncResult(job_id, app=celery_app)
+    if result.state == "PENDING" and cache_get(_job_key(job_id)) is None:
+        return None
+    
+    job = {"job_id": job_id, "status": JOB_STATUS.get(result.state, "queued")}
+    if result.successful():
+        report = result.result
+        if "error" in report:
+            job["status"] = "failed"
+            job["error"] = report["error"]
+        else:
+            job["report"] = report
+    elif result.failed():
+        job["error"] = {
+            "status_code": 500,
+            "detail": f"Error generating report: {type(result.result).__name__}: {result.result}"
+        }
+    return job
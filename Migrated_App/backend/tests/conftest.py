@@ -1,6 +1,7 @@
 """
 Test configuration and fixtures for ACAS backend testing
 """
+import os
 import pytest
 from typing import Generator
 from fastapi.testclient import TestClient
@@ -24,6 +25,10 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# PostgreSQL database for services whose SQL only runs there (data-modifying
+# CTEs, UPDATE ... FROM VALUES); tests using pg_db are skipped without it
+POSTGRES_TEST_DATABASE_URL = os.environ.get("TEST_POSTGRES_URL")
+
 
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
@@ -41,6 +46,24 @@ def db() -> Generator[Session, None, None]:
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+def pg_db() -> Generator[Session, None, None]:
+    """Create and provide a PostgreSQL database session for testing"""
+    if not POSTGRES_TEST_DATABASE_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    
+    pg_engine = create_engine(POSTGRES_TEST_DATABASE_URL)
+    Base.metadata.create_all(bind=pg_engine)
+    
+    session = sessionmaker(autocommit=False, autoflush=False, bind=pg_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=pg_engine)
+        pg_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator[TestClient, None, None]:
     """Create a test client with database dependency override"""
@@ -4,11 +4,32 @@ Tests the complete API workflow from HTTP requests to database operations
 """
 import pytest
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.models.purchase_transactions import PurchaseOrderStatus
+from app.models.purchase_transactions import PurchaseOrder, PurchaseOrderStatus
+from app.models.suppliers import Supplier
+
+
+@pytest.fixture
+def stored_purchase_order(db: Session):
+    """Create a purchase order from the mapped columns only"""
+    supplier = Supplier(supplier_code="SUP001", supplier_name="Stored Supplier Ltd")
+    db.add(supplier)
+    db.flush()
+    order = PurchaseOrder(
+        order_number="PO000101",
+        supplier_id=supplier.id,
+        order_status=PurchaseOrderStatus.APPROVED,
+        gross_total=Decimal("1200.00"),
+        expected_date=datetime(2026, 3, 1),
+        notes="Stored order"
+    )
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+    return order
 
 
 class TestPurchaseOrderAPI:
@@ -100,6 +121,35 @@ class TestPurchaseOrderAPI:
         assert data["order_number"] == sample_purchase_order.order_number
         assert data["supplier_code"] == sample_purchase_order.supplier_code
 
+    def test_get_purchase_order_from_mapped_columns(
+        self,
+        client: TestClient,
+        stored_purchase_order
+    ):
+        """Test the response fields read from differently named columns"""
+        response = client.get(f"/api/v1/purchase-orders/{stored_purchase_order.id}")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["order_number"] == "PO000101"
+        assert data["supplier_code"] == "SUP001"
+        assert data["order_status"] == PurchaseOrderStatus.APPROVED.value
+        assert Decimal(str(data["total_value"])) == Decimal("1200.00")
+        assert data["delivery_date"].startswith("2026-03-01")
+
+    def test_search_purchase_orders_from_mapped_columns(
+        self,
+        client: TestClient,
+        stored_purchase_order
+    ):
+        """Test search rows validate against the response model"""
+        response = client.get("/api/v1/purchase-orders/", params={"supplier_code": "SUP001"})
+        
+        assert response.status_code == 200
+        orders = response.json()["orders"]
+        assert [order["order_number"] for order in orders] == ["PO000101"]
+        assert orders[0]["supplier_code"] == "SUP001"
+
     def test_get_purchase_order_not_found(
         self, 
         client: TestClient
@@ -0,0 +1,73 @@
+"""
+Integration tests for Stock Item API endpoints
+Tests the stock item reads from HTTP requests to database rows
+"""
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.stock import StockItem
+
+
+@pytest.fixture
+def stored_stock_item(db: Session):
+    """Create a stock item from the mapped columns only"""
+    item = StockItem(
+        stock_code="STK001",
+        description="Stored Stock Item",
+        category_code="TEST",
+        shelf_location="A1",
+        quantity_on_hand=Decimal("25"),
+        selling_price1=Decimal("49.99"),
+        average_cost=Decimal("30.00"),
+        reorder_level=Decimal("10")
+    )
+    db.add(item)
+    db.commit()
+    db.refresh(item)
+    return item
+
+
+class TestStockItemAPI:
+    """Test Stock Item API endpoints"""
+
+    def test_get_stock_item(
+        self,
+        client: TestClient,
+        stored_stock_item
+    ):
+        """Test the response fields read from differently named columns"""
+        response = client.get(f"/api/v1/stock-items/{stored_stock_item.id}")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stock_code"] == "STK001"
+        assert data["location"] == "A1"
+        assert Decimal(str(data["sell_price"])) == Decimal("49.99")
+        assert Decimal(str(data["unit_cost"])) == Decimal("30.00")
+        assert Decimal(str(data["reorder_point"])) == Decimal("10")
+
+    def test_get_stock_item_by_code(
+        self,
+        client: TestClient,
+        stored_stock_item
+    ):
+        """Test getting a stock item by its code"""
+        response = client.get("/api/v1/stock-items/by-code/STK001")
+        
+        assert response.status_code == 200
+        assert response.json()["id"] == stored_stock_item.id
+
+    def test_search_stock_items(
+        self,
+        client: TestClient,
+        stored_stock_item
+    ):
+        """Test search rows validate against the response model"""
+        response = client.get("/api/v1/stock-items/", params={"search_term": "STK"})
+        
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["stock_code"] for item in items] == ["STK001"]
+        assert items[0]["location"] == "A1"
@@ -0,0 +1,119 @@
+"""
+Unit tests for Budget Service variance reporting
+Tests the budget against actual figures migrated from COBOL gl220.cbl
+"""
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy.orm import Session
+
+from app.services.general_ledger.budget_service import BudgetService
+from app.models.general_ledger import AccountBalance, BudgetHeader, BudgetLine
+from app.models.system import CompanyPeriod
+
+
+@pytest.fixture
+def budget_periods(db: Session):
+    """Create periods 1 and 2 of 2024"""
+    periods = [
+        CompanyPeriod(
+            period_number=number,
+            year_number=2024,
+            start_date=date(2024, number, 1),
+            end_date=date(2024, number, 28),
+            is_open=True
+        )
+        for number in (1, 2)
+    ]
+    db.add_all(periods)
+    db.commit()
+    return periods
+
+
+@pytest.fixture
+def budget(db: Session, sample_chart_of_accounts, budget_periods):
+    """
+    Create a 2024 budget of 100 a period for cash and 50 a period for
+    liabilities, with cash actuals of 120 in period 1 and 40 in period 2
+    """
+    cash = sample_chart_of_accounts[1]
+    liabilities = sample_chart_of_accounts[2]
+    budget = BudgetHeader(budget_name="Operating 2024", budget_year=2024)
+    db.add(budget)
+    db.flush()
+    
+    for period in budget_periods:
+        db.add(BudgetLine(
+            budget_id=budget.id,
+            account_id=cash.id,
+            period_number=period.period_number,
+            budget_amount=Decimal("100.00")
+        ))
+        db.add(BudgetLine(
+            budget_id=budget.id,
+            account_id=liabilities.id,
+            period_number=period.period_number,
+            budget_amount=Decimal("50.00")
+        ))
+    db.add(AccountBalance(
+        account_id=cash.id,
+        period_id=budget_periods[0].id,
+        period_debits=Decimal("120.00"),
+        period_credits=Decimal("0")
+    ))
+    db.add(AccountBalance(
+        account_id=cash.id,
+        period_id=budget_periods[1].id,
+        period_debits=Decimal("50.00"),
+        period_credits=Decimal("10.00")
+    ))
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+
+class TestBudgetVarianceReport:
+    """Test the budget variance report"""
+
+    def test_period_and_ytd_variance(self, db: Session, budget, budget_periods):
+        """Test budget, actual and variance for the period and year to date"""
+        service = BudgetService(db)
+        
+        report = service.get_budget_variance_report(budget.id, period_id=budget_periods[1].id)
+        
+        assert report["period"] == "2/2024"
+        assert [line["account_code"] for line in report["variance_lines"]] == ["1000.0001", "2000.0000"]
+        cash, liabilities = report["variance_lines"]
+        assert cash["period_budget"] == Decimal("100.00")
+        assert cash["period_actual"] == Decimal("40.00")
+        assert cash["period_variance"] == Decimal("-60.00")
+        assert cash["period_variance_pct"] == Decimal("-60")
+        assert cash["ytd_budget"] == Decimal("200.00")
+        assert cash["ytd_actual"] == Decimal("160.00")
+        assert cash["ytd_variance"] == Decimal("-40.00")
+        assert cash["ytd_variance_pct"] == Decimal("-20")
+        assert liabilities["period_actual"] == Decimal("0")
+        assert liabilities["ytd_budget"] == Decimal("100.00")
+        assert report["totals"]["budget_ytd"] == Decimal("300.00")
+        assert report["totals"]["actual_ytd"] == Decimal("160.00")
+        assert report["totals"]["variance"] == Decimal("-140.00")
+
+    def test_ytd_stops_at_requested_period(self, db: Session, budget, budget_periods):
+        """Test later periods are left out of the year to date"""
+        service = BudgetService(db)
+        
+        report = service.get_budget_variance_report(budget.id, period_id=budget_periods[0].id)
+        
+        cash = report["variance_lines"][0]
+        assert cash["ytd_budget"] == Decimal("100.00")
+        assert cash["ytd_actual"] == Decimal("120.00")
+
+    def test_variance_threshold(self, db: Session, budget, budget_periods):
+        """Test only accounts over the period variance % are reported"""
+        service = BudgetService(db)
+        
+        report = service.get_budget_variance_report(
+            budget.id, period_id=budget_periods[1].id, variance_threshold=Decimal("70")
+        )
+        
+        assert [line["account_code"] for line in report["variance_lines"]] == ["2000.0000"]
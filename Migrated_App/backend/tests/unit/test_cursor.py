@@ -0,0 +1,50 @@
+"""
+Unit tests for keyset pagination
+Tests page numbers and cursor continuation over a sorted query
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.general_ledger import ChartOfAccounts
+from app.utils.cursor import keyset_page
+
+SORT_KEY = (ChartOfAccounts.account_code, ChartOfAccounts.id)
+
+
+class TestKeysetPage:
+    """Test keyset_page over the sample chart of accounts"""
+
+    def test_cursor_continues_after_first_page(self, db: Session, sample_chart_of_accounts):
+        """Test the next cursor picks up after the last row of the first page"""
+        query = db.query(ChartOfAccounts)
+        
+        first, paging = keyset_page(query, SORT_KEY, (str, int), None, 1, 2)
+        
+        assert [account.account_code for account in first] == ["1000.0000", "1000.0001"]
+        assert paging["total_count"] == 3
+        assert paging["total_pages"] == 2
+        assert paging["next_cursor"] is not None
+        
+        second, paging = keyset_page(query, SORT_KEY, (str, int), paging["next_cursor"], 1, 2)
+        
+        assert [account.account_code for account in second] == ["2000.0000"]
+        assert paging["next_cursor"] is None
+        assert "total_count" not in paging
+
+    def test_descending_page_number(self, db: Session, sample_chart_of_accounts):
+        """Test a numbered page is ordered before it is offset"""
+        query = db.query(ChartOfAccounts)
+        
+        rows, paging = keyset_page(query, SORT_KEY, (str, int), None, 2, 2, descending=True)
+        
+        assert [account.account_code for account in rows] == ["1000.0000"]
+        assert paging["page"] == 2
+        assert paging["next_cursor"] is None
+
+    def test_invalid_cursor(self, db: Session):
+        """Test a cursor that does not decode is a 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            keyset_page(db.query(ChartOfAccounts), SORT_KEY, (str, int), "not-a-cursor", 1, 2)
+        
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,82 @@
+"""
+Unit tests for the financial report cache
+Tests which reports are served from the cache and which are rebuilt
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.api.v1 import financial_reports
+from app.models.system import CompanyPeriod
+
+
+@pytest.fixture
+def year_periods(db: Session):
+    """Create periods 1 to 3 of one year; period 1 is still open, 2 and 3 are closed"""
+    periods = [
+        CompanyPeriod(
+            period_number=number,
+            year_number=2026,
+            start_date=datetime(2026, number, 1),
+            end_date=datetime(2026, number, 28),
+            is_open=number == 1,
+            gl_closed=number != 1
+        )
+        for number in (1, 2, 3)
+    ]
+    db.add_all(periods)
+    db.commit()
+    return periods
+
+
+@pytest.fixture
+def cached_keys(monkeypatch):
+    """Record the keys that go through the cache instead of Redis"""
+    keys = []
+
+    def cache_through(key, build, ttl):
+        keys.append(key)
+        return build()
+
+    monkeypatch.setattr(financial_reports, "cache_through", cache_through)
+    return keys
+
+
+class TestCachedReport:
+    """Test the closed-period report cache"""
+
+    def test_ytd_report_with_earlier_open_period_is_rebuilt(self, db: Session, year_periods, cached_keys):
+        """Test a YTD report is not cached while an earlier period is open"""
+        report = financial_reports._cached_report(
+            db, "report:test", [year_periods[2].id], lambda: {"built": True}, year_to_date=True
+        )
+        
+        assert report == {"built": True}
+        assert cached_keys == []
+
+    def test_period_report_of_closed_period_is_cached(self, db: Session, year_periods, cached_keys):
+        """Test a single-period report of a closed period is cached"""
+        financial_reports._cached_report(
+            db, "report:test", [year_periods[2].id], lambda: {"built": True}
+        )
+        
+        assert cached_keys == ["report:test"]
+
+    def test_ytd_report_is_cached_once_earlier_periods_close(self, db: Session, year_periods, cached_keys):
+        """Test a YTD report is cached once every earlier period is closed"""
+        year_periods[0].gl_closed = True
+        db.commit()
+        
+        financial_reports._cached_report(
+            db, "report:test", [year_periods[2].id], lambda: {"built": True}, year_to_date=True
+        )
+        
+        assert cached_keys == ["report:test"]
+
+    def test_report_of_unknown_period_is_rebuilt(self, db: Session, year_periods, cached_keys):
+        """Test a report naming an unknown period is not cached"""
+        financial_reports._cached_report(
+            db, "report:test", [99999], lambda: {"built": True}
+        )
+        
+        assert cached_keys == []
@@ -0,0 +1,145 @@
+"""
+Unit tests for GL Batch Service file import
+Tests the batch import migrated from COBOL gl090.cbl
+Journal lines are loaded with COPY, so these tests use the pg_db fixture
+"""
+import io
+import pytest
+from decimal import Decimal
+from datetime import date
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.services.general_ledger import chart_of_accounts_service
+from app.services.general_ledger.gl_batch_service import GLBatchService
+from app.models.general_ledger import (
+    AccountType, ChartOfAccounts, GLBatch, JournalHeader, JournalLine
+)
+from app.models.control_tables import NumberSequence
+from app.models.system import CompanyPeriod
+
+IMPORT_FILE = (
+    "type,date,description,reference,account_code,debit_amount,credit_amount\n"
+    "HEADER,2026-03-10,Rent,R-001,,,\n"
+    "LINE,,Rent for March,,6000.0001,500.00,0\n"
+    "LINE,,,,1000.0001,0,500.00\n"
+    "HEADER,2026-03-11,Sundries,,,,\n"
+    "LINE,,\\N,S-1,6000.0001,12.50,0\n"
+    "LINE,,Paid from bank,,1000.0001,0,12.50\n"
+)
+
+
+@pytest.fixture
+def ledger(pg_db: Session, monkeypatch):
+    """Create posting accounts and an open current period for imports"""
+    # Account ids differ between test databases, so none come from Redis
+    monkeypatch.setattr(chart_of_accounts_service, "cache_get", lambda key: None)
+    monkeypatch.setattr(chart_of_accounts_service, "cache_set", lambda key, value, ttl=None: None)
+    
+    pg_db.add_all([
+        ChartOfAccounts(
+            account_code="1000.0001",
+            account_name="Cash at Bank",
+            account_type=AccountType.ASSET,
+            allow_posting=True,
+            is_active=True
+        ),
+        ChartOfAccounts(
+            account_code="6000.0001",
+            account_name="Office Expenses",
+            account_type=AccountType.EXPENSE,
+            allow_posting=True,
+            is_active=True
+        ),
+        CompanyPeriod(
+            period_number=3,
+            year_number=2026,
+            start_date=date(2026, 3, 1),
+            end_date=date(2026, 3, 31),
+            is_open=True,
+            is_current=True
+        )
+    ])
+    pg_db.commit()
+    return pg_db
+
+
+def import_file(db: Session, content: str, user_id: int) -> GLBatch:
+    """Import a CSV batch file"""
+    return GLBatchService(db).import_batch_from_file(
+        io.BytesIO(content.encode("utf-8")), "CSV", user_id
+    )
+
+
+class TestImportBatchFromFile:
+    """Test importing a multi-journal batch file"""
+
+    def test_imports_headers_and_lines(self, ledger: Session, test_user_id):
+        """Test every journal and line of the file is loaded"""
+        batch = import_file(ledger, IMPORT_FILE, test_user_id)
+        
+        assert batch.control_count == 2
+        assert batch.actual_count == 2
+        assert batch.actual_debits == Decimal("512.50")
+        assert batch.is_balanced is True
+        
+        headers = ledger.query(JournalHeader).filter(
+            JournalHeader.batch_id == batch.id
+        ).order_by(JournalHeader.journal_number).all()
+        assert [header.journal_number for header in headers] == ["JNL000002", "JNL000003"]
+        assert [header.description for header in headers] == ["Rent", "Sundries"]
+        assert [header.line_count for header in headers] == [2, 2]
+        
+        lines = ledger.query(JournalLine).filter(
+            JournalLine.journal_id == headers[1].id
+        ).order_by(JournalLine.line_number).all()
+        assert [line.line_number for line in lines] == [10, 20]
+        assert [line.account_code for line in lines] == ["6000.0001", "1000.0001"]
+        assert [line.debit_amount for line in lines] == [Decimal("12.50"), Decimal("0")]
+
+    def test_line_text_and_defaults(self, ledger: Session, test_user_id):
+        """Test text is loaded as written and defaulted columns are filled"""
+        batch = import_file(ledger, IMPORT_FILE, test_user_id)
+        
+        lines = ledger.query(JournalLine).join(JournalHeader).filter(
+            JournalHeader.batch_id == batch.id
+        ).order_by(JournalHeader.journal_number, JournalLine.line_number).all()
+        
+        assert [line.description for line in lines] == [
+            "Rent for March", "", "\\N", "Paid from bank"
+        ]
+        assert lines[2].reference == "S-1"
+        assert lines[0].analysis_code1 is None
+        for line in lines:
+            assert line.currency_code == "USD"
+            assert line.exchange_rate == Decimal("1")
+            assert line.foreign_debit == Decimal("0")
+            assert line.reconciled is False
+            assert line.created_at is not None
+
+    def test_invalid_line_rolls_back_file(self, ledger: Session, test_user_id):
+        """Test an unknown account leaves no batch, journals or numbers behind"""
+        content = IMPORT_FILE.replace("LINE,,Paid from bank,,1000.0001", "LINE,,Paid from bank,,9999.9999")
+        
+        with pytest.raises(HTTPException) as exc_info:
+            import_file(ledger, content, test_user_id)
+        
+        assert exc_info.value.status_code == 404
+        assert ledger.query(GLBatch).count() == 0
+        assert ledger.query(JournalHeader).count() == 0
+        assert ledger.query(JournalLine).count() == 0
+        assert ledger.query(NumberSequence).filter(
+            NumberSequence.sequence_type == "JOURNAL"
+        ).count() == 0
+
+    def test_failed_copy_rolls_back_file(self, ledger: Session, test_user_id):
+        """Test a line the database rejects rolls back the batch and its journals"""
+        content = IMPORT_FILE.replace("Paid from bank", "x" * 201)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            import_file(ledger, content, test_user_id)
+        
+        assert exc_info.value.status_code == 500
+        assert ledger.query(GLBatch).count() == 0
+        assert ledger.query(JournalHeader).count() == 0
+        assert ledger.query(JournalLine).count() == 0
@@ -0,0 +1,237 @@
+"""
+Unit tests for Payment Service allocation
+Tests the payment allocation logic migrated from COBOL sl110.cbl
+Allocation runs PostgreSQL-only SQL, so these tests use the pg_db fixture
+"""
+import pytest
+from decimal import Decimal
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.services.payment_service import PaymentService
+from app.models import Customer, CustomerPayment, PaymentAllocation, SalesInvoice, SystemConfig
+from app.schemas.sales import PaymentAllocationCreate
+
+
+@pytest.fixture
+def customer(pg_db: Session):
+    """Create a customer with a system configuration for payment tests"""
+    pg_db.add(SystemConfig(company_name="Test Company"))
+    customer = Customer(
+        customer_code="CUST001",
+        customer_name="Test Customer Inc",
+        currency_code="USD",
+        balance=Decimal("0")
+    )
+    pg_db.add(customer)
+    pg_db.commit()
+    pg_db.refresh(customer)
+    return customer
+
+
+def create_invoice(db: Session, customer: Customer, invoice_no: str, amount: str, day: int) -> SalesInvoice:
+    """Create an open invoice and add it to the customer's balance"""
+    invoice = SalesInvoice(
+        invoice_no=invoice_no,
+        customer_id=customer.id,
+        invoice_date=datetime(2026, 1, day),
+        due_date=datetime(2026, 2, day),
+        invoice_status="O",
+        total_amount=Decimal(amount),
+        amount_paid=Decimal("0"),
+        balance_due=Decimal(amount)
+    )
+    customer.balance += Decimal(amount)
+    db.add(invoice)
+    db.commit()
+    db.refresh(invoice)
+    return invoice
+
+
+def create_payment(db: Session, customer: Customer, payment_number: str, amount: str, day: int) -> CustomerPayment:
+    """Create an unallocated payment"""
+    payment = CustomerPayment(
+        payment_number=payment_number,
+        payment_date=datetime(2026, 3, day),
+        customer_id=customer.id,
+        customer_code=customer.customer_code,
+        payment_method="TRANSFER",
+        payment_amount=Decimal(amount),
+        allocated_amount=Decimal("0"),
+        unallocated_amount=Decimal(amount),
+        is_allocated=False,
+        is_reversed=False
+    )
+    db.add(payment)
+    db.commit()
+    db.refresh(payment)
+    return payment
+
+
+def allocation_count(db: Session, **filters) -> int:
+    """Count the allocation rows matching the filters"""
+    return db.query(PaymentAllocation).filter_by(**filters).count()
+
+
+class TestAllocatePayment:
+    """Test manual payment allocation"""
+
+    def test_one_payment_across_several_invoices(self, pg_db: Session, customer, test_user_id):
+        """Test one payment split over two invoices"""
+        service = PaymentService(pg_db)
+        first = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        second = create_invoice(pg_db, customer, "INV002", "100.00", 2)
+        payment = create_payment(pg_db, customer, "PAY0000001", "150.00", 1)
+        
+        result = service.allocate_payment(
+            payment.id,
+            [
+                PaymentAllocationCreate(invoice_id=first.id, allocated_amount=Decimal("100.00")),
+                PaymentAllocationCreate(invoice_id=second.id, allocated_amount=Decimal("50.00"))
+            ],
+            test_user_id
+        )
+        pg_db.expire_all()
+        
+        assert result["total_allocated"] == Decimal("150.00")
+        assert [alloc["status"] for alloc in result["allocations"]] == ["SUCCESS", "SUCCESS"]
+        assert first.balance_due == Decimal("0")
+        assert first.invoice_status == "P"
+        assert second.balance_due == Decimal("50.00")
+        assert second.invoice_status == "O"
+        assert payment.unallocated_amount == Decimal("0")
+        assert payment.is_allocated is True
+        assert customer.balance == Decimal("50.00")
+        assert allocation_count(pg_db, payment_id=payment.id) == 2
+
+    def test_several_payments_against_one_invoice(self, pg_db: Session, customer, test_user_id):
+        """Test two payments settling one invoice between them"""
+        service = PaymentService(pg_db)
+        invoice = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        first = create_payment(pg_db, customer, "PAY0000001", "60.00", 1)
+        second = create_payment(pg_db, customer, "PAY0000002", "40.00", 2)
+        
+        service.allocate_payment(
+            first.id,
+            [PaymentAllocationCreate(invoice_id=invoice.id, allocated_amount=Decimal("60.00"))],
+            test_user_id
+        )
+        pg_db.expire_all()
+        
+        assert invoice.balance_due == Decimal("40.00")
+        assert invoice.invoice_status == "O"
+        
+        service.allocate_payment(
+            second.id,
+            [PaymentAllocationCreate(invoice_id=invoice.id, allocated_amount=Decimal("40.00"))],
+            test_user_id
+        )
+        pg_db.expire_all()
+        
+        assert invoice.amount_paid == Decimal("100.00")
+        assert invoice.balance_due == Decimal("0")
+        assert invoice.invoice_status == "P"
+        assert allocation_count(pg_db, invoice_id=invoice.id) == 2
+
+    def test_invoice_named_twice(self, pg_db: Session, customer, test_user_id):
+        """Test an invoice named twice is not allocated past its balance"""
+        service = PaymentService(pg_db)
+        invoice = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        payment = create_payment(pg_db, customer, "PAY0000001", "200.00", 1)
+        
+        result = service.allocate_payment(
+            payment.id,
+            [
+                PaymentAllocationCreate(invoice_id=invoice.id, allocated_amount=Decimal("70.00")),
+                PaymentAllocationCreate(invoice_id=invoice.id, allocated_amount=Decimal("70.00"))
+            ],
+            test_user_id
+        )
+        pg_db.expire_all()
+        
+        assert [alloc["allocated_amount"] for alloc in result["allocations"]] == [
+            Decimal("70.00"), Decimal("30.00")
+        ]
+        assert result["total_allocated"] == Decimal("100.00")
+        assert invoice.amount_paid == Decimal("100.00")
+        assert invoice.balance_due == Decimal("0")
+        assert invoice.invoice_status == "P"
+        assert payment.unallocated_amount == Decimal("100.00")
+        assert payment.is_allocated is False
+
+    def test_rounding_difference_marks_invoice_paid(self, pg_db: Session, customer, test_user_id):
+        """Test a balance of 0.01 or less marks the invoice paid"""
+        service = PaymentService(pg_db)
+        settled = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        open_invoice = create_invoice(pg_db, customer, "INV002", "100.00", 2)
+        payment = create_payment(pg_db, customer, "PAY0000001", "199.97", 1)
+        
+        service.allocate_payment(
+            payment.id,
+            [
+                PaymentAllocationCreate(invoice_id=settled.id, allocated_amount=Decimal("99.99")),
+                PaymentAllocationCreate(invoice_id=open_invoice.id, allocated_amount=Decimal("99.98"))
+            ],
+            test_user_id
+        )
+        pg_db.expire_all()
+        
+        assert settled.balance_due == Decimal("0.01")
+        assert settled.invoice_status == "P"
+        assert open_invoice.balance_due == Decimal("0.02")
+        assert open_invoice.invoice_status == "O"
+
+
+class TestAutoAllocatePayments:
+    """Test automatic allocation to the oldest invoices"""
+
+    def test_one_payment_across_several_invoices(self, pg_db: Session, customer, test_user_id):
+        """Test one payment filling the oldest invoice and part of the next"""
+        service = PaymentService(pg_db)
+        newer = create_invoice(pg_db, customer, "INV002", "100.00", 2)
+        older = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        payment = create_payment(pg_db, customer, "PAY0000001", "150.00", 1)
+        
+        result = service.auto_allocate_payments(customer.id, test_user_id)
+        pg_db.expire_all()
+        
+        assert result["payments_processed"] == 1
+        assert result["invoices_paid"] == 2
+        assert result["total_allocated"] == Decimal("150.00")
+        assert older.balance_due == Decimal("0")
+        assert older.invoice_status == "P"
+        assert newer.balance_due == Decimal("50.00")
+        assert newer.invoice_status == "O"
+        assert payment.unallocated_amount == Decimal("0")
+        assert payment.is_allocated is True
+        assert customer.balance == Decimal("50.00")
+
+    def test_several_payments_against_one_invoice(self, pg_db: Session, customer, test_user_id):
+        """Test two payments settling one invoice between them"""
+        service = PaymentService(pg_db)
+        invoice = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        first = create_payment(pg_db, customer, "PAY0000001", "60.00", 1)
+        second = create_payment(pg_db, customer, "PAY0000002", "40.00", 2)
+        
+        result = service.auto_allocate_payments(customer.id, test_user_id)
+        pg_db.expire_all()
+        
+        assert result["payments_processed"] == 2
+        assert result["total_allocated"] == Decimal("100.00")
+        assert invoice.amount_paid == Decimal("100.00")
+        assert invoice.invoice_status == "P"
+        assert first.is_allocated is True
+        assert second.is_allocated is True
+        assert allocation_count(pg_db, invoice_id=invoice.id) == 2
+
+    def test_rounding_difference_marks_invoice_paid(self, pg_db: Session, customer, test_user_id):
+        """Test a payment leaving 0.01 outstanding marks the invoice paid"""
+        service = PaymentService(pg_db)
+        invoice = create_invoice(pg_db, customer, "INV001", "100.00", 1)
+        create_payment(pg_db, customer, "PAY0000001", "99.99", 1)
+        
+        service.auto_allocate_payments(customer.id, test_user_id)
+        pg_db.expire_all()
+        
+        assert invoice.balance_due == Decimal("0.01")
+        assert invoice.invoice_status == "P"
@@ -6,9 +6,10 @@ import pytest
 from decimal import Decimal
 from datetime import date
 from sqlalchemy.orm import Session
+from fastapi import HTTPException
 
 from app.services.purchase_ledger.purchase_order_service import PurchaseOrderService
-from app.models.purchase_transactions import PurchaseOrder, PurchaseOrderStatus
+from app.models.purchase_transactions import PurchaseOrder, PurchaseOrderLine, PurchaseOrderStatus
 
 
 class TestPurchaseOrderService:
@@ -164,6 +165,40 @@ class TestPurchaseOrderService:
         
         assert order is None
 
+    def test_get_order_lines(
+        self,
+        db: Session,
+        sample_purchase_order
+    ):
+        """Test getting purchase order lines in line number order"""
+        service = PurchaseOrderService(db)
+        
+        # Added out of line number order so the sort is what orders them
+        for line_number, description in [(20, "Second Item"), (10, "First Item")]:
+            db.add(PurchaseOrderLine(
+                order_id=sample_purchase_order.id,
+                line_number=line_number,
+                description=description,
+                quantity_ordered=Decimal("10"),
+                unit_price=Decimal("50.00"),
+                net_amount=Decimal("500.00")
+            ))
+        db.commit()
+        
+        lines = service.get_order_lines(sample_purchase_order.id)
+        
+        assert [line["description"] for line in lines] == ["First Item", "Second Item"]
+        assert [line["line_number"] for line in lines] == [10, 20]
+
+    def test_get_order_lines_nonexistent_order(self, db: Session):
+        """Test getting lines of a non-existent purchase order"""
+        service = PurchaseOrderService(db)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            service.get_order_lines(99999)
+        
+        assert exc_info.value.status_code == 404
+
     def test_search_purchase_orders(
         self, 
         db: Session, 
@@ -0,0 +1,91 @@
+"""
+Unit tests for the report worker
+Tests the job results and statuses returned to API clients
+"""
+import pytest
+from fastapi import HTTPException, status
+
+from app import worker
+
+
+class FakeResult:
+    """Stand-in for a Celery AsyncResult in a given state"""
+
+    def __init__(self, state, result=None):
+        self.state = state
+        self.result = result
+
+    def successful(self):
+        return self.state == "SUCCESS"
+
+    def failed(self):
+        return self.state == "FAILURE"
+
+
+@pytest.fixture
+def job_result(monkeypatch):
+    """Serve job statuses from a FakeResult instead of the result backend"""
+    def use(state, result=None, queued=True):
+        monkeypatch.setattr(worker, "AsyncResult", lambda job_id, app: FakeResult(state, result))
+        monkeypatch.setattr(worker, "cache_get", lambda key: True if queued else None)
+    return use
+
+
+class TestFinancialPackageTask:
+    """Test the financial package task"""
+
+    def test_http_exception_becomes_error_result(self, monkeypatch):
+        """Test a report's HTTPException is returned as a serializable error"""
+        def build(period_id, comparative_period_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Period not found")
+        monkeypatch.setattr(worker, "build_financial_package", build)
+        
+        result = worker.generate_financial_package_task(99999)
+        
+        assert result == {"error": {"status_code": 404, "detail": "Period not found"}}
+
+
+class TestReportJobStatus:
+    """Test report job statuses"""
+
+    def test_unknown_job_is_none(self, job_result):
+        """Test a job id that was never queued is reported as unknown"""
+        job_result("PENDING", queued=False)
+        
+        assert worker.report_job_status("unknown") is None
+
+    def test_queued_job(self, job_result):
+        """Test a queued job that has not started"""
+        job_result("PENDING")
+        
+        assert worker.report_job_status("job") == {"job_id": "job", "status": "queued"}
+
+    def test_completed_job_carries_report(self, job_result):
+        """Test a completed job returns its report"""
+        job_result("SUCCESS", {"financial_package": {}})
+        
+        job = worker.report_job_status("job")
+        
+        assert job["status"] == "completed"
+        assert job["report"] == {"financial_package": {}}
+
+    def test_error_result_is_failed(self, job_result):
+        """Test a job that returned an error result is failed with that error"""
+        job_result("SUCCESS", {"error": {"status_code": 404, "detail": "Period not found"}})
+        
+        job = worker.report_job_status("job")
+        
+        assert job["status"] == "failed"
+        assert job["error"] == {"status_code": 404, "detail": "Period not found"}
+
+    def test_failed_job_error(self, job_result):
+        """Test a job that raised reports the exception type and message"""
+        job_result("FAILURE", ValueError("bad period"))
+        
+        job = worker.report_job_status("job")
+        
+        assert job["status"] == "failed"
+        assert job["error"] == {
+            "status_code": 500,
+            "detail": "Error generating report: ValueError: bad period"
+        }
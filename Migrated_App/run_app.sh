@@ -139,6 +139,14 @@ setup_database() {
     psql -h "$DB_HOST" -p "$DB_PORT" -U "$postgres_user" -d "$DB_NAME" -c \
         "GRANT ALL ON SCHEMA public TO $DB_USER;" >/dev/null
     
+    # Application schema, owned by the application role, and its
+    # search_path; the initial migration also creates the schema if missing
+    psql -h "$DB_HOST" -p "$DB_PORT" -U "$postgres_user" -d "$DB_NAME" -c \
+        "CREATE SCHEMA IF NOT EXISTS acas AUTHORIZATION $DB_USER;" >/dev/null
+    
+    psql -h "$DB_HOST" -p "$DB_PORT" -U "$postgres_user" -d postgres -c \
+        "ALTER ROLE $DB_USER IN DATABASE $DB_NAME SET search_path TO acas, public;" >/dev/null
+    
     success "Database setup completed"
 }
 